@@ -0,0 +1,240 @@
+"""
+ソルバーの速度と解の質を都市数ごとに測るベンチマーク。結果は JSON に保存し、コミット間で比較できる。
+
+    python -m benchmarks.bench run                       # 10 / 100 / 1000 / 10000 都市
+    python -m benchmarks.bench run --sizes 100 1000 --output before.json
+    python -m benchmarks.bench run --tsplib berlin52.tsp --tour berlin52.opt.tour
+    python -m benchmarks.bench compare before.json after.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+
+import numpy as np
+
+from src.config import Config
+from src.distance import DenseDistance
+from src.local_search import LocalSearch
+from src.tsp import TSP
+from src.tsp_ga import GeneticAlgorithm
+from src.tsplib import load_tour, load_tsp
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+HIGHER_IS_BETTER = ("_per_sec",)  # この接尾辞の指標は大きいほどよい（それ以外は小さいほどよい）
+ABSOLUTE_METRICS = ("gap_percent",)  # 0 付近になる指標は比ではなく差（ポイント）で比べる
+
+
+def _best_time(func, repeat=5):
+    """ func 1 回あたりの最短実行時間（秒）。短い処理は timeit と同じく回数を増やして測る """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def _peak_mb(func):
+    """ func 実行中に tracemalloc で観測したメモリ使用量のピーク（MB、NumPy の配列も含む） """
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 2**20
+
+
+def strip_tour(cities):
+    """ 都市を横長の帯に分け、帯ごとに左右交互に並べた巡回路（参照解を作る局所探索の初期解） """
+    n_strips = max(int(np.sqrt(len(cities) / 2)), 1)
+    y = cities[:, 1]
+    strips = ((y - y.min()) / (np.ptp(y) + 1e-9) * n_strips).astype(np.int64)
+    x = np.where(strips % 2 == 0, cities[:, 0], -cities[:, 0])
+    return np.lexsort((x, strips))
+
+
+def reference_tour(tsp):
+    """ 参照解。帯状の巡回路に局所探索（2-opt + Or-opt）をかけたもの """
+    return LocalSearch(tsp).optimize(strip_tour(np.asarray(tsp.cities, dtype=np.float64)))
+
+
+def benchmark_instance(tsp, args, rng, reference=None, build_distance=True):
+    """
+    1 つの問題について各処理を測る。
+
+    :param tsp: 対象の TSP インスタンス（距離行列を測る場合は座標だけ使う）
+    :param args: コマンドライン引数
+    :param rng: 乱数生成器（numpy.random.Generator）
+    :param reference: 参照解の巡回路（省略時は reference_tour で作る）
+    :param build_distance: 距離行列の構築時間とメモリを測り、その行列を以降の計測に使うか
+    :return: 指標名と値の dict
+    """
+    result = {"cities": tsp.num_cities}
+    n = tsp.num_cities
+
+    if build_distance:
+        cities = tsp.cities
+        result["distance_matrix_s"] = _best_time(lambda: DenseDistance(cities), repeat=3)
+        result["distance_matrix_peak_mb"] = _peak_mb(lambda: DenseDistance(cities))
+        tsp = TSP.from_cities(cities, distance=DenseDistance(cities))
+
+    route = rng.permutation(n)
+    routes = np.argsort(rng.random((args.population, n)), axis=1)
+    result["route_distance_us"] = _best_time(lambda: tsp.compute_route_distance(route, closed=True)) * 1e6
+    batch = _best_time(lambda: tsp.compute_route_distances(routes, closed=True))
+    result["batch_evaluations_per_sec"] = args.population / batch
+
+    def make_ga():
+        return GeneticAlgorithm(tsp, args.population, args.mutation_rate, args.tournament,
+                                crossover=args.crossover, mutation=args.mutation, rng=rng)
+
+    ga = make_ga()
+    start = time.perf_counter()
+    evaluations = ga.evaluations
+    while ga.generation < args.min_generations or time.perf_counter() - start < args.ga_seconds:
+        ga.update()
+    elapsed = time.perf_counter() - start
+    result["ga_generations"] = ga.generation
+    result["ga_generations_per_sec"] = ga.generation / elapsed
+    result["ga_evaluations_per_sec"] = (ga.evaluations - evaluations) / elapsed
+    result["ga_best_length"] = float(ga.get_best_distance())
+    ga.close()
+
+    def ga_steps():
+        ga = make_ga()
+        for _ in range(2):
+            ga.update()
+        ga.close()
+    result["ga_peak_mb"] = _peak_mb(ga_steps)
+
+    if reference is None and n <= args.reference_max_cities:
+        start = time.perf_counter()
+        reference = reference_tour(tsp)
+        result["reference_s"] = time.perf_counter() - start
+    if reference is not None:
+        result["reference_length"] = tsp.compute_route_distance(reference, closed=True)
+        result["gap_percent"] = 100 * (result["ga_best_length"] / result["reference_length"] - 1)
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    results = {}
+    if args.tsplib:
+        tsp = load_tsp(args.tsplib)
+        reference = load_tour(args.tour) if args.tour else None
+        print(f"benchmarking {tsp.name} ({tsp.num_cities} cities)", file=sys.stderr)
+        results[tsp.name] = benchmark_instance(tsp, args, np.random.default_rng(args.seed), reference=reference,
+                                               build_distance=False)
+    else:
+        for n in args.sizes:
+            print(f"benchmarking {n} cities", file=sys.stderr)
+            coord_max = 1000 * int(np.ceil(np.sqrt(n)))  # 都市の密度を都市数によらずそろえる
+            construction = _best_time(lambda: TSP(n, 0, coord_max, distance_backend="lazy", rng=args.seed), repeat=3)
+            rng = np.random.default_rng(args.seed)
+            tsp = TSP(n, 0, coord_max, distance_backend="lazy", rng=rng)
+            results[str(n)] = dict(benchmark_instance(tsp, args, rng), tsp_construction_s=construction)
+
+    commit = _git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": args.seed,
+            "ga": {"population": args.population, "mutation_rate": args.mutation_rate,
+                   "tournament": args.tournament, "crossover": args.crossover, "mutation": args.mutation,
+                   "ga_seconds": args.ga_seconds},
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit or 'results'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"saved {output}", file=sys.stderr)
+    return 0
+
+
+def compare(args):
+    """ 2 つの結果を指標ごとに並べ、threshold を超えて悪化した指標があれば終了コード 1 を返す """
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    regressions = 0
+    print(f"{'instance':>10} {'metric':<28} {'before':>14} {'after':>14} {'change':>9}")
+    for instance, metrics in after["results"].items():
+        old = before["results"].get(instance, {})
+        for metric, value in metrics.items():
+            if metric not in old or metric in ("cities", "ga_generations"):
+                continue
+            if not old[metric] and metric not in ABSOLUTE_METRICS:
+                continue
+            if metric in ABSOLUTE_METRICS:
+                change = value - old[metric]
+                worse = change / 100
+                shown = f"{change:>+8.2f}p"
+            else:
+                change = value / old[metric] - 1
+                worse = -change if metric.endswith(HIGHER_IS_BETTER) else change
+                shown = f"{change:>+8.1%} "
+            flag = ""
+            if metric != "reference_s" and worse > args.threshold:
+                flag = " REGRESSION"
+                regressions += 1
+            print(f"{instance:>10} {metric:<28} {old[metric]:>14.6g} {value:>14.6g} {shown}{flag}")
+    return 1 if regressions else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark TSP construction, distances and the GA.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and save a JSON report")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="numbers of cities")
+    run_parser.add_argument("--tsplib", help="benchmark a TSPLIB .tsp instance instead of random ones")
+    run_parser.add_argument("--tour", help="reference .tour for --tsplib (e.g. the known optimum)")
+    run_parser.add_argument("--seed", type=int, default=Config.SEED)
+    run_parser.add_argument("--ga-seconds", type=float, default=2.0, help="wall time of the GA throughput run")
+    run_parser.add_argument("--min-generations", type=int, default=3)
+    run_parser.add_argument("--population", type=int, default=Config.POPULATION_SIZE)
+    run_parser.add_argument("--mutation-rate", type=float, default=Config.MUTATION_RATE)
+    run_parser.add_argument("--tournament", type=int, default=Config.TOURNAMENT_SIZE)
+    run_parser.add_argument("--crossover", default=Config.CROSSOVER)
+    run_parser.add_argument("--mutation", default=Config.MUTATION)
+    run_parser.add_argument("--reference-max-cities", type=int, default=10000,
+                            help="largest random instance for which a local-search reference tour is built")
+    run_parser.add_argument("--output", help=f"report file (default: {RESULTS_DIR}/<commit>.json)")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare", help="compare two reports")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="relative change flagged as regression")
+    compare_parser.set_defaults(func=compare)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
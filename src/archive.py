@@ -0,0 +1,164 @@
+import numpy as np
+
+
+def canonical_tours(tours):
+    """
+    巡回路を正規形にする。都市 0 から始まるように回転し、2 番目の都市が最後の都市より小さい向きにそろえる。
+    同じ巡回路（回転・逆回り）は同じ配列になる。
+
+    :param tours: (巡回路数, 都市数) のインデックス配列
+    :return: (巡回路数, 都市数) の int32 配列
+    """
+    tours = np.asarray(tours)
+    n_tours, n_cities = tours.shape
+    start = np.argmax(tours == 0, axis=1)
+    offsets = (start[:, None] + np.arange(n_cities)) % n_cities
+    rotated = np.take_along_axis(tours, offsets, axis=1).astype(np.int32)
+    if n_cities > 2:
+        reverse = rotated[:, 1] > rotated[:, -1]
+        rotated[reverse, 1:] = rotated[reverse, :0:-1]
+    return rotated
+
+
+class ParetoArchive:
+    """
+    2 目的の非劣解を保持する外部アーカイブ。
+    前線は目的 0 の昇順（目的 1 は降順）に並べた配列で持ち、支配判定は二分探索でまとめて行う。
+    超体積は追加・削除のたびに変化した部分だけを足し引きして更新する。
+    巡回路は正規形の int32 配列として容量分の領域に格納し、容量を超えたら超体積への寄与が最小の解から捨てる。
+    """
+
+    def __init__(self, num_cities, capacity=256, reference=None):
+        """
+        ParetoArchive クラスの初期化。
+
+        :param num_cities: 都市の数
+        :param capacity: 保持する解の最大数
+        :param reference: 超体積の参照点 (2,)。省略時は最初に追加した解の各目的の最大値の 1.1 倍
+        """
+        if capacity < 1:
+            raise ValueError(f"capacity must be at least 1, got {capacity}")
+        self.num_cities = num_cities
+        self.capacity = capacity
+        self.reference = None if reference is None else np.asarray(reference, dtype=np.float64)
+        self.hypervolume = 0.0  # 参照点までの超体積
+        self._objectives = np.empty((0, 2), dtype=np.float64)  # 前線の目的値（目的 0 の昇順）
+        self._slots = np.empty(0, dtype=np.int64)  # 前線の各解の巡回路が入っている _tours の行
+        self._tours = np.empty((capacity, num_cities), dtype=np.int32)
+        self._free = list(range(capacity - 1, -1, -1))  # 空いている _tours の行
+
+    def __len__(self):
+        return len(self._objectives)
+
+    def dominated(self, objectives):
+        """
+        アーカイブ内の解に弱支配される（同じ値を含む）かをまとめて判定する。
+
+        :param objectives: (解の数, 2) の目的値
+        :return: (解の数,) の bool 配列
+        """
+        objectives = np.asarray(objectives, dtype=np.float64).reshape(-1, 2)
+        # 目的 0 がそれ以下の解のうち最後のものが、目的 1 も最小
+        index = np.searchsorted(self._objectives[:, 0], objectives[:, 0], side='right') - 1
+        found = index >= 0
+        result = np.zeros(len(objectives), dtype=bool)
+        result[found] = self._objectives[index[found], 1] <= objectives[found, 1]
+        return result
+
+    def add(self, tours, objectives):
+        """
+        解をまとめて追加する。追加した解に支配される解は取り除く。
+
+        :param tours: (解の数, 都市数) の巡回路
+        :param objectives: (解の数, 2) の目的値（小さいほどよい）
+        :return: 追加した解の数
+        """
+        objectives = np.asarray(objectives, dtype=np.float64).reshape(-1, 2)
+        if self.reference is None and len(objectives) > 0:
+            self.reference = 1.1 * objectives.max(axis=0)
+
+        # バッチ内で非劣なものだけ残し、アーカイブに弱支配されるものを捨てる
+        order = np.lexsort((objectives[:, 1], objectives[:, 0]))
+        best_before = np.minimum.accumulate(np.r_[np.inf, objectives[order, 1]])[:-1]
+        candidates = order[objectives[order, 1] < best_before]
+        candidates = candidates[~self.dominated(objectives[candidates])]
+        if len(candidates) == 0:
+            return 0
+
+        tours = canonical_tours(np.asarray(tours)[candidates])
+        for tour, point in zip(tours, objectives[candidates]):
+            self._insert(tour, point)
+        while len(self) > self.capacity:
+            self._remove(np.argmin(self.contributions()))
+        if len(self._tours) > self.capacity:
+            self._compact()
+        return len(candidates)
+
+    def _compact(self):
+        """ 一時的に広げた巡回路の領域を容量分に戻す """
+        tours = np.empty((self.capacity, self.num_cities), dtype=np.int32)
+        tours[:len(self)] = self._tours[self._slots]
+        self._tours = tours
+        self._slots = np.arange(len(self))
+        self._free = list(range(self.capacity - 1, len(self) - 1, -1))
+
+    def _insert(self, tour, point):
+        """ 支配されていない解 1 つを前線に入れ、それに支配される解を取り除き、超体積を更新する """
+        xs, ys = self._objectives[:, 0], self._objectives[:, 1]
+        lo = np.searchsorted(xs, point[0], side='left')
+        hi = lo + np.searchsorted(-ys[lo:], -point[1], side='right')  # 目的 1 も point 以上の範囲が支配される
+        self.hypervolume += self._local_area(point, lo, hi)
+
+        self._free.extend(self._slots[lo:hi].tolist())
+        if not self._free:
+            # 容量を超える分は一時的に領域を広げ、add の最後で寄与の小さい解を捨てて戻す
+            self._free.append(len(self._tours))
+            self._tours = np.concatenate([self._tours, np.empty((1, self.num_cities), dtype=np.int32)])
+        slot = self._free.pop()
+        self._tours[slot] = tour
+        self._objectives = np.concatenate([self._objectives[:lo], point[None], self._objectives[hi:]])
+        self._slots = np.concatenate([self._slots[:lo], [slot], self._slots[hi:]])
+
+    def _local_area(self, point, lo, hi):
+        """
+        point を前線の lo の位置に入れ、[lo, hi) の解を取り除いたときの超体積の増分。
+        変化するのは目的 0 が point から次に残る解までの帯だけなので、その帯の面積の差を求める。
+        """
+        rx, ry = self.reference
+        xs = np.minimum(self._objectives[:, 0], rx)
+        heights = np.maximum(ry - self._objectives[:, 1], 0.0)
+        x0 = min(point[0], rx)
+        x_end = xs[hi] if hi < len(xs) else rx
+        # 帯の中の元の高さ: x0 から最初に取り除く解までは左隣の解、その後は取り除く解それぞれ
+        left = heights[lo - 1] if lo > 0 else 0.0
+        edges = np.r_[x0, xs[lo:hi], x_end]
+        old = np.r_[left, heights[lo:hi]] @ np.diff(edges)
+        return (x_end - x0) * max(ry - point[1], 0.0) - old
+
+    def _remove(self, index):
+        """ 前線の index 番目の解を取り除き、超体積を更新する """
+        self.hypervolume -= self.contributions()[index]
+        self._free.append(int(self._slots[index]))
+        self._objectives = np.delete(self._objectives, index, axis=0)
+        self._slots = np.delete(self._slots, index)
+
+    def contributions(self):
+        """
+        各解の超体積への寄与（その解だけが支配する領域の面積）。
+
+        :return: 前線の順に並べた (解の数,) の配列
+        """
+        rx, ry = self.reference if self.reference is not None else (np.inf, np.inf)
+        xs = np.minimum(self._objectives[:, 0], rx)
+        ys = np.minimum(self._objectives[:, 1], ry)
+        right = np.r_[xs[1:], rx]
+        upper = np.r_[ry, ys[:-1]]
+        return (right - xs) * (upper - ys)
+
+    def get_front(self):
+        """
+        アーカイブの前線。
+
+        :return: (巡回路の (解の数, 都市数) int32 配列, 目的値の (解の数, 2) 配列)。目的 0 の昇順
+        """
+        return self._tours[self._slots], self._objectives.copy()
@@ -0,0 +1,227 @@
+"""
+GeneticAlgorithm の状態（集団、適応度、世代数、乱数の状態、都市座標と距離の定義）を 1 つの .npz ファイルに保存し、
+そこから再開する。集団は都市数に応じた最小の整数型（5000 都市なら uint16）で保存する。
+順列は deflate ではほとんど縮まず時間だけかかるので、既定では圧縮しない。
+
+    checkpointer = Checkpointer("run.npz", interval=300)
+    while ...:
+        ga.update()
+        checkpointer.maybe_save(ga)  # 前回から interval 秒経っていれば保存（書き込みは別スレッド）
+    checkpointer.close()
+
+    ga = load_checkpoint("run.npz")  # 交叉などの設定もファイルから戻す
+"""
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from src.tsp import TSP
+from src.tsp_ga import CROSSOVERS, MUTATIONS, SELECTIONS, GeneticAlgorithm
+
+CHECKPOINT_VERSION = 3
+
+
+def _compact_dtype(num_cities):
+    """ 都市インデックスを格納できる最小の整数型 """
+    for dtype in (np.uint8, np.uint16):
+        if num_cities <= np.iinfo(dtype).max + 1:
+            return dtype
+    return np.int32
+
+
+def _describe_distance(tsp):
+    """
+    距離バックエンドを作り直すための情報。
+    座標から求められない距離（EXPLICIT の距離行列など）は距離の定義を空文字列にする。
+
+    :return: (距離の計算方法, 格納形式, 距離の定義)
+    """
+    if tsp.distance_matrix is None:
+        return "lazy", "float64", tsp.distance.metric
+    return "dense", tsp.distance_matrix.dtype.name, getattr(tsp.distance, "metric", None) or ""
+
+
+def _operator_name(operators, operator):
+    """ 演算子の辞書から関数に対応するキーを探す """
+    return next(name for name, function in operators.items() if function is operator)
+
+
+def capture_state(ga):
+    """
+    GeneticAlgorithm の状態を保存用の配列の dict にコピーする。update の合間に呼ぶこと。
+    集団は都市数に応じた最小の整数型に詰めるので、コピーと同時にサイズも小さくなる。
+
+    :param ga: GeneticAlgorithm
+    :return: 名前 -> NumPy 配列の dict（元の GA とはメモリを共有しない）
+    """
+    tsp = ga.tsp
+    distance_backend, distance_dtype, distance_metric = _describe_distance(tsp)
+    return {
+        "version": np.array(CHECKPOINT_VERSION),
+        "population": ga.population.astype(_compact_dtype(ga.nr_of_cities)),
+        "fitness": ga.fitness.copy(),
+        "generation": np.array(ga.generation),
+        "evaluations": np.array(ga.evaluations),
+        "parameters": np.array([ga.population_size, ga.mutation_rate, ga.tournament_size, ga.crossover_rate]),
+        "operators": np.array([_operator_name(CROSSOVERS, ga.crossover), _operator_name(SELECTIONS, ga.selection),
+                               _operator_name(MUTATIONS, ga.mutation)]),
+        # 乱数生成器の状態は 64 ビットを超える整数を含むので JSON 文字列で持つ
+        "rng_state": np.array(json.dumps(ga.rng.bit_generator.state)),
+        "cities": np.array(tsp.cities),
+        "start_city": np.array(tsp.start_city if tsp.start_city is not None else [], dtype=np.float64),
+        "distance_backend": np.array(distance_backend),
+        "distance_dtype": np.array(distance_dtype),
+        "distance_metric": np.array(distance_metric),
+    }
+
+
+def write_state(path, state, compress=False):
+    """
+    capture_state の結果を .npz ファイルに書き出す。一時ファイルに書いてから置き換えるので、
+    途中で止まっても前回のチェックポイントは壊れない。
+
+    :param path: 書き出し先のファイル
+    :param state: capture_state の結果
+    :param compress: True なら圧縮する
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            (np.savez_compressed if compress else np.savez)(f, **state)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def save_checkpoint(path, ga, compress=False):
+    """
+    GeneticAlgorithm の状態をすぐに保存する（書き終わるまで戻らない）。
+
+    :param path: 書き出し先のファイル
+    :param ga: GeneticAlgorithm
+    :param compress: True なら圧縮する
+    """
+    write_state(path, capture_state(ga), compress)
+
+
+def load_checkpoint(path, tsp=None, evaluator="serial", local_search=None):
+    """
+    チェックポイントから GeneticAlgorithm を復元する。乱数の状態も保存時に戻すので、保存しなかった場合と同じ続きになる。
+    集団の総距離は保存した値をそのまま使い、計算し直さない。
+
+    :param path: チェックポイントのファイル
+    :param tsp: 対象の TSP インスタンス。省略時は保存した都市座標と距離の定義から作る
+    :param evaluator: 総距離の計算方法（GeneticAlgorithm と同じ）
+    :param local_search: メメティック GA の場合の局所探索（GeneticAlgorithm と同じ）
+    :return: GeneticAlgorithm
+    :raises ValueError: 対応していない形式のファイルの場合、tsp の都市や距離の定義が保存したものと違う場合、
+                        または座標から距離を作り直せない（EXPLICIT の距離行列の）問題で tsp を省略した場合
+    """
+    with np.load(path) as data:
+        state = {name: data[name] for name in data.files}
+    if int(state["version"]) != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version {int(state['version'])} in {path}")
+
+    cities = state["cities"]
+    distance_backend, distance_dtype, distance_metric = (
+        str(state[name]) for name in ("distance_backend", "distance_dtype", "distance_metric"))
+    if tsp is None:
+        if not distance_metric:
+            raise ValueError(f"{path} was saved from an instance whose distances cannot be rebuilt from its "
+                             f"coordinates (e.g. an EXPLICIT matrix); pass the TSP instance to resume it")
+        start_city = tuple(state["start_city"]) if len(state["start_city"]) else None
+        tsp = TSP.from_cities(cities, start_city=start_city, distance_backend=distance_backend,
+                              distance_dtype=distance_dtype, distance_metric=distance_metric)
+    else:
+        if not np.array_equal(np.asarray(tsp.cities), cities):
+            raise ValueError(f"The cities of {path} do not match the given TSP instance")
+        _, dtype, metric = _describe_distance(tsp)
+        if dtype != distance_dtype or (metric and distance_metric and metric != distance_metric):
+            raise ValueError(f"{path} was saved with {distance_metric or 'explicit'} distances stored as "
+                             f"{distance_dtype}, but the given TSP uses {metric or 'explicit'} / {dtype}")
+
+    # 乱数生成器は保存時の状態から作り、GeneticAlgorithm にはそれをそのまま渡す
+    rng_state = json.loads(str(state["rng_state"]))
+    bit_generator = getattr(np.random, rng_state["bit_generator"])()
+    bit_generator.state = rng_state
+
+    size, muta, tour, crossover_rate = state["parameters"]
+    crossover, selection, mutation = (str(name) for name in state["operators"])
+    ga = GeneticAlgorithm(tsp, int(size), float(muta), int(tour), local_search=local_search, crossover=crossover,
+                          selection=selection, mutation=mutation, crossover_rate=float(crossover_rate),
+                          evaluator=evaluator, population=state["population"], fitness=state["fitness"],
+                          rng=np.random.Generator(bit_generator))
+    ga.generation = int(state["generation"])
+    ga.evaluations = int(state["evaluations"])
+    return ga
+
+
+class Checkpointer:
+    """
+    定期的にチェックポイントを保存する。
+    呼び出し元のスレッドでは状態のコピーだけを行い、圧縮と書き込みはバックグラウンドのスレッドで行う。
+    """
+
+    def __init__(self, path, interval=300.0, compress=False):
+        """
+        Checkpointer クラスの初期化。
+
+        :param path: 書き出し先のファイル
+        :param interval: 保存する間隔（秒）
+        :param compress: True なら圧縮する
+        """
+        self.path = path
+        self.interval = interval
+        self.compress = compress
+        self.last_saved = time.monotonic()
+        self._thread = None
+        self._error = None  # 書き込みスレッドで起きた例外（次の save か close で送出する）
+
+    def maybe_save(self, ga):
+        """
+        前回の保存から interval 秒以上経っていれば保存する。
+
+        :param ga: GeneticAlgorithm
+        :return: 保存を始めたら True
+        """
+        if time.monotonic() - self.last_saved < self.interval:
+            return False
+        self.save(ga)
+        return True
+
+    def save(self, ga):
+        """
+        状態をコピーし、別スレッドで書き出しを始める。前回の書き出しが終わっていなければ待つ。
+
+        :param ga: GeneticAlgorithm
+        """
+        state = capture_state(ga)
+        self.wait()
+        self._thread = threading.Thread(target=self._write, args=(state,), name="checkpoint-writer")
+        self._thread.start()
+        self.last_saved = time.monotonic()
+
+    def _write(self, state):
+        try:
+            write_state(self.path, state, self.compress)
+        except BaseException as error:
+            self._error = error
+
+    def wait(self):
+        """ 書き出し中のチェックポイントが書き終わるのを待つ """
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def close(self):
+        """ 書き出し中のチェックポイントを書き終えてから終わる """
+        self.wait()
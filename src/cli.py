@@ -0,0 +1,228 @@
+"""
+画面を使わずに TSP を解くコマンドラインツール（pygame は読み込まない）。
+
+    python -m src.cli --cities 1000 --instances 10 --time-limit 5 --format jsonl
+    python -m src.cli cities.npy --solver local_search --generations 20 --format csv --output result.csv
+    python -m src.cli big.tsp --time-limit 43200 --checkpoint run.npz --resume  # 途中で止まっても続きから
+"""
+import os
+import argparse
+import csv
+import json
+import sys
+import time
+
+import numpy as np
+
+from src.checkpoint import Checkpointer, load_checkpoint
+from src.config import Config
+from src.evaluation import EVALUATORS
+from src.local_search import LocalSearch
+from src.tsp import TSP
+from src.tsp_ga import CROSSOVERS, MUTATIONS, SELECTIONS, GeneticAlgorithm
+from src.tsplib import load_tsp
+
+# 出力する項目（CSV の列の順番）
+FIELDS = ["instance", "cities", "solver", "seed", "best_length", "generations", "evaluations", "wall_time",
+          "generations_per_sec", "tour"]
+
+# チェックポイントに保存され、再開時にはそちらが使われる GA の設定
+CHECKPOINT_GA_OPTIONS = ["population", "mutation_rate", "tournament", "crossover", "selection", "mutation"]
+
+
+def _budget_left(args, generations, start):
+    """ 世代数と時間のどちらの予算も残っているか """
+    if args.generations is not None and generations >= args.generations:
+        return False
+    if args.time_limit is not None and time.perf_counter() - start >= args.time_limit:
+        return False
+    return True
+
+
+def solve_ga(tsp, args, rng):
+    """
+    GeneticAlgorithm を予算いっぱいまで回す。
+
+    :param tsp: 対象の TSP インスタンス
+    :param args: コマンドライン引数
+    :param rng: 乱数生成器（numpy.random.Generator）
+    :return: (最良ルート, 総距離, 世代数, 評価した個体数, この実行で進めた世代数)。再開した場合の世代数と評価した個体数は
+             チェックポイントまでの分を含む
+    """
+    if args.resume and os.path.exists(args.checkpoint):
+        ga = load_checkpoint(args.checkpoint, tsp, evaluator=args.evaluator)
+    else:
+        ga = GeneticAlgorithm(tsp, args.population, args.mutation_rate, args.tournament, crossover=args.crossover,
+                              selection=args.selection, mutation=args.mutation, evaluator=args.evaluator, rng=rng)
+    checkpointer = Checkpointer(args.checkpoint, args.checkpoint_interval) if args.checkpoint else None
+    first_generation = ga.generation
+    try:
+        start = time.perf_counter()
+        while _budget_left(args, ga.generation, start):
+            ga.update()
+            if checkpointer is not None:
+                checkpointer.maybe_save(ga)
+        if checkpointer is not None:
+            checkpointer.save(ga)
+        return (ga.get_best_route().copy(), float(ga.get_best_distance()), ga.generation, ga.evaluations,
+                ga.generation - first_generation)
+    finally:
+        if checkpointer is not None:
+            checkpointer.close()
+        ga.close()
+
+
+def solve_local_search(tsp, args, rng):
+    """
+    ランダムな初期ルートからの局所探索（2-opt + Or-opt）を予算いっぱいまで繰り返す（1 回を 1 世代と数える）。
+
+    :param tsp: 対象の TSP インスタンス
+    :param args: コマンドライン引数
+    :param rng: 乱数生成器（numpy.random.Generator）
+    :return: (最良ルート, 総距離, 世代数, 評価した個体数, この実行で進めた世代数)
+    """
+    local_search = LocalSearch(tsp)
+    best_route, best_length = None, np.inf
+    generations = 0
+    start = time.perf_counter()
+    while generations == 0 or _budget_left(args, generations, start):
+        route = local_search.optimize(rng.permutation(tsp.num_cities))
+        length = tsp.compute_route_distance(route, closed=True)
+        if length < best_length:
+            best_route, best_length = route, length
+        generations += 1
+    return best_route, best_length, generations, generations, generations
+
+
+SOLVERS = {
+    "ga": solve_ga,
+    "local_search": solve_local_search,
+}
+
+
+def load_instance(path, distance_backend="auto"):
+    """
+    都市座標のファイルから TSP インスタンスを作る。
+
+    :param path: TSPLIB の .tsp ファイル、(N, 2) 配列の .npy ファイル、または 1 行に x y を並べたテキストファイル
+    :param distance_backend: 距離の計算方法（TSP と同じ）
+    :return: TSP インスタンス
+    """
+    if path.endswith(".tsp"):
+        return load_tsp(path, distance_backend=distance_backend)
+    if path.endswith(".npy"):
+        cities = np.load(path)
+    else:
+        cities = np.loadtxt(path, ndmin=2)
+    return TSP.from_cities(cities, distance_backend=distance_backend)
+
+
+def iter_instances(args):
+    """
+    (名前, シード, TSP インスタンス, 乱数生成器) を 1 つずつ作る。
+    ランダムな問題は乱数生成器で都市を配置し、ソルバーは同じ乱数生成器の続きを使う。
+    """
+    for i, path in enumerate(args.instances_files):
+        seed = args.seed + i
+        yield path, seed, load_instance(path, args.distance_backend), np.random.default_rng(seed)
+    if not args.instances_files:
+        for i in range(args.instances):
+            seed = args.seed + i
+            rng = np.random.default_rng(seed)
+            tsp = TSP(args.cities, args.coord_min, args.coord_max, distance_backend=args.distance_backend, rng=rng)
+            yield i, seed, tsp, rng
+
+
+class _Writer:
+    """ 結果を 1 件ずつ JSON Lines か CSV で書き出す """
+
+    def __init__(self, stream, fmt):
+        self.stream = stream
+        self.csv = csv.DictWriter(stream, fieldnames=FIELDS) if fmt == "csv" else None
+        if self.csv is not None:
+            self.csv.writeheader()
+
+    def write(self, record):
+        if self.csv is not None:
+            record = dict(record, tour=" ".join(map(str, record["tour"])))
+            self.csv.writerow(record)
+        else:
+            self.stream.write(json.dumps(record) + "\n")
+        self.stream.flush()  # 長い実行でも 1 件ずつ読めるようにする
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Solve TSP instances without a display and stream the results.")
+    parser.add_argument("instances_files", nargs="*", metavar="INSTANCE",
+                        help="TSPLIB .tsp, .npy or whitespace-separated x y files; random instances if omitted")
+    parser.add_argument("--cities", type=int, default=Config.DEFAULT_CITIES, help="cities per random instance")
+    parser.add_argument("--instances", type=int, default=1, help="number of random instances")
+    parser.add_argument("--coord-min", type=int, default=Config.COORD_MIN)
+    parser.add_argument("--coord-max", type=int, default=Config.COORD_MAX)
+    parser.add_argument("--distance-backend", choices=["auto", "dense", "lazy"], default="auto")
+    parser.add_argument("--seed", type=int, default=Config.SEED, help="seed of the first instance (+1 per instance)")
+    parser.add_argument("--solver", choices=sorted(SOLVERS), default="ga")
+    parser.add_argument("--generations", type=int, help="generation budget per instance")
+    parser.add_argument("--time-limit", type=float, help="wall-time budget per instance in seconds")
+    parser.add_argument("--population", type=int, default=Config.POPULATION_SIZE)
+    parser.add_argument("--mutation-rate", type=float, default=Config.MUTATION_RATE)
+    parser.add_argument("--tournament", type=int, default=Config.TOURNAMENT_SIZE)
+    parser.add_argument("--crossover", choices=sorted(CROSSOVERS), default=Config.CROSSOVER)
+    parser.add_argument("--selection", choices=sorted(SELECTIONS), default="tournament")
+    parser.add_argument("--mutation", choices=sorted(MUTATIONS), default=Config.MUTATION)
+    parser.add_argument("--evaluator", choices=sorted(EVALUATORS), default="serial")
+    parser.add_argument("--checkpoint", help="save the GA state to this .npz file periodically and at the end")
+    parser.add_argument("--checkpoint-interval", type=float, default=300.0, help="seconds between checkpoints")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue from --checkpoint if it exists; the GA settings then come from the checkpoint")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    parser.add_argument("--output", help="output file (default: stdout)")
+    parser.add_argument("--no-tour", action="store_true", help="omit the tour from the results")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.generations is None and args.time_limit is None:
+        parser.error("give --generations and/or --time-limit")
+    n_instances = len(args.instances_files) or args.instances
+    if args.checkpoint and (args.solver != "ga" or n_instances != 1):
+        parser.error("--checkpoint needs --solver ga and a single instance")
+    if args.resume and not args.checkpoint:
+        parser.error("--resume needs --checkpoint")
+    if args.resume and os.path.exists(args.checkpoint):
+        # 再開時の GA の設定はチェックポイントから戻すので、指定しても使われない
+        given = [f"--{dest.replace('_', '-')}" for dest in CHECKPOINT_GA_OPTIONS
+                 if getattr(args, dest) != parser.get_default(dest)]
+        if given:
+            parser.error(f"{', '.join(given)} cannot be changed when resuming from {args.checkpoint}")
+
+    stream = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        writer = _Writer(stream, args.format)
+        for name, seed, tsp, rng in iter_instances(args):
+            start = time.perf_counter()
+            route, length, generations, evaluations, session_generations = SOLVERS[args.solver](tsp, args, rng)
+            wall_time = time.perf_counter() - start
+            writer.write({
+                "instance": name,
+                "cities": tsp.num_cities,
+                "solver": args.solver,
+                "seed": seed,
+                "best_length": float(length),
+                "generations": generations,
+                "evaluations": evaluations,
+                "wall_time": wall_time,
+                # 再開した場合も、この実行で進めた世代だけを実行時間で割る
+                "generations_per_sec": session_generations / wall_time if wall_time > 0 else None,
+                "tour": [] if args.no_tour else np.asarray(route).tolist(),
+            })
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
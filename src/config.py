@@ -16,10 +16,12 @@ class Config:
     LIGHT_BLUE = (0, 150, 255)  # ライトブルー
     LIGHT_SKY_BLUE = (141, 182, 205)  # ライトスカイブルー3
     DODGER_BLUE = (28, 134, 238)  # ダガーブルー
+    DARK_ORANGE = (255, 140, 0)  # ダークオレンジ
 
     FONT_SIZE: int = 16  # フォントサイズ
     FONT_NAME: str = 'notosansmonocjkjp'  # Ubuntu18.04 標準日本語フォント
     FPS: int = 60  # フレームレート
+    TEXT_CACHE_SIZE: int = 16384  # 描画済みテキストのキャッシュ数（都市番号が収まる程度）
 
     """ メイン画面 """
     DEFAULT_WIDTH: int = 800  # 初期画面幅
@@ -30,7 +32,9 @@ class Config:
     MAIN_BG_COLOR: tuple = LIGHT_GRAY  # メイン画面の背景色
     CITY_COLOR: tuple = LIGHT_BLUE  # 都市の色
     CITY_COLOR_SELECTED: tuple = DRAK_GRAY  # 選択済み都市の色
+    CITY_HOVER_COLOR: tuple = DODGER_BLUE  # マウスが重なっている都市の縁取りの色
     LINE_COLOR: tuple = BLACK  # 経路の線の色
+    OPT_LINE_COLOR: tuple = DARK_ORANGE  # 最適化中の最良経路の線の色
     CITY_RADIUS_RATIO: float = 0.02  # 画面横サイズに対する都市サイズの割合
     MINIMUM_CITY_RADIUS: int = 8  # 都市円の描画サイズの下限
     CITY_FONT_SIZE: int = 18  # 都市のフォントサイズ
@@ -57,6 +61,7 @@ class Config:
     
 
     MARGIN_RATIO: float = 0.05  # 画面の5%を余白として確保
+    ZOOM_STEP: float = 1.2  # マウスホイール 1 目盛りあたりの拡大率
 
     """ TSPの設定 """
     DEFAULT_CITIES: int = 10  # 初期都市数
@@ -65,4 +70,10 @@ class Config:
     DEFAULT_OBJECTIVES: int = 1  # 初期目的数
 
     """ 最適化の設定 """
-    SEED: int = 42  # 乱数シード
\ No newline at end of file
+    SEED: int = 42  # 乱数シード
+    POPULATION_SIZE: int = 100  # GAの個体数
+    MUTATION_RATE: float = 0.1  # GAの突然変異率
+    TOURNAMENT_SIZE: int = 5  # GAのトーナメントサイズ
+    CROSSOVER: str = "ox"  # GAの交叉（tsp_ga.CROSSOVERS のキー）
+    MUTATION: str = "inversion"  # GAの突然変異（tsp_ga.MUTATIONS のキー）
+    OPTIMIZER_MODE: str = "process"  # 最適化の実行場所（"thread" または "process"）
@@ -0,0 +1,321 @@
+import hashlib
+import math
+import os
+from collections import OrderedDict
+
+import numpy as np
+from scipy.spatial.distance import cdist
+
+
+def euclidean_distance(a, b):
+    """ ユークリッド距離。a, b は (..., 2) の座標配列で、ブロードキャストできればよい """
+    return np.hypot(a[..., 0] - b[..., 0], a[..., 1] - b[..., 1])
+
+
+def euc_2d_distance(a, b):
+    """ TSPLIB の EUC_2D（ユークリッド距離を最も近い整数に丸める） """
+    return np.floor(euclidean_distance(a, b) + 0.5)
+
+
+def ceil_2d_distance(a, b):
+    """ TSPLIB の CEIL_2D（ユークリッド距離を切り上げる） """
+    return np.ceil(euclidean_distance(a, b))
+
+
+def att_distance(a, b):
+    """ TSPLIB の ATT（疑似ユークリッド距離） """
+    r = euclidean_distance(a, b) / math.sqrt(10.0)
+    t = np.floor(r + 0.5)
+    return np.where(t < r, t + 1, t)
+
+
+def _geo_radians(coords):
+    """ TSPLIB の GEO 座標（度.分）をラジアンに変換する """
+    degrees = np.trunc(coords)
+    return 3.141592 * (degrees + 5.0 * (coords - degrees) / 3.0) / 180.0
+
+
+def geo_distance(a, b):
+    """ TSPLIB の GEO（地球を半径 6378.388 km の球とみなした距離、座標は (緯度, 経度)） """
+    a, b = _geo_radians(a), _geo_radians(b)
+    q1 = np.cos(a[..., 1] - b[..., 1])
+    q2 = np.cos(a[..., 0] - b[..., 0])
+    q3 = np.cos(a[..., 0] + b[..., 0])
+    cosine = np.clip(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3), -1.0, 1.0)
+    return np.where(cosine < 1.0, np.trunc(6378.388 * np.arccos(cosine) + 1.0), 0.0)  # 同じ地点どうしは 0
+
+
+# 座標から距離を求める関数（TSPLIB の EDGE_WEIGHT_TYPE に対応するもの）
+METRICS = {
+    "euclidean": euclidean_distance,
+    "euc_2d": euc_2d_distance,
+    "ceil_2d": ceil_2d_distance,
+    "att": att_distance,
+    "geo": geo_distance,
+}
+
+
+def distance_fingerprint(cities, metric, dtype):
+    """
+    距離行列の元になった条件（都市座標、距離の定義、格納形式）のハッシュ。
+    .npy に書き出した距離行列が別のインスタンスのものでないかを確かめるのに使う。
+
+    :param cities: 都市座標の (N, 2) 配列
+    :param metric: 距離の定義。METRICS のキー
+    :param dtype: 距離の格納形式
+    :return: 16 進数の文字列
+    """
+    cities = np.ascontiguousarray(cities, dtype=np.float64)
+    digest = hashlib.sha256(f"{cities.shape}:{metric}:{np.dtype(dtype).name}:".encode())
+    digest.update(cities.tobytes())
+    return digest.hexdigest()
+
+
+class DenseDistance:
+    """
+    都市間の距離を N×N 行列としてすべて事前計算して保持する距離バックエンド。
+    都市数が少ない場合はこちらが最速。
+    行列は float32 や TSPLIB 流に丸めた int32 で保持でき、.npy ファイルに書き出して
+    複数プロセスから np.memmap で読み取り専用に共有することもできる。
+    """
+
+    DTYPES = ("float64", "float32", "int32")  # 対応している格納形式
+    BLOCK_ROWS = 1024  # 距離行列を何行ずつ計算するか（一時メモリの上限を抑える）
+
+    def __init__(self, cities, dtype="float64", path=None, metric="euclidean", out=None):
+        """
+        DenseDistance クラスの初期化。
+
+        :param cities: 都市座標の (N, 2) 配列
+        :param dtype: 距離の格納形式。"float64", "float32", "int32"（最も近い整数に丸める）のいずれか
+        :param path: 指定した場合は距離行列をこの .npy ファイルに書き出し、読み取り専用の memmap として開く
+        :param metric: 距離の定義。METRICS のキー
+        :param out: 指定した場合は距離行列をこの (N, N) 配列に書き込んで使う（dtype は out に従う）
+        """
+        if np.dtype(dtype).name not in self.DTYPES:
+            raise ValueError(f"Unsupported distance dtype: {dtype}")
+        if metric not in METRICS:
+            raise ValueError(f"Unknown distance metric: {metric}")
+        self.metric = metric
+        cities = np.asarray(cities, dtype=np.float64)
+        self.num_cities = len(cities)
+        shape = (self.num_cities, self.num_cities)
+
+        if out is not None:
+            if out.shape != shape:
+                raise ValueError(f"out has shape {out.shape}, expected {shape}")
+            self.matrix = out
+            self._fill(self.matrix, cities)
+        elif path is None:
+            self.matrix = np.empty(shape, dtype=dtype)
+            self._fill(self.matrix, cities)
+        else:
+            # 書き込み途中のファイルを他プロセスが開かないよう、一時ファイルに書いてから置き換える
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            matrix = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=dtype, shape=shape)
+            self._fill(matrix, cities)
+            matrix.flush()
+            del matrix
+            # 古いハッシュを先に消す（新しい行列と古いハッシュが並ぶ瞬間を作らない。ハッシュがなければ load はエラー）
+            try:
+                os.remove(self.fingerprint_path(path))
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, path)
+            # 読み込み時に同じ都市・距離の定義・格納形式の行列か確かめられるよう、条件のハッシュを横に置く
+            with open(f"{tmp_path}.fingerprint", "w") as f:
+                f.write(distance_fingerprint(cities, metric, dtype))
+            os.replace(f"{tmp_path}.fingerprint", self.fingerprint_path(path))
+            self.matrix = np.load(path, mmap_mode='r')
+
+    @staticmethod
+    def fingerprint_path(path):
+        """ 距離行列の .npy ファイルの横に置く、条件のハッシュのファイル """
+        return f"{path}.fingerprint"
+
+    @classmethod
+    def load(cls, path, cities=None, metric="euclidean", dtype=None):
+        """
+        .npy ファイルに保存された距離行列を読み取り専用の memmap として開く。
+        cities を指定した場合は、書き出したときの条件のハッシュと照合する。
+
+        :param path: 距離行列の .npy ファイル
+        :param cities: 指定した場合は、この都市座標から作った行列であることを確かめる
+        :param metric: cities を指定した場合の距離の定義
+        :param dtype: cities を指定した場合の格納形式（省略時はファイルの形式）
+        :return: DenseDistance
+        :raises ValueError: 条件のハッシュがない、または一致しない場合
+        """
+        distance = cls.from_matrix(np.load(path, mmap_mode='r'))
+        if cities is None:
+            return distance
+        expected = distance_fingerprint(cities, metric, distance.matrix.dtype if dtype is None else dtype)
+        try:
+            with open(cls.fingerprint_path(path)) as f:
+                stored = f.read().strip()
+        except FileNotFoundError:
+            raise ValueError(f"{path} has no fingerprint file; cannot tell which instance it belongs to") from None
+        if stored != expected:
+            raise ValueError(f"{path} was built for different cities, metric or dtype")
+        distance.metric = metric
+        return distance
+
+    @classmethod
+    def from_matrix(cls, matrix):
+        """
+        計算済みの距離行列（共有メモリ上の配列や memmap など）をそのまま使う。
+
+        :param matrix: (N, N) の距離行列
+        :return: DenseDistance
+        """
+        if matrix.ndim != 2 or matrix.shape[0] != matrix.shape[1]:
+            raise ValueError("Distance matrix must be square")
+        distance = cls.__new__(cls)
+        distance.metric = None  # 座標からは求められない
+        distance.num_cities = matrix.shape[0]
+        distance.matrix = matrix
+        return distance
+
+    def save(self, path):
+        """
+        距離行列を .npy ファイルに書き出す。
+
+        :param path: 書き出し先のファイル
+        """
+        np.save(path, self.matrix)
+
+    def _fill(self, matrix, cities):
+        """
+        距離行列を BLOCK_ROWS 行ずつ計算して matrix に書き込む。
+
+        :param matrix: 書き込み先の (N, N) 配列
+        :param cities: 都市座標の (N, 2) 配列
+        """
+        for start in range(0, len(cities), self.BLOCK_ROWS):
+            if self.metric == "euclidean":
+                block = cdist(cities[start:start + self.BLOCK_ROWS], cities, metric='euclidean')  # ユークリッド距離を計算
+            else:
+                block = METRICS[self.metric](cities[start:start + self.BLOCK_ROWS, None], cities[None])
+            if np.issubdtype(matrix.dtype, np.integer):
+                block = np.floor(block + 0.5)  # TSPLIB の nint と同じ丸め
+            matrix[start:start + self.BLOCK_ROWS] = block
+
+    def pair(self, i, j):
+        """
+        都市 i と都市 j の距離を返す。i, j は同じ形のインデックス配列でもよい。
+
+        :param i: 都市インデックス（スカラーまたは配列）
+        :param j: 都市インデックス（スカラーまたは配列）
+        :return: i と同じ形の距離
+        """
+        return self.matrix[i, j]
+
+    def edge(self, i, j):
+        """
+        都市 i と都市 j の距離を Python の数値で返す。局所探索のように 1 辺ずつ参照する場合に使う。
+
+        :param i: 都市インデックス
+        :param j: 都市インデックス
+        :return: 距離
+        """
+        return self.matrix.item(i, j)
+
+    def row(self, i):
+        """
+        都市 i から全都市への距離を返す。
+
+        :param i: 都市インデックス
+        :return: (N,) の距離配列
+        """
+        return self.matrix[i]
+
+
+class LazyDistance:
+    """
+    距離行列を持たず、座標から必要な辺の距離だけをその場で計算する距離バックエンド。
+    大規模インスタンス向けで、メモリ使用量は O(N)（+ 行キャッシュ）に抑えられる。
+    """
+
+    CHUNK_ELEMENTS = 1 << 20  # pair で一度に座標を集める辺の数の上限（一時メモリの上限を抑える）
+
+    def __init__(self, cities, row_cache_size=0, metric="euclidean"):
+        """
+        LazyDistance クラスの初期化。
+
+        :param cities: 都市座標の (N, 2) 配列
+        :param row_cache_size: キャッシュしておく行の最大数（0 ならキャッシュしない）
+        :param metric: 距離の定義。METRICS のキー
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown distance metric: {metric}")
+        self.metric = metric
+        self._metric = None if metric == "euclidean" else METRICS[metric]  # ユークリッド距離以外の計算
+        self.cities = np.asarray(cities, dtype=np.float64)
+        self.num_cities = len(self.cities)
+        self.row_cache_size = row_cache_size
+        self._row_cache = OrderedDict()  # 都市インデックス -> 距離行（LRU 順）
+        self._xs = self.cities[:, 0].tolist()  # edge() 用の座標リスト
+        self._ys = self.cities[:, 1].tolist()
+
+    def pair(self, i, j):
+        """
+        都市 i と都市 j の距離を返す。i, j は同じ形のインデックス配列でもよい。
+
+        :param i: 都市インデックス（スカラーまたは配列）
+        :param j: 都市インデックス（スカラーまたは配列）
+        :return: i と同じ形の距離
+        """
+        i, j = np.broadcast_arrays(i, j)
+        if i.size <= self.CHUNK_ELEMENTS:
+            return self._pair(i, j)
+        # GA の集団のような大きなバッチは、座標の一時配列が大きくならないよう辺を分けて計算する
+        shape = i.shape
+        i, j = i.ravel(), j.ravel()
+        distances = np.empty(i.size, dtype=np.float64)
+        for start in range(0, i.size, self.CHUNK_ELEMENTS):
+            stop = start + self.CHUNK_ELEMENTS
+            distances[start:stop] = self._pair(i[start:stop], j[start:stop])
+        return distances.reshape(shape)
+
+    def _pair(self, i, j):
+        """ pair の本体。i, j の形の座標の一時配列を作って距離を計算する """
+        if self._metric is not None:
+            return self._metric(self.cities[i], self.cities[j])
+        diff = self.cities[i] - self.cities[j]
+        return np.sqrt(np.einsum('...k,...k->...', diff, diff))
+
+    def edge(self, i, j):
+        """
+        都市 i と都市 j の距離を Python の数値で返す。局所探索のように 1 辺ずつ参照する場合に使う。
+
+        :param i: 都市インデックス
+        :param j: 都市インデックス
+        :return: 距離
+        """
+        if self._metric is not None:
+            return float(self._metric(self.cities[i], self.cities[j]))
+        return math.hypot(self._xs[i] - self._xs[j], self._ys[i] - self._ys[j])
+
+    def row(self, i):
+        """
+        都市 i から全都市への距離を返す。row_cache_size > 0 の場合は最近使った行をキャッシュする。
+
+        :param i: 都市インデックス
+        :return: (N,) の距離配列
+        """
+        i = int(i)
+        if i in self._row_cache:
+            self._row_cache.move_to_end(i)
+            return self._row_cache[i]
+
+        if self._metric is not None:
+            row = self._metric(self.cities, self.cities[i])
+        else:
+            diff = self.cities - self.cities[i]
+            row = np.sqrt(np.einsum('nk,nk->n', diff, diff))
+        if self.row_cache_size > 0:
+            row.setflags(write=False)  # キャッシュ内容を呼び出し側で書き換えられないようにする
+            self._row_cache[i] = row
+            if len(self._row_cache) > self.row_cache_size:
+                self._row_cache.popitem(last=False)
+        return row
@@ -0,0 +1,183 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from src.shared import SharedArray, attach_distance, share_distance
+from src.tsp import TSP
+
+
+class SerialEvaluator:
+    """ 集団の総距離を呼び出し元のスレッドでまとめて計算する評価器 """
+
+    def __init__(self, tsp):
+        """
+        SerialEvaluator クラスの初期化。
+
+        :param tsp: 対象の TSP インスタンス
+        """
+        self.tsp = tsp
+
+    def evaluate(self, population):
+        """
+        ルートの総距離（巡回路として閉じたもの）をまとめて計算する。
+
+        :param population: (個体数, 都市数) のルート配列
+        :return: (個体数,) の総距離
+        """
+        return self.tsp.compute_route_distances(population, closed=True)
+
+    def close(self):
+        pass
+
+
+class ThreadEvaluator:
+    """ 集団を chunk_size 個体ずつに分け、スレッドプールで並列に総距離を計算する評価器 """
+
+    def __init__(self, tsp, workers=None, chunk_size=None):
+        """
+        ThreadEvaluator クラスの初期化。
+
+        :param tsp: 対象の TSP インスタンス
+        :param workers: スレッド数（省略時は CPU 数）
+        :param chunk_size: 1 タスクあたりの個体数（省略時は個体数をスレッド数で等分）
+        """
+        self.tsp = tsp
+        self.workers = workers or os.cpu_count()
+        self.chunk_size = chunk_size
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+
+    def evaluate(self, population):
+        """
+        ルートの総距離（巡回路として閉じたもの）をまとめて計算する。
+
+        :param population: (個体数, 都市数) のルート配列
+        :return: (個体数,) の総距離
+        """
+        fitness = np.empty(len(population))
+
+        def evaluate_chunk(start, stop):
+            fitness[start:stop] = self.tsp.compute_route_distances(population[start:stop], closed=True)
+
+        futures = [self._executor.submit(evaluate_chunk, start, stop)
+                   for start, stop in _chunks(len(population), self.workers, self.chunk_size)]
+        for future in futures:
+            future.result()
+        return fitness
+
+    def close(self):
+        self._executor.shutdown()
+
+
+class ProcessEvaluator:
+    """
+    集団を chunk_size 個体ずつに分け、プロセスプールで並列に総距離を計算する評価器。
+    集団と総距離は共有メモリ上のバッファを介して受け渡し、距離行列も共有メモリ（または memmap）で
+    参照するので、タスクごとに渡すのはバッファの名前と範囲だけになる。
+    """
+
+    def __init__(self, tsp, workers=None, chunk_size=None):
+        """
+        ProcessEvaluator クラスの初期化。ワーカープロセスを起動する。
+
+        :param tsp: 対象の TSP インスタンス
+        :param workers: プロセス数（省略時は CPU 数）
+        :param chunk_size: 1 タスクあたりの個体数（省略時は個体数をプロセス数で等分）
+        """
+        self.tsp = tsp
+        self.workers = workers or os.cpu_count()
+        self.chunk_size = chunk_size
+        distance_spec, self._shared_distance = share_distance(tsp)
+        self._population = None  # 集団を書き込む共有メモリ
+        self._fitness = None  # ワーカーが総距離を書き込む共有メモリ
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             initargs=(tsp.cities, distance_spec))
+
+    def evaluate(self, population):
+        """
+        ルートの総距離（巡回路として閉じたもの）をまとめて計算する。
+
+        :param population: (個体数, 都市数) のルート配列
+        :return: (個体数,) の総距離
+        """
+        n = len(population)
+        if n == 0:
+            return np.empty(0)
+        self._reserve(population.shape, population.dtype)
+        self._population.array[:n] = population
+
+        futures = [self._executor.submit(_evaluate_chunk, self._population.descriptor, self._fitness.descriptor,
+                                         start, stop)
+                   for start, stop in _chunks(n, self.workers, self.chunk_size)]
+        for future in futures:
+            future.result()
+        return self._fitness.array[:n].copy()
+
+    def _reserve(self, shape, dtype):
+        """ 集団と総距離の共有メモリが足りなければ確保し直す """
+        population = self._population
+        if (population is not None and population.array.shape[0] >= shape[0]
+                and population.array.shape[1:] == shape[1:] and population.array.dtype == dtype):
+            return
+        self._release_buffers()
+        self._population = SharedArray(shape, dtype)
+        self._fitness = SharedArray((shape[0],), np.float64)
+
+    def _release_buffers(self):
+        for buffer in (self._population, self._fitness):
+            if buffer is not None:
+                buffer.close()
+        self._population = self._fitness = None
+
+    def close(self):
+        self._executor.shutdown()
+        self._release_buffers()
+        if self._shared_distance is not None:
+            self._shared_distance.close()
+            self._shared_distance = None
+
+
+EVALUATORS = {
+    "serial": SerialEvaluator,
+    "threads": ThreadEvaluator,
+    "processes": ProcessEvaluator,
+}
+
+
+def _chunks(n, workers, chunk_size):
+    """ 0 ~ n を chunk_size ずつ（省略時は workers 等分）に区切った (開始, 終了) のリスト """
+    if chunk_size is None:
+        chunk_size = -(-n // workers)
+    chunk_size = max(chunk_size, 1)
+    return [(start, min(start + chunk_size, n)) for start in range(0, n, chunk_size)]
+
+
+_worker = {}  # ワーカープロセスごとの TSP と共有メモリ
+
+
+def _init_worker(cities, distance_spec):
+    """ ワーカープロセスで共有メモリ上の距離行列を参照する TSP を組み立てる """
+    distance, shm = attach_distance(distance_spec, cities)
+    _worker["tsp"] = TSP.from_cities(cities, distance=distance)
+    _worker["distance_shm"] = shm
+    _worker["buffers"] = {}
+
+
+def _attach_buffer(role, descriptor):
+    """ 共有メモリ上のバッファを参照する。親が確保し直していたら古いものを閉じて付け替える """
+    buffers = _worker["buffers"]
+    if role in buffers and buffers[role][0] != descriptor:
+        _, shm, array = buffers.pop(role)
+        del array
+        shm.close()
+    if role not in buffers:
+        shm, array = SharedArray.attach(descriptor)
+        buffers[role] = (descriptor, shm, array)
+    return buffers[role][2]
+
+
+def _evaluate_chunk(population_descriptor, fitness_descriptor, start, stop):
+    """ 共有メモリ上の集団の start ~ stop の総距離を計算し、共有メモリ上の総距離に書き込む """
+    population = _attach_buffer("population", population_descriptor)
+    fitness = _attach_buffer("fitness", fitness_descriptor)
+    fitness[start:stop] = _worker["tsp"].compute_route_distances(population[start:stop], closed=True)
@@ -0,0 +1,176 @@
+import multiprocessing
+
+import numpy as np
+
+from src.evaluation import ProcessEvaluator
+from src.shared import attach_distance, share_distance
+from src.tsp import TSP
+from src.tsp_ga import GeneticAlgorithm
+
+
+def ring_topology(n_islands, epoch, rng=None):
+    """ 島 i は島 i - 1 から移民を受け取る """
+    return [[(i - 1) % n_islands] for i in range(n_islands)]
+
+
+def fully_connected_topology(n_islands, epoch, rng=None):
+    """ 島 i は他のすべての島から移民を受け取る """
+    return [[j for j in range(n_islands) if j != i] for i in range(n_islands)]
+
+
+def random_topology(n_islands, epoch, rng=None):
+    """ 島 i は毎回ランダムに選んだ 1 つの島から移民を受け取る """
+    j = np.random.default_rng(rng).integers(n_islands - 1, size=n_islands)
+    return [[int(j[i]) if j[i] < i else int(j[i]) + 1] for i in range(n_islands)]
+
+
+TOPOLOGIES = {
+    "ring": ring_topology,
+    "fully_connected": fully_connected_topology,
+    "random": random_topology,
+}
+
+
+def _island_worker(connection, cities, distance_spec, seed_sequence, ga_args, ga_kwargs):
+    """
+    1 つの島の GA を実行する子プロセス。親からの ("evolve", 世代数, 移民のルート, 移民の総距離, 送り出す数) を
+    受けて移民で最悪の個体を置き換え、指定世代だけ進めてから上位の個体を返す。("stop",) で終了する。
+    """
+    distance, shm = attach_distance(distance_spec, cities)
+    tsp = TSP.from_cities(cities, distance=distance)
+    ga = GeneticAlgorithm(tsp, *ga_args, rng=np.random.default_rng(seed_sequence), **ga_kwargs)
+    try:
+        while True:
+            message = connection.recv()
+            if message[0] == "stop":
+                break
+            _, generations, migrants, migrant_fitness, n_emigrants = message
+            migrants = migrants[:len(ga.fitness) - 1]  # 集団の最良個体は残す
+            migrant_fitness = migrant_fitness[:len(migrants)]
+            if len(migrants) > 0:
+                worst = np.argsort(ga.fitness)[-len(migrants):]
+                ga.population[worst] = migrants
+                ga.fitness[worst] = migrant_fitness
+            for _ in range(generations):
+                ga.update()
+            best = np.argsort(ga.fitness)[:max(n_emigrants, 1)]  # 最良個体は移民がなくても返す
+            connection.send((ga.population[best].copy(), ga.fitness[best].copy(), ga.generation))
+    finally:
+        del ga, tsp, distance  # 共有メモリを閉じる前に参照を外す
+        if shm is not None:
+            shm.close()
+        connection.close()
+
+
+class IslandModel:
+    """
+    島モデルの並列 GA。島ごとに GeneticAlgorithm を別プロセスで実行し、
+    migration_interval 世代ごとに各島の上位 migrants 個体を topology に従って他の島へ移す。
+    距離行列は共有メモリ（または memmap ファイル）で全プロセスから読み取り専用で参照する。
+    """
+
+    def __init__(self, tsp, n_islands, size, muta, tour, migration_interval=10, migrants=2, topology="ring",
+                 seed=None, **ga_kwargs):
+        """
+        IslandModel クラスの初期化。島ごとのプロセスを起動する。
+
+        :param tsp: 対象の TSP インスタンス
+        :param n_islands: 島の数（プロセス数）
+        :param size: 島ごとの集団の個体数
+        :param muta: 突然変異率
+        :param tour: トーナメントサイズ
+        :param migration_interval: 移住の間隔（世代数）
+        :param migrants: 1 回の移住で各島から送り出す個体数
+        :param topology: 移住の経路。TOPOLOGIES のキー（"ring", "fully_connected", "random"）
+        :param seed: 乱数シード。各島と移住経路の乱数列は SeedSequence.spawn で分けて作る（省略時はランダム）
+        :param ga_kwargs: GeneticAlgorithm に渡すその他の引数（プロセスで評価する evaluator は使えない）
+        """
+        if topology not in TOPOLOGIES:
+            raise ValueError(f"Unknown topology: {topology}")
+        if n_islands < 2:
+            raise ValueError("Island model needs at least 2 islands")
+        evaluator = ga_kwargs.get("evaluator")
+        if evaluator == "processes" or isinstance(evaluator, ProcessEvaluator):
+            # 島はデーモンプロセスで動くので、その中から評価用の子プロセスを起動できない
+            raise ValueError("The island model cannot use a process evaluator; islands already run in "
+                             "separate processes (use \"serial\" or \"threads\")")
+        self.tsp = tsp
+        self.n_islands = n_islands
+        self.migration_interval = migration_interval
+        self.migrants = migrants
+        self.topology = TOPOLOGIES[topology]
+        self.generation = 0
+        self.epoch = 0
+        self.best_route = None
+        self.best_distance = np.inf
+
+        # 島ごとに独立した乱数列を作り、最後の 1 つは移住経路に使う
+        *island_seeds, topology_seed = np.random.SeedSequence(seed).spawn(n_islands + 1)
+        self.rng = np.random.default_rng(topology_seed)
+        distance_spec, self._shared = share_distance(tsp)
+        self._connections = []
+        self._processes = []
+        for i in range(n_islands):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_island_worker,
+                args=(child, tsp.cities, distance_spec, island_seeds[i], (size, muta, tour), ga_kwargs),
+                daemon=True,
+            )
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+
+        # 最初の移住までは移民なし
+        self._emigrants = [(np.empty((0, tsp.num_cities), dtype=np.int32), np.empty(0))] * n_islands
+
+    def run(self, generations):
+        """
+        全島を generations 世代進める。migration_interval 世代ごとに移住を行う。
+
+        :param generations: 進める世代数
+        :return: これまでの最良ルートとその総距離
+        """
+        remaining = generations
+        while remaining > 0:
+            step = min(self.migration_interval, remaining)
+            sources = self.topology(self.n_islands, self.epoch, self.rng)
+            for i, connection in enumerate(self._connections):
+                routes = np.concatenate([self._emigrants[j][0] for j in sources[i]])
+                fitness = np.concatenate([self._emigrants[j][1] for j in sources[i]])
+                connection.send(("evolve", step, routes, fitness, self.migrants))
+            self._emigrants = []
+            for connection in self._connections:
+                routes, fitness, _ = connection.recv()
+                self._emigrants.append((routes[:self.migrants], fitness[:self.migrants]))
+                if fitness[0] < self.best_distance:
+                    self.best_distance = float(fitness[0])
+                    self.best_route = routes[0].copy()
+            remaining -= step
+            self.generation += step
+            self.epoch += 1
+        return self.best_route, self.best_distance
+
+    def close(self):
+        """ 島のプロセスを止め、共有メモリを解放する """
+        for connection in self._connections:
+            try:
+                connection.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join()
+        for connection in self._connections:
+            connection.close()
+        self._connections = []
+        self._processes = []
+        if self._shared is not None:
+            self._shared.close()
+            self._shared = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
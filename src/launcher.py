@@ -1,7 +1,6 @@
 import pygame
-import numpy as np
 from config import Config
-from tsp import TSP
+from mo_tsp import MultiObjectiveTSP
 from src.visualization.main_screen import Main_Screen
 from src.visualization.setting_screen import Setting_Screen
 
@@ -20,12 +19,8 @@ class Launcher:
         self.setting_screen = Setting_Screen(self.screen)
 
         """ TSPの初期設定 """
-        self.tsp = None
-        for _ in range(Config.DEFAULT_OBJECTIVES):
-            self.tsp = TSP(num_cities=Config.DEFAULT_CITIES, coord_min=Config.COORD_MIN, coord_max=Config.COORD_MAX)
-
-        """ GAの初期設定 """
-        rng = np.random.default_rng(42)
+        self.tsp = MultiObjectiveTSP(num_cities=Config.DEFAULT_CITIES, num_objectives=Config.DEFAULT_OBJECTIVES,
+                                     coord_min=Config.COORD_MIN, coord_max=Config.COORD_MAX, rng=Config.SEED)
 
 
     def run(self):
@@ -34,15 +29,19 @@ class Launcher:
             events = pygame.event.get()
             if self.current_screen == Config.MAIN_SCREEN:
                 self.running, self.current_screen, self.screen = self.main_screen.handle_events(events, self.screen, self.tsp)
-                self.main_screen.draw(self.screen, self.tsp)
+                if self.current_screen == Config.MAIN_SCREEN:
+                    # メイン画面は変化した部分だけを転送する
+                    pygame.display.update(self.main_screen.draw(self.screen, self.tsp))
             if self.current_screen == Config.SETTINGS_SCREEN:
                 self.running, self.current_screen, self.screen = self.setting_screen.handle_events(events, self.screen, self.tsp)
                 self.setting_screen.draw(self.screen, self.tsp)
+                self.main_screen.invalidate()  # 戻ったときに全体を描き直す
+                pygame.display.flip()
             # self.screen.fill(Config.BG_COLOR)
             # self.handle_events()
             # self.draw()
-            pygame.display.flip()
             self.clock.tick(Config.FPS)
+        self.main_screen.close()
 
 if __name__ == "__main__":
     launcher = Launcher()
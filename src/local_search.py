@@ -0,0 +1,204 @@
+from collections import deque
+
+import numpy as np
+
+
+class LocalSearch:
+    """
+    近傍リストと don't-look bit を使った 2-opt / Or-opt 局所探索。
+    ルートは都市インデックスの順列で表し、最後の都市から最初の都市へ戻る巡回路とみなす。
+    各改善操作の評価は変化する辺だけを使う O(1) の差分計算で行う。
+    """
+
+    EPSILON = 1e-9  # これより大きく短くなる場合だけ改善とみなす
+
+    def __init__(self, tsp, k=8, method="knn", max_segment=3):
+        """
+        LocalSearch クラスの初期化。
+
+        :param tsp: 対象の TSP インスタンス
+        :param k: 1 都市あたりに調べる近傍候補の数
+        :param method: 近傍候補の作り方（TSP.candidate_neighbors の method）
+        :param max_segment: Or-opt で移動させる区間の最大長
+        """
+        self.tsp = tsp
+        self.max_segment = max_segment
+        self.edge = tsp.distance.edge
+        self.neighbors = tsp.candidate_neighbors(k, method).tolist()
+
+    def optimize(self, route):
+        """
+        2-opt と Or-opt で改善できなくなるまでルートを改善する。
+
+        :param route: 都市インデックスの順列
+        :return: 改善後のルート（int32 配列）
+        """
+        return self._search(route, two_opt=True, or_opt=True)
+
+    def two_opt(self, route):
+        """
+        2-opt だけで改善できなくなるまでルートを改善する。
+
+        :param route: 都市インデックスの順列
+        :return: 改善後のルート（int32 配列）
+        """
+        return self._search(route, two_opt=True, or_opt=False)
+
+    def or_opt(self, route):
+        """
+        Or-opt だけで改善できなくなるまでルートを改善する。
+
+        :param route: 都市インデックスの順列
+        :return: 改善後のルート（int32 配列）
+        """
+        return self._search(route, two_opt=False, or_opt=True)
+
+    def _search(self, route, two_opt, or_opt):
+        """
+        don't-look bit 付きのキューで、改善があった都市の周辺だけを繰り返し調べる。
+
+        :param route: 都市インデックスの順列
+        :param two_opt: 2-opt 近傍を使うか
+        :param or_opt: Or-opt 近傍を使うか
+        :return: 改善後のルート（int32 配列）
+        """
+        self.tour = [int(city) for city in route]
+        self.pos = [0] * len(self.tour)
+        for i, city in enumerate(self.tour):
+            self.pos[city] = i
+
+        if len(self.tour) >= 5:
+            queue = deque(self.tour)
+            active = [True] * len(self.tour)  # False が don't-look bit の立った状態
+            while queue:
+                a = queue.popleft()
+                active[a] = False
+                touched = None
+                if two_opt:
+                    touched = self._improve_two_opt(a)
+                if touched is None and or_opt:
+                    touched = self._improve_or_opt(a)
+                if touched is None:
+                    continue
+                for city in touched:  # 辺が変わった都市の don't-look bit を外す
+                    if not active[city]:
+                        active[city] = True
+                        queue.append(city)
+
+        return np.array(self.tour, dtype=np.int32)
+
+    def _succ(self, city):
+        """ ルート上で city の次の都市 """
+        return self.tour[(self.pos[city] + 1) % len(self.tour)]
+
+    def _pred(self, city):
+        """ ルート上で city の前の都市 """
+        return self.tour[self.pos[city] - 1]
+
+    def _improve_two_opt(self, a):
+        """
+        都市 a に接する辺を外す 2-opt 操作のうち、最初に見つかった改善操作を適用する。
+
+        :param a: 調べる都市
+        :return: 辺が変わった都市のリスト（改善がなければ None）
+        """
+        d = self.edge
+        for succ in (self._succ, self._pred):
+            b = succ(a)
+            d_ab = d(a, b)
+            for c in self.neighbors[a]:
+                d_ac = d(a, c)
+                if d_ac >= d_ab:
+                    break  # 候補は近い順。改善操作は新しい辺が外す辺より短くなる端点から必ず見つかる
+                e = succ(c)
+                if c == b or e == a:
+                    continue
+                delta = d_ac + d(b, e) - d_ab - d(c, e)
+                if delta < -self.EPSILON:
+                    self._exchange(a, b, c, e)
+                    return [a, b, c, e]
+        return None
+
+    def _improve_or_opt(self, a):
+        """
+        都市 a を端とする長さ 1 ~ max_segment の区間を、a が近傍候補 c と隣り合うように
+        別の位置へ（必要なら反転して）移す Or-opt 操作のうち、最初に見つかった改善操作を適用する。
+
+        :param a: 調べる都市
+        :return: 辺が変わった都市のリスト（改善がなければ None）
+        """
+        d = self.edge
+        n_cities = len(self.tour)
+        for length in range(1, min(self.max_segment, n_cities - 3) + 1):
+            for a_is_first in (True, False):
+                # ルートの向きに沿った区間 s1 .. sk と、その前後の都市 p, n
+                if a_is_first:
+                    s1 = a
+                    sk = self.tour[(self.pos[a] + length - 1) % n_cities]
+                else:
+                    s1 = self.tour[(self.pos[a] - length + 1) % n_cities]
+                    sk = a
+                p = self._pred(s1)
+                n = self._succ(sk)
+                removed_gain = d(p, s1) + d(sk, n) - d(p, n)
+                segment = {self.tour[(self.pos[s1] + i) % n_cities] for i in range(length)}
+
+                for c in self.neighbors[a]:
+                    d_ac = d(a, c)
+                    if d_ac >= removed_gain:
+                        break  # 利得が正の候補だけを調べる（候補は近い順）
+                    if c in segment:
+                        continue
+                    # a が c の隣に来るように挿入先の辺 (u, v) と区間の向きを決める
+                    for u, v in ((c, self._succ(c)), (self._pred(c), c)):
+                        if u == p and v == s1 or u == sk and v == n or v in segment or u in segment:
+                            continue
+                        # u s1..sk v（順向き）では u-s1, sk-v、u sk..s1 v（逆向き）では u-sk, s1-v の辺ができる
+                        reverse = (c == u) != a_is_first
+                        head, tail = (sk, s1) if reverse else (s1, sk)
+                        delta = d(u, head) + d(tail, v) - d(u, v) - removed_gain
+                        if delta < -self.EPSILON:
+                            self._move_segment(p, s1, sk, n, u, v, reverse)
+                            return [p, s1, sk, n, u, v]
+        return None
+
+    def _move_segment(self, p, s1, sk, n, u, v, reverse):
+        """
+        区間 s1 .. sk（前後が p, n）を辺 (u, v) の間に移す。3 回までの 2-opt 操作の組み合わせで実現する。
+
+        :param reverse: True なら u sk..s1 v、False なら u s1..sk v の向きで挿入する
+        """
+        self._exchange(p, s1, u, v)  # p u .. n sk .. s1 v
+        self._exchange(p, u, n, sk)  # p n .. u sk .. s1 v
+        if not reverse:
+            self._exchange(u, sk, s1, v)  # u s1 .. sk v
+
+    def _exchange(self, a, b, c, e):
+        """
+        辺 (a, b), (c, e) を外して (a, c), (b, e) をつなぐ 2-opt 操作を適用する。
+        (a, b) と (c, e) はルート上で同じ向きに並んでいる必要がある。
+        """
+        if a == c or b == e:
+            return
+        if self._succ(a) == b:
+            self._reverse(self.pos[b], self.pos[c])
+        else:
+            self._reverse(self.pos[a], self.pos[e])
+
+    def _reverse(self, i, j):
+        """
+        ルートの位置 i から j まで（巡回的に前向き）の区間を反転する。
+        補集合を反転しても同じ巡回路になるので、短い方を反転する。
+        """
+        tour, pos = self.tour, self.pos
+        n_cities = len(tour)
+        length = (j - i) % n_cities + 1
+        if 2 * length > n_cities:
+            i, j = (j + 1) % n_cities, (i - 1) % n_cities
+            length = n_cities - length
+        for _ in range(length // 2):
+            tour[i], tour[j] = tour[j], tour[i]
+            pos[tour[i]] = i
+            pos[tour[j]] = j
+            i = (i + 1) % n_cities
+            j = (j - 1) % n_cities
@@ -0,0 +1,139 @@
+import numpy as np
+
+from src.distance import METRICS, DenseDistance, LazyDistance
+from src.tsp import TSP
+
+
+class MultiObjectiveTSP(TSP):
+    """
+    多目的巡回セールスマン問題を扱うクラス。
+    都市は共通で、目的ごとに別の座標レイヤー（目的 0 は画面に表示する都市座標、それ以外はランダムな座標）を持ち、
+    各レイヤーでの距離をそれぞれの目的とする。
+    距離は (目的数, N, N) の 1 つの連続した配列にまとめて保持し（"lazy" の場合は座標から都度計算し）、
+    複数ルートの全目的を 1 回のインデックス参照で評価する。
+    単一目的の処理（GA、局所探索、描画）からは目的 0 の TSP として扱える。
+    """
+
+    LAZY_CHUNK_ELEMENTS = 1 << 22  # "lazy" の評価で一度に座標を集める辺の数（目的数 × ルート数 × ルート長）の上限
+
+    def __init__(self, num_cities, num_objectives, coord_min, coord_max, distance_backend="auto",
+                 distance_dtype="float64", distance_metric="euclidean", rng=None):
+        """
+        MultiObjectiveTSP クラスの初期化。
+
+        :param num_cities: 都市の数
+        :param num_objectives: 目的の数
+        :param coord_min: 都市座標の最小値
+        :param coord_max: 都市座標の最大値
+        :param distance_backend: 距離の計算方法。"dense" は (目的数, N, N) の距離行列を事前計算、
+                                 "lazy" は座標から都度計算、"auto" は目的数 × N² が DENSE_MAX_CITIES² 以下なら "dense"
+        :param distance_dtype: "dense" の場合の距離行列の格納形式（"float64", "float32", "int32"）
+        :param distance_metric: 距離の定義。distance.METRICS のキー
+        :param rng: 都市と座標レイヤーの配置に使う乱数生成器。numpy.random.Generator かそのシード
+        """
+        if num_objectives < 1:
+            raise ValueError(f"num_objectives must be at least 1, got {num_objectives}")
+        self.num_objectives = num_objectives  # 目的の数
+        self.layers = None  # 目的ごとの都市座標 (目的数, N, 2) 配列
+        self.objective_matrices = None  # 目的ごとの距離行列 (目的数, N, N) 配列（"lazy" の場合は None）
+        super().__init__(num_cities, coord_min, coord_max, distance_backend=distance_backend,
+                         distance_dtype=distance_dtype, distance_metric=distance_metric, rng=rng)
+
+    @classmethod
+    def from_layers(cls, layers, start_city=None, distance_backend="auto", distance_dtype="float64",
+                    distance_metric="euclidean"):
+        """
+        与えられた座標レイヤーから MultiObjectiveTSP インスタンスを作る。
+
+        :param layers: 目的ごとの都市座標の (目的数, N, 2) 配列。layers[0] を都市座標として使う
+        :param start_city: スタート都市の座標
+        :return: MultiObjectiveTSP
+        """
+        layers = np.asarray(layers)
+        if layers.ndim != 3 or layers.shape[2] != 2:
+            raise ValueError(f"layers must have shape (objectives, cities, 2), got {layers.shape}")
+        tsp = cls.__new__(cls)
+        tsp.num_objectives = len(layers)
+        tsp.layers = layers.astype(np.float64)
+        tsp.objective_matrices = None
+        tsp.cities = layers[0]
+        tsp.num_cities = layers.shape[1]
+        tsp.coord_min = layers.min()
+        tsp.coord_max = layers.max()
+        tsp.min_distance = None
+        tsp.start_city = start_city
+        tsp._set_distance(tsp._create_objective_distances(distance_backend, distance_dtype, distance_metric))
+        return tsp
+
+    def _create_distance(self, distance_backend, row_cache_size, distance_dtype, distance_path, distance_metric):
+        """
+        目的 0 以外の座標レイヤーを生成し、全目的の距離を用意する。
+
+        :return: 目的 0 の距離バックエンド（DenseDistance または LazyDistance）
+        """
+        extra = self.rng.integers(self.coord_min, self.coord_max, size=(self.num_objectives - 1, self.num_cities, 2))
+        self.layers = np.concatenate([np.asarray(self.cities, dtype=np.float64)[None], extra.astype(np.float64)])
+        return self._create_objective_distances(distance_backend, distance_dtype, distance_metric)
+
+    def _create_objective_distances(self, distance_backend, distance_dtype, distance_metric):
+        """
+        全目的の距離を用意する。"dense" の場合は (目的数, N, N) の配列に各目的の距離行列を書き込む。
+
+        :param distance_backend: "auto", "dense", "lazy" のいずれか
+        :param distance_dtype: "dense" の場合の距離行列の格納形式
+        :param distance_metric: 距離の定義
+        :return: 目的 0 の距離バックエンド（DenseDistance または LazyDistance）
+        """
+        if distance_metric not in METRICS:
+            raise ValueError(f"Unknown distance metric: {distance_metric}")
+        self.distance_metric = distance_metric
+        if distance_backend == "auto":
+            dense = self.num_objectives * self.num_cities ** 2 <= self.DENSE_MAX_CITIES ** 2
+            distance_backend = "dense" if dense else "lazy"
+        if distance_backend == "dense":
+            self.objective_matrices = np.empty((self.num_objectives, self.num_cities, self.num_cities),
+                                               dtype=distance_dtype)
+            distances = [DenseDistance(layer, metric=distance_metric, out=matrix)
+                         for layer, matrix in zip(self.layers, self.objective_matrices)]
+            return distances[0]  # 目的 0 の距離行列は objective_matrices[0] そのもの
+        if distance_backend == "lazy":
+            self.objective_matrices = None
+            return LazyDistance(self.layers[0], metric=distance_metric)
+        raise ValueError(f"Unknown distance backend: {distance_backend}")
+
+    def compute_route_objectives(self, routes, closed=False):
+        """
+        複数ルートの全目的の総距離をまとめて計算する。
+
+        :param routes: (ルート数, ルート長) のインデックス配列
+        :param closed: True の場合、各ルートの最後の都市から最初の都市へ戻る辺も加える
+        :return: 各ルートの各目的の総距離を格納した (ルート数, 目的数) の配列
+        """
+        routes = np.asarray(routes, dtype=np.intp)
+        if closed and routes.shape[1] > 1:
+            start, end = routes, np.roll(routes, -1, axis=1)
+        else:
+            start, end = routes[:, :-1], routes[:, 1:]
+
+        if self.objective_matrices is not None:
+            # (目的数, ルート数, 辺数) を 1 回で集めて辺方向に足す
+            return self.objective_matrices[:, start, end].sum(axis=2, dtype=np.float64).T
+
+        objectives = np.empty((len(routes), self.num_objectives), dtype=np.float64)
+        metric = METRICS[self.distance_metric]
+        chunk = max(self.LAZY_CHUNK_ELEMENTS // max(self.num_objectives * start.shape[1], 1), 1)
+        for i in range(0, len(routes), chunk):
+            a = self.layers[:, start[i:i + chunk]]  # (目的数, ルート数, 辺数, 2)
+            b = self.layers[:, end[i:i + chunk]]
+            objectives[i:i + chunk] = metric(a, b).sum(axis=2).T
+        return objectives
+
+    def compute_route_objective(self, route, closed=False):
+        """
+        与えられたルートの全目的の総距離を計算する。
+
+        :param route: 訪れる都市のインデックスのリスト
+        :param closed: True の場合、最後の都市から最初の都市へ戻る辺も加える
+        :return: 各目的の総距離を格納した (目的数,) の配列
+        """
+        return self.compute_route_objectives(np.asarray(route)[None], closed=closed)[0]
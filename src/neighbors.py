@@ -0,0 +1,109 @@
+import numpy as np
+from scipy.spatial import cKDTree, Delaunay, QhullError
+
+
+def knn_candidates(cities, k):
+    """
+    各都市について近い順に k 都市を求める。
+
+    :param cities: 都市座標の (N, 2) 配列
+    :param k: 候補数
+    :return: (N, k) の int32 配列。i 行目は都市 i に近い順の都市インデックス
+    """
+    cities = np.asarray(cities, dtype=np.float64)
+    k = min(k, len(cities) - 1)
+    if k <= 0:
+        return np.empty((len(cities), 0), dtype=np.int32)
+    _, index = cKDTree(cities).query(cities, k=k + 1)
+    return index[:, 1:].reshape(len(cities), k).astype(np.int32)  # 0 列目は自分自身
+
+
+def quadrant_candidates(cities, k):
+    """
+    各都市の周囲 4 象限からそれぞれ近い順に k/4 都市ずつ選び、足りない分は最近傍で補う。
+    都市がクラスタ状に分布している場合でも、離れたクラスタへの辺が候補に残る。
+
+    :param cities: 都市座標の (N, 2) 配列
+    :param k: 候補数
+    :return: (N, k) の int32 配列
+    """
+    cities = np.asarray(cities, dtype=np.float64)
+    k = min(k, len(cities) - 1)
+    if k <= 0:
+        return np.empty((len(cities), 0), dtype=np.int32)
+    per_quadrant = -(-k // 4)
+    m = min(4 * k, len(cities) - 1)
+    _, index = cKDTree(cities).query(cities, k=m + 1)
+    index = index[:, 1:].reshape(len(cities), m)
+
+    # 近傍都市がどの象限にあるかを求め、象限ごとに近い順の順位を付ける
+    offset = cities[index] - cities[:, None, :]
+    quadrant = (offset[..., 0] >= 0) + 2 * (offset[..., 1] >= 0)
+    one_hot = quadrant[..., None] == np.arange(4)
+    rank = np.take_along_axis(np.cumsum(one_hot, axis=1), quadrant[..., None], axis=2)[..., 0] - 1
+
+    preferred = np.where(rank < per_quadrant, index, -1)
+    return _first_unique(np.concatenate([preferred, index], axis=1), k)
+
+
+def delaunay_candidates(cities, k):
+    """
+    Delaunay 三角形分割で隣接する都市を近い順に最大 k 都市選び、足りない分は最近傍で補う。
+
+    :param cities: 都市座標の (N, 2) 配列
+    :param k: 候補数
+    :return: (N, k) の int32 配列
+    """
+    cities = np.asarray(cities, dtype=np.float64)
+    nearest = knn_candidates(cities, k)
+    k = nearest.shape[1]
+    if len(cities) < 4:
+        return nearest
+    try:
+        indptr, indices = Delaunay(cities).vertex_neighbor_vertices
+    except QhullError:
+        return nearest  # 全都市が一直線上にある場合など
+
+    # 隣接リストを -1 埋めの (N, 最大次数) 配列にし、距離順に並べる
+    degree = np.diff(indptr)
+    rows = np.repeat(np.arange(len(cities)), degree)
+    cols = np.arange(len(indices)) - np.repeat(indptr[:-1], degree)
+    adjacent = np.full((len(cities), degree.max()), -1, dtype=np.int64)
+    adjacent[rows, cols] = indices
+    distance = np.linalg.norm(cities[adjacent] - cities[:, None, :], axis=2)
+    distance[adjacent < 0] = np.inf
+    adjacent = np.take_along_axis(adjacent, np.argsort(distance, axis=1, kind='stable'), axis=1)
+
+    return _first_unique(np.concatenate([adjacent, nearest], axis=1), k)
+
+
+CANDIDATE_METHODS = {
+    "knn": knn_candidates,
+    "quadrant": quadrant_candidates,
+    "delaunay": delaunay_candidates,
+}
+
+
+def _first_unique(candidates, k):
+    """
+    各行から -1 と重複を除き、先頭から k 個を取り出す。
+
+    :param candidates: (N, m) の都市インデックス配列（-1 は空き）
+    :param k: 取り出す個数
+    :return: (N, k) の int32 配列（k 個に満たない行は -1 で埋める）
+    """
+    n, m = candidates.shape
+    # (値, 位置) の順に並べ替え、同じ値の 2 個目以降を重複とみなす
+    order = np.argsort(candidates * m + np.arange(m), axis=1, kind='stable')
+    ordered = np.take_along_axis(candidates, order, axis=1)
+    duplicate = np.zeros_like(ordered, dtype=bool)
+    duplicate[:, 1:] = ordered[:, 1:] == ordered[:, :-1]
+    keep = np.empty_like(duplicate)
+    np.put_along_axis(keep, order, ~duplicate, axis=1)
+    keep &= candidates >= 0
+
+    # 残す要素を元の順序のまま左に詰める
+    position = np.where(keep, np.arange(m), m + np.arange(m))
+    packed = np.take_along_axis(candidates, np.argsort(position, axis=1, kind='stable')[:, :k], axis=1)
+    packed[np.arange(k) >= keep.sum(axis=1)[:, None]] = -1
+    return packed.astype(np.int32)
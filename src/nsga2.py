@@ -0,0 +1,206 @@
+import numpy as np
+
+from src.tsp_ga import CROSSOVERS, MUTATIONS
+
+
+def dominance_matrix(objectives):
+    """
+    支配関係の行列。目的ごとに (個体数, 個体数) の比較を 1 回ずつ行って組み合わせる。
+    i が j を支配するのは「全目的で i が j 以下」かつ「全目的で j が i 以下ではない」ときなので、
+    比較は <= の 1 種類だけで済む。
+
+    :param objectives: (個体数, 目的数) の目的値（小さいほどよい）
+    :return: (個体数, 個体数) の bool 配列。[i, j] は個体 i が個体 j を支配するとき True
+    """
+    size = len(objectives)
+    not_worse = np.ones((size, size), dtype=bool)  # 全目的で i が j 以下
+    buffer = np.empty((size, size), dtype=bool)
+    for values in objectives.T:
+        np.less_equal(values[:, None], values[None, :], out=buffer)
+        not_worse &= buffer
+    np.logical_not(not_worse.T, out=buffer)
+    buffer &= not_worse
+    return buffer
+
+
+def non_dominated_sort(objectives):
+    """
+    非優越ソート。支配されている数が 0 の個体を前線として取り出し、その前線が支配する個体の数を
+    まとめて減らす処理を、前線ごとに繰り返す。
+
+    :param objectives: (個体数, 目的数) の目的値（小さいほどよい）
+    :return: 各個体の前線番号（0 が第 1 前線）を格納した (個体数,) の配列
+    """
+    dominates = dominance_matrix(objectives)
+    count = dominates.view(np.uint8).sum(axis=0, dtype=np.int64)  # 各個体を支配している個体の数
+    rank = np.full(len(objectives), -1, dtype=np.int64)
+    front = np.flatnonzero(count == 0)
+    r = 0
+    while len(front) > 0:
+        rank[front] = r
+        count -= dominates[front].view(np.uint8).sum(axis=0, dtype=np.int64)
+        count[front] = -1  # 取り出し済みの個体は二度と選ばない
+        front = np.flatnonzero(count == 0)
+        r += 1
+    return rank
+
+
+def crowding_distance(objectives, rank):
+    """
+    混雑距離。全前線を (前線番号, 目的値) でまとめて並べ替え、目的ごとに前後の個体との差を足す。
+    各前線の両端の個体は無限大になる。
+
+    :param objectives: (個体数, 目的数) の目的値
+    :param rank: 各個体の前線番号
+    :return: (個体数,) の混雑距離
+    """
+    size = len(objectives)
+    distance = np.zeros(size, dtype=np.float64)
+    if size == 0:
+        return distance
+    for values in objectives.T:
+        order = np.lexsort((values, rank))
+        sorted_values = values[order]
+        sorted_rank = rank[order]
+        starts = np.flatnonzero(np.r_[True, sorted_rank[1:] != sorted_rank[:-1]])
+        ends = np.r_[starts[1:], size] - 1
+        span = np.repeat(sorted_values[ends] - sorted_values[starts], np.diff(np.r_[starts, size]))
+
+        gap = np.full(size, np.inf)
+        inner = np.ones(size, dtype=bool)
+        inner[starts] = inner[ends] = False  # 前線の両端
+        index = np.flatnonzero(inner)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gap[index] = (sorted_values[index + 1] - sorted_values[index - 1]) / span[index]
+        gap[np.isnan(gap)] = 0.0  # 前線内の値がすべて同じ目的は寄与しない
+        distance[order] += gap
+    return distance
+
+
+class NSGA2:
+    """
+    多目的 TSP を解く NSGA-II。
+    集団は GeneticAlgorithm と同じく (個体数, 都市数) の int32 配列で持ち、各個体の目的値は
+    (個体数, 目的数) の配列で持つ。交叉と突然変異は tsp_ga の演算子をそのまま使う。
+    """
+
+    def __init__(self, tsp, size, muta, tour=2, crossover="ox", mutation="inversion", crossover_rate=1.0,
+                 archive=None, rng=None):
+        """
+        NSGA2 クラスの初期化。
+
+        :param tsp: 対象の MultiObjectiveTSP インスタンス
+        :param size: 集団の個体数
+        :param muta: 突然変異率
+        :param tour: トーナメントサイズ（前線番号、混雑距離の順で比べる）
+        :param crossover: 交叉の種類。tsp_ga.CROSSOVERS のキー
+        :param mutation: 突然変異の種類。tsp_ga.MUTATIONS のキー
+        :param crossover_rate: 交叉率。交叉しなかった子は親の複製になる
+        :param archive: 指定した場合は毎世代の第 1 前線をこの ParetoArchive に追加する（2 目的のみ）
+        :param rng: 乱数生成器。numpy.random.Generator かそのシード（省略時はランダムなシード）
+        """
+        if crossover not in CROSSOVERS:
+            raise ValueError(f"Unknown crossover: {crossover}")
+        if mutation not in MUTATIONS:
+            raise ValueError(f"Unknown mutation: {mutation}")
+        self.tsp = tsp
+        self.population_size = size
+        self.mutation_rate = muta
+        self.crossover_rate = crossover_rate
+        self.tournament_size = tour
+        self.nr_of_cities = tsp.num_cities
+        self.crossover = CROSSOVERS[crossover]
+        self.mutation = MUTATIONS[mutation]
+        self.archive = archive
+        self.rng = np.random.default_rng(rng)
+        self.population = None  # (個体数, 都市数) のルート配列
+        self.objectives = None  # (個体数, 目的数) の各ルートの総距離
+        self.rank = None  # 各個体の前線番号
+        self.crowding = None  # 各個体の混雑距離
+        self.generation = 0
+        self.evaluations = 0  # これまでに目的値を計算した個体数
+
+        self._initialize()
+
+    def _initialize(self):
+        population = np.argsort(self.rng.random((self.population_size, self.nr_of_cities)), axis=1)
+        self.population = population.astype(np.int32)
+        self.objectives = self.evaluate(self.population)
+        self.rank = non_dominated_sort(self.objectives)
+        self.crowding = crowding_distance(self.objectives, self.rank)
+        self._update_archive()
+
+    def evaluate(self, population):
+        """
+        ルート（巡回路として閉じたもの）の全目的の総距離をまとめて計算する。
+
+        :param population: (個体数, 都市数) のルート配列
+        :return: (個体数, 目的数) の総距離
+        """
+        self.evaluations += len(population)
+        return self.tsp.compute_route_objectives(population, closed=True)
+
+    def select_routes(self, n):
+        """
+        混雑度トーナメント選択。前線番号が小さく、同じ前線なら混雑距離が大きい個体を勝たせる。
+
+        :param n: 選ぶ個体の数
+        :return: 選ばれた個体のインデックス配列
+        """
+        position = np.empty(len(self.rank), dtype=np.int64)
+        position[np.lexsort((-self.crowding, self.rank))] = np.arange(len(self.rank))  # 0 が最良
+        contestants = self.rng.integers(0, len(self.rank), size=(n, self.tournament_size))
+        winners = np.argmin(position[contestants], axis=1)
+        return contestants[np.arange(n), winners]
+
+    def breed(self):
+        """
+        親集団と同じ数の子を作る。
+
+        :return: (個体数, 都市数) の子のルート配列
+        """
+        n_children = self.population_size
+        parents = self.select_routes(2 * n_children)
+        fathers, mothers = parents[:n_children], parents[n_children:]
+        children = self.population[fathers]
+
+        crossover_draw, mutation_draw = self.rng.random((2, n_children))
+        crossed = np.flatnonzero(crossover_draw < self.crossover_rate)
+        children[crossed] = self.crossover(children[crossed], self.population[mothers[crossed]], self.tsp, self.rng)
+
+        # 突然変異が返す目的 0 の差分は使わず、子は全目的をまとめて計算し直す
+        mutated = np.flatnonzero(mutation_draw < self.mutation_rate)
+        self.mutation(children, mutated, self.tsp, self.rng)
+        return children
+
+    def update(self):
+        """ 親と子を合わせた集団から、前線番号、混雑距離の順で次の世代を選ぶ """
+        children = self.breed()
+        population = np.concatenate([self.population, children])
+        objectives = np.concatenate([self.objectives, self.evaluate(children)])
+        rank = non_dominated_sort(objectives)
+        crowding = crowding_distance(objectives, rank)
+
+        survivors = np.lexsort((-crowding, rank))[:self.population_size]
+        self.population = population[survivors]
+        self.objectives = objectives[survivors]
+        self.rank = rank[survivors]
+        self.crowding = crowding[survivors]
+        self.generation += 1
+        self._update_archive()
+
+    def _update_archive(self):
+        if self.archive is not None:
+            self.archive.add(*self.get_pareto_front())
+
+    def close(self):
+        """ GeneticAlgorithm と同じ使い方ができるようにするためのもの（止めるものはない） """
+
+    def get_pareto_front(self):
+        """
+        現在の集団の第 1 前線。
+
+        :return: (ルート配列, 目的値の配列)
+        """
+        front = np.flatnonzero(self.rank == 0)
+        return self.population[front], self.objectives[front]
@@ -0,0 +1,207 @@
+import multiprocessing
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+from src.shared import SharedArray, attach_distance, share_distance
+from src.tsp import TSP
+from src.tsp_ga import GeneticAlgorithm
+
+# 最適化の途中経過（世代数、その時点の最良ルート、その総距離）
+Snapshot = namedtuple('Snapshot', 'generation route distance')
+
+
+class SnapshotBuffer:
+    """
+    プロセス間で最新の Snapshot を受け渡す共有メモリ上のダブルバッファ。
+    書き込み側は使っていない方のスロットに書いてから latest を切り替え、読み込み側は
+    スロットのシーケンス番号が読む前後で変わっていないことを確かめる（seqlock）。ロックは使わない。
+    """
+
+    def __init__(self, n_cities):
+        """
+        SnapshotBuffer クラスの初期化。共有メモリを確保する。
+
+        :param n_cities: 都市数
+        """
+        self._routes = SharedArray((2, n_cities), np.int32)
+        self._meta = SharedArray((2, 3), np.float64)  # スロットごとの (シーケンス番号, 世代数, 総距離)
+        self._latest = SharedArray((1,), np.int64)  # 最新のスロット（-1 はまだ何もない）
+        self._meta.array[:] = 0
+        self._latest.array[0] = -1
+        self._owner = True
+        self.routes, self.meta, self.latest = self._routes.array, self._meta.array, self._latest.array
+
+    @property
+    def descriptor(self):
+        """ 子プロセスで attach するための情報 """
+        return self._routes.descriptor, self._meta.descriptor, self._latest.descriptor
+
+    @classmethod
+    def attach(cls, descriptor):
+        """
+        別プロセスで作られた SnapshotBuffer を参照する。
+
+        :param descriptor: SnapshotBuffer.descriptor
+        :return: SnapshotBuffer
+        """
+        buffer = cls.__new__(cls)
+        buffer._owner = False
+        (buffer._routes_shm, buffer.routes), (buffer._meta_shm, buffer.meta), (buffer._latest_shm, buffer.latest) = (
+            SharedArray.attach(part) for part in descriptor)
+        return buffer
+
+    def publish(self, generation, route, distance):
+        """
+        最新の途中経過を書き込む（書き込み側は 1 つだけ）。
+
+        :param generation: 世代数
+        :param route: 最良ルート
+        :param distance: 最良ルートの総距離
+        """
+        slot = 1 - int(self.latest[0]) if self.latest[0] >= 0 else 0
+        self.meta[slot, 0] += 1  # 奇数の間は書き込み中
+        self.routes[slot] = route
+        self.meta[slot, 1:] = generation, distance
+        self.meta[slot, 0] += 1
+        self.latest[0] = slot
+
+    def read(self):
+        """
+        最新の途中経過を読む。
+
+        :return: Snapshot（まだ何も書き込まれていなければ None）
+        """
+        while True:
+            slot = int(self.latest[0])
+            if slot < 0:
+                return None
+            sequence = self.meta[slot, 0]
+            if sequence % 2 == 1:
+                continue
+            route = self.routes[slot].copy()
+            generation, distance = self.meta[slot, 1:]
+            if self.meta[slot, 0] == sequence:
+                return Snapshot(int(generation), route, float(distance))
+
+    def close(self):
+        """ 共有メモリを閉じる（作成したプロセスでは解放もする） """
+        del self.routes, self.meta, self.latest
+        if self._owner:
+            for shared in (self._routes, self._meta, self._latest):
+                shared.close()
+        else:
+            for shm in (self._routes_shm, self._meta_shm, self._latest_shm):
+                shm.close()
+
+
+def _optimizer_process(stop, cities, distance_spec, buffer_descriptor, seed_sequence, ga_args, ga_kwargs):
+    """ 別プロセスで GA を回し、世代ごとに最良ルートを SnapshotBuffer に書き込む """
+    distance, shm = attach_distance(distance_spec, cities)
+    buffer = SnapshotBuffer.attach(buffer_descriptor)
+    ga = GeneticAlgorithm(TSP.from_cities(cities, distance=distance), *ga_args,
+                          rng=np.random.default_rng(seed_sequence), **ga_kwargs)
+    try:
+        while not stop.is_set():
+            ga.update()
+            buffer.publish(ga.generation, ga.get_best_route(), ga.get_best_distance())
+    finally:
+        ga.close()
+        del ga, distance
+        buffer.close()
+        if shm is not None:
+            shm.close()
+
+
+class OptimizerRunner:
+    """
+    GA を画面の描画とは別のスレッドまたはプロセスで実行し、最新の途中経過だけを受け渡す。
+    描画側は毎フレーム latest() を呼んで、その時点の最良ルートを表示するだけでよい。
+    """
+
+    def __init__(self, tsp, size, muta, tour, mode="process", seed=None, **ga_kwargs):
+        """
+        OptimizerRunner クラスの初期化。
+
+        :param tsp: 対象の TSP インスタンス
+        :param size: 集団の個体数
+        :param muta: 突然変異率
+        :param tour: トーナメントサイズ
+        :param mode: "thread"（同じプロセスの別スレッド）または "process"（別プロセス、GIL の影響を受けない）
+        :param seed: 乱数シード。start のたびに SeedSequence.spawn で新しい乱数列を作る（省略時はランダム）
+        :param ga_kwargs: GeneticAlgorithm に渡すその他の引数
+        """
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown optimizer mode: {mode}")
+        self.tsp = tsp
+        self.mode = mode
+        self.ga_args = (size, muta, tour)
+        self.ga_kwargs = ga_kwargs
+        self._seed_sequence = np.random.SeedSequence(seed)
+        self._worker = None
+        self._stop = None
+        self._snapshot = None  # "thread" の場合の最新の途中経過（参照の差し替えだけで受け渡す）
+        self._buffer = None  # "process" の場合の共有メモリ
+        self._shared_distance = None
+
+    @property
+    def running(self):
+        return self._worker is not None
+
+    def start(self):
+        """ 最適化を開始する """
+        if self.running:
+            return
+        self._snapshot = None
+        seed_sequence, = self._seed_sequence.spawn(1)
+        if self.mode == "thread":
+            self._stop = threading.Event()
+            self._worker = threading.Thread(target=self._run_thread, args=(seed_sequence,), daemon=True)
+        else:
+            self._stop = multiprocessing.Event()
+            self._buffer = SnapshotBuffer(self.tsp.num_cities)
+            distance_spec, self._shared_distance = share_distance(self.tsp)
+            self._worker = multiprocessing.Process(
+                target=_optimizer_process,
+                args=(self._stop, self.tsp.cities, distance_spec, self._buffer.descriptor,
+                      seed_sequence, self.ga_args, self.ga_kwargs),
+                daemon=True,
+            )
+        self._worker.start()
+
+    def _run_thread(self, seed_sequence):
+        ga = GeneticAlgorithm(self.tsp, *self.ga_args, rng=np.random.default_rng(seed_sequence), **self.ga_kwargs)
+        try:
+            while not self._stop.is_set():
+                ga.update()
+                self._snapshot = Snapshot(ga.generation, ga.get_best_route().copy(), float(ga.get_best_distance()))
+        finally:
+            ga.close()
+
+    def latest(self):
+        """
+        最新の途中経過を返す。待ち合わせはしない。
+
+        :return: Snapshot（まだ 1 世代も終わっていなければ None）
+        """
+        if self._buffer is not None:
+            snapshot = self._buffer.read()
+            if snapshot is not None:
+                self._snapshot = snapshot
+        return self._snapshot
+
+    def stop(self):
+        """ 最適化を止める。最後の途中経過は latest() で引き続き取得できる """
+        if not self.running:
+            return
+        self._stop.set()
+        self._worker.join()
+        self._worker = None
+        if self._buffer is not None:
+            self.latest()
+            self._buffer.close()
+            self._buffer = None
+        if self._shared_distance is not None:
+            self._shared_distance.close()
+            self._shared_distance = None
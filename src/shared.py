@@ -0,0 +1,96 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.distance import DenseDistance, LazyDistance
+
+
+class SharedArray:
+    """
+    multiprocessing.shared_memory 上に置いた NumPy 配列。
+    descriptor を子プロセスに渡せば、配列をコピーせずに同じメモリを参照できる。
+    """
+
+    def __init__(self, shape, dtype, array=None):
+        """
+        SharedArray クラスの初期化。共有メモリを確保し、array があればその内容をコピーする。
+
+        :param shape: 配列の形
+        :param dtype: 配列の型
+        :param array: 初期値としてコピーする配列
+        """
+        dtype = np.dtype(dtype)
+        size = max(int(np.prod(shape)) * dtype.itemsize, 1)
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf)
+        if array is not None:
+            self.array[...] = array
+
+    @classmethod
+    def from_array(cls, array):
+        """
+        既存の配列を共有メモリにコピーする。
+
+        :param array: コピー元の配列
+        :return: SharedArray
+        """
+        return cls(array.shape, array.dtype, array)
+
+    @property
+    def descriptor(self):
+        """ 子プロセスで attach するための (名前, 形, 型) """
+        return self.shm.name, self.array.shape, self.array.dtype.str
+
+    @staticmethod
+    def attach(descriptor):
+        """
+        別プロセスで作られた共有メモリ上の配列を参照する。
+        返した SharedMemory を保持している間だけ配列が有効。
+
+        :param descriptor: SharedArray.descriptor
+        :return: (SharedMemory, 配列)
+        """
+        name, shape, dtype = descriptor
+        shm = shared_memory.SharedMemory(name=name)
+        return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+    def close(self):
+        """ 共有メモリを解放する（作成したプロセスで一度だけ呼ぶ） """
+        del self.array
+        self.shm.close()
+        self.shm.unlink()
+
+
+def share_distance(tsp):
+    """
+    子プロセスで同じ距離バックエンドを組み立てるための情報を作る。
+    memmap の距離行列はファイル名を、メモリ上の距離行列は共有メモリを渡し、行列自体は pickle しない。
+
+    :param tsp: 対象の TSP インスタンス
+    :return: (子プロセスに渡す情報, 親プロセスで保持する SharedArray または None)
+    """
+    if isinstance(tsp.distance, LazyDistance):
+        return ("lazy", (tsp.distance.row_cache_size, tsp.distance.metric)), None
+    matrix = tsp.distance.matrix
+    if isinstance(matrix, np.memmap) and matrix.filename is not None:
+        return ("memmap", matrix.filename), None
+    shared = SharedArray.from_array(matrix)
+    return ("shared", shared.descriptor), shared
+
+
+def attach_distance(spec, cities):
+    """
+    share_distance で作った情報から子プロセス側の距離バックエンドを組み立てる。
+
+    :param spec: share_distance が返した子プロセス用の情報
+    :param cities: 都市座標の (N, 2) 配列
+    :return: (距離バックエンド, 保持しておく SharedMemory または None)
+    """
+    kind, value = spec
+    if kind == "lazy":
+        row_cache_size, metric = value
+        return LazyDistance(cities, row_cache_size=row_cache_size, metric=metric), None
+    if kind == "memmap":
+        return DenseDistance.load(value), None
+    shm, matrix = SharedArray.attach(value)
+    return DenseDistance.from_matrix(matrix), shm
@@ -1,70 +1,234 @@
 import math
+import os
 import numpy as np
-from scipy.spatial.distance import cdist
+from scipy.spatial import cKDTree
 from typing import List, Tuple
 
+from src.distance import DenseDistance, LazyDistance
+from src.neighbors import CANDIDATE_METHODS
+
 class TSP:
     """
     巡回セールスマン問題 (Traveling Salesman Problem, TSP) を扱うクラス。
     ランダムに都市を配置し、都市間の距離を計算する。
     """
 
-    def __init__(self, num_cities, coord_min, coord_max):
+    BATCH_MIN_SIZE = 256  # 1 回の候補生成で引く最小の点数
+    BATCH_MAX_SIZE = 65536  # 1 回の候補生成で引く最大の点数
+    MAX_STALL_ROUNDS = 50  # 新しい都市が 1 つも置けない回数がこれを超えたら諦める
+    DENSE_MAX_CITIES = 10000  # distance_backend="auto" で距離行列を事前計算する都市数の上限
+
+    def __init__(self, num_cities, coord_min, coord_max, distance_backend="auto", row_cache_size=0,
+                 distance_dtype="float64", distance_path=None, distance_metric="euclidean", rng=None):
         """
         TSP クラスの初期化。
 
         :param num_cities: 都市の数
         :param coord_min: 都市座標の最小値
         :param coord_max: 都市座標の最大値
+        :param distance_backend: 距離の計算方法。"dense" は距離行列を事前計算、"lazy" は座標から都度計算、
+                                 "auto" は都市数が DENSE_MAX_CITIES 以下なら "dense"、それより多ければ "lazy"
+        :param row_cache_size: "lazy" の場合にキャッシュする距離行の最大数
+        :param distance_dtype: "dense" の場合の距離行列の格納形式（"float64", "float32", "int32"）
+        :param distance_path: "dense" の場合の距離行列の .npy ファイル。存在すればそれを memmap で開き、
+                              なければ計算して書き出す（都市座標・距離の定義・格納形式が書き出したときと
+                              違う場合は ValueError）
+        :param distance_metric: 距離の定義。distance.METRICS のキー（"euclidean", "euc_2d", "ceil_2d", "att", "geo"）
+        :param rng: 都市の配置に使う乱数生成器。numpy.random.Generator かそのシード（省略時はランダムなシード）
         """
+        self.rng = np.random.default_rng(rng)
         self.num_cities = num_cities  # 都市の数
         self.coord_min = coord_min  # 都市座標の最小範囲
         self.coord_max = coord_max  # 都市座標の最大範囲
         self.min_distance = (self.coord_max - self.coord_min) / self.num_cities
 
-        self.cities = []  # 都市の座標リスト
+        self.cities = None  # 都市の座標 (N, 2) 配列
         self.start_city = None  # 最初に訪れる都市（ランダムに選択）
 
         self._initialize()  # 都市の初期化
-        self.distance_matrix = self._compute_distance_matrix()  # 距離行列の計算
+        self._set_distance(self._create_distance(distance_backend, row_cache_size, distance_dtype, distance_path,
+                                                 distance_metric))
+
+    @classmethod
+    def from_cities(cls, cities, start_city=None, distance=None, distance_backend="auto", row_cache_size=0,
+                    distance_dtype="float64", distance_path=None, distance_metric="euclidean"):
+        """
+        与えられた都市座標から TSP インスタンスを作る。
+
+        :param cities: 都市座標の (N, 2) 配列
+        :param start_city: スタート都市の座標
+        :param distance: 既存の距離バックエンド。省略時は distance_backend 以降の引数から生成する
+        :return: TSP
+        """
+        tsp = cls.__new__(cls)
+        tsp.cities = np.asarray(cities)
+        tsp.num_cities = len(tsp.cities)
+        tsp.coord_min = tsp.cities.min()
+        tsp.coord_max = tsp.cities.max()
+        tsp.min_distance = None
+        tsp.start_city = start_city
+        if distance is None:
+            distance = tsp._create_distance(distance_backend, row_cache_size, distance_dtype, distance_path,
+                                            distance_metric)
+        tsp._set_distance(distance)
+        return tsp
+
+    def _set_distance(self, distance):
+        """
+        距離バックエンドを設定する。
+
+        :param distance: DenseDistance または LazyDistance
+        """
+        self.distance = distance  # 距離バックエンド
+        # 距離行列（"lazy" の場合は None）
+        self.distance_matrix = self.distance.matrix if isinstance(self.distance, DenseDistance) else None
+        self._candidates = {}  # (method, k) -> 近傍候補リスト
     
     def _initialize(self):
         """
         都市をランダムに生成し、スタート都市を決定する。
         """
-        self._generate_random_cities()  # ランダムな都市の生成
-        self.start_city = self.cities.pop(np.random.randint(0, len(self.cities)))  # ランダムにスタート都市を選択し、リストから除外
+        points = self._generate_random_cities()  # ランダムな都市の生成
+        start = self.rng.integers(0, len(points))  # ランダムにスタート都市を選択し、配列から除外
+        self.start_city = tuple(points[start])
+        self.cities = np.delete(points, start, axis=0)
     
     def _generate_random_cities(self):
         """
         ランダムな都市座標を生成する。
+        候補点をまとめて生成し、KD 木で最小距離 min_distance 未満の点を一括で棄却する。
+
+        :return: num_cities + 1 個の整数座標を格納した (N, 2) 配列
+        :raises ValueError: 指定の範囲に min_distance を保って都市を配置できない場合
         """
-        while len(self.cities) < self.num_cities + 1:
-            # 新しい都市をランダムに生成
-            new_city = (np.random.randint(self.coord_min, self.coord_max),
-                        np.random.randint(self.coord_min, self.coord_max))
-            
-            # すべての既存都市と距離をチェック
-            if all(np.linalg.norm(np.array(new_city) - np.array(city)) >= self.min_distance for city in self.cities):
-                self.cities.append(new_city)
+        count = self.num_cities + 1
+        side = self.coord_max - self.coord_min  # 座標は [coord_min, coord_max) の整数
+        if self.min_distance <= 1:
+            # 整数格子上の異なる 2 点は必ず距離 1 以上なので、重複を除くだけでよい
+            return self._sample_distinct_points(count, side)
+
+        # 半径 min_distance / 2 の円を六方最密充填しても入りきらない場合は即座にエラー
+        capacity = 2 / np.sqrt(3) * ((side + self.min_distance) / self.min_distance) ** 2
+        if count > capacity:
+            raise ValueError(f"Cannot place {count} cities with min_distance {self.min_distance} "
+                             f"in [{self.coord_min}, {self.coord_max})")
+
+        points = np.empty((0, 2), dtype=np.int64)
+        stall = 0
+        while len(points) < count:
+            remaining = count - len(points)
+            batch_size = min(max(2 * remaining, self.BATCH_MIN_SIZE), self.BATCH_MAX_SIZE)
+            candidates = self.rng.integers(self.coord_min, self.coord_max, size=(batch_size, 2))
+
+            # 既存の都市に近すぎる候補を棄却
+            if len(points) > 0:
+                nearest, _ = cKDTree(points).query(candidates, k=1)
+                candidates = candidates[nearest >= self.min_distance]
+
+            # 同じバッチ内で近すぎる組は後から引いた方を棄却
+            if len(candidates) > 1:
+                pairs = cKDTree(candidates).query_pairs(np.nextafter(self.min_distance, 0), output_type='ndarray')
+                keep = np.ones(len(candidates), dtype=bool)
+                keep[pairs.max(axis=1)] = False
+                candidates = candidates[keep]
 
-    def _compute_distance_matrix(self):
+            if len(candidates) == 0:
+                stall += 1
+                if stall > self.MAX_STALL_ROUNDS:
+                    raise ValueError(f"Could only place {len(points)} of {count} cities with "
+                                     f"min_distance {self.min_distance} in [{self.coord_min}, {self.coord_max})")
+                continue
+            stall = 0
+            points = np.concatenate([points, candidates[:remaining]])
+        return points
+
+    def _sample_distinct_points(self, count, side):
+        """
+        整数格子から重複のない点を一様に抽出する。
+
+        :param count: 抽出する点の数
+        :param side: 格子の一辺の点数
+        :return: (count, 2) の整数座標配列
+        :raises ValueError: 格子点の数が count に満たない場合
+        """
+        total = side * side
+        if count > total:
+            raise ValueError(f"Cannot place {count} distinct cities in [{self.coord_min}, {self.coord_max})")
+        if 2 * count > total:
+            # 格子の大半を使う場合は全点の順列から取る
+            flat = self.rng.permutation(total)[:count]
+        else:
+            flat = np.empty(0, dtype=np.int64)
+            while len(flat) < count:
+                drawn = self.rng.integers(0, total, size=2 * (count - len(flat)))
+                merged = np.concatenate([flat, drawn])
+                _, first = np.unique(merged, return_index=True)
+                flat = merged[np.sort(first)][:count]  # 引いた順序を保ったまま重複を除く
+        return np.column_stack([flat // side, flat % side]) + self.coord_min
+
+    def _create_distance(self, distance_backend, row_cache_size, distance_dtype, distance_path, distance_metric):
+        """
+        都市間の距離を計算するバックエンドを生成する。
+
+        :param distance_backend: "auto", "dense", "lazy" のいずれか
+        :param row_cache_size: "lazy" の場合にキャッシュする距離行の最大数
+        :param distance_dtype: "dense" の場合の距離行列の格納形式
+        :param distance_path: "dense" の場合の距離行列の .npy ファイル
+        :param distance_metric: 距離の定義
+        :return: DenseDistance または LazyDistance
         """
-        都市間の距離行列を計算する。
-        
-        :return: 都市間のユークリッド距離を格納した行列
+        if distance_backend == "auto":
+            distance_backend = "dense" if self.num_cities <= self.DENSE_MAX_CITIES else "lazy"
+        if distance_backend == "dense":
+            if distance_path is not None and os.path.exists(distance_path):
+                return DenseDistance.load(distance_path, cities=self.cities, metric=distance_metric,
+                                          dtype=distance_dtype)
+            return DenseDistance(self.cities, dtype=distance_dtype, path=distance_path, metric=distance_metric)
+        if distance_backend == "lazy":
+            return LazyDistance(self.cities, row_cache_size=row_cache_size, metric=distance_metric)
+        raise ValueError(f"Unknown distance backend: {distance_backend}")
+
+    def candidate_neighbors(self, k=10, method="knn"):
+        """
+        各都市の近傍候補リストを返す。一度計算した結果はキャッシュされる。
+
+        :param k: 1 都市あたりの候補数（都市数 - 1 を超える場合は切り詰める）
+        :param method: "knn"（最近傍）, "quadrant"（4 象限ごとの最近傍）, "delaunay"（Delaunay 隣接）のいずれか
+        :return: (N, k) の int32 配列。i 行目は都市 i の候補を近い順（象限・隣接優先）に並べたもの
         """
-        cities_array = np.array(self.cities)  # (N, 2) の NumPy 配列に変換
-        return cdist(cities_array, cities_array, metric='euclidean')  # ユークリッド距離を計算
+        if method not in CANDIDATE_METHODS:
+            raise ValueError(f"Unknown candidate method: {method}")
+        key = (method, k)
+        if key not in self._candidates:
+            candidates = CANDIDATE_METHODS[method](self.cities, k)
+            candidates.setflags(write=False)  # キャッシュ内容を呼び出し側で書き換えられないようにする
+            self._candidates[key] = candidates
+        return self._candidates[key]
 
-    def compute_route_distance(self, route):
+    def compute_route_distance(self, route, closed=False):
         """
         与えられたルートの総距離を計算する。
 
         :param route: 訪れる都市のインデックスのリスト（例: [0, 2, 1, 3, 0]）
+        :param closed: True の場合、最後の都市から最初の都市へ戻る辺も加える
         :return: ルート全体の総距離
         """
-        total_distance = sum(
-            self.distance_matrix[route[i], route[i + 1]] for i in range(len(route) - 1)
-        )
-        return total_distance
+        route = np.asarray(route, dtype=np.intp)
+        total_distance = self.distance.pair(route[:-1], route[1:]).sum(dtype=np.float64)
+        if closed and len(route) > 1:
+            total_distance += self.distance.pair(route[-1], route[0])
+        return float(total_distance)
+
+    def compute_route_distances(self, routes, closed=False):
+        """
+        複数ルートの総距離をまとめて計算する。
+
+        :param routes: (ルート数, ルート長) のインデックス配列
+        :param closed: True の場合、各ルートの最後の都市から最初の都市へ戻る辺も加える
+        :return: 各ルートの総距離を格納した (ルート数,) の配列
+        """
+        routes = np.asarray(routes, dtype=np.intp)
+        total_distances = self.distance.pair(routes[:, :-1], routes[:, 1:]).sum(axis=1, dtype=np.float64)
+        if closed and routes.shape[1] > 1:
+            total_distances += self.distance.pair(routes[:, -1], routes[:, 0])
+        return total_distances
@@ -1,109 +1,635 @@
-import math
-import random
-from collections import namedtuple
-
-Dimensions = namedtuple('Dimensions', 'width height')
-City = namedtuple('City', 'x y')
-
-class Route:
-
-    def __init__(self, cities = []):
-        self.cities = cities
-        self.distance = math.inf
-
-    def generate(self, cities, start):
-        self.cities = cities[:]
-        random.shuffle(self.cities)
-        self.cities.insert(0, start)
-        self.cities.append(start)
-
-    def calculate_distance(self):
-        self.distance = 0
-        i = 0
-        while i < len(self.cities) - 1:
-            origin = self.cities[i]
-            destination = self.cities[i+1]
-            self.distance += math.hypot(destination[0]-origin[0], destination[1]-origin[1])
-            i += 1
-
-    def mutate(self):
-        start_city = self.cities[0]
-        cities = [city for city in self.cities if city != start_city]
-        c1 = random.randint(0, len(cities)-1)
-        c2 = random.randint(0, len(cities)-1)
-        cities[c2], cities[c1] = cities[c1], cities[c2]
-        self.cities = [start_city] + cities + [start_city]
+import numpy as np
+
+from src.evaluation import EVALUATORS
+
+
+SCRAMBLE_LENGTH = 8  # scramble 突然変異でかき混ぜる区間の最大長
+
+
+def _edge_lengths(routes, positions, tsp):
+    """
+    各ルートについて、指定した位置から始まる辺 (routes[p], routes[p + 1]) の長さの和を求める。
+    同じ行で重複した位置は 1 回だけ数え、負の位置は無視する。
+
+    :param routes: (ルート数, 都市数) のルート配列
+    :param positions: (ルート数, m) の辺の開始位置（巡回的に解釈する。-1 は空き）
+    :param tsp: 対象の TSP インスタンス
+    :return: (ルート数,) の辺の長さの和
+    """
+    n_cities = routes.shape[1]
+    valid = positions >= 0
+    positions = np.sort(np.where(valid, positions % n_cities, -1), axis=1)
+    valid = positions >= 0
+    valid[:, 1:] &= positions[:, 1:] != positions[:, :-1]
+    positions = np.maximum(positions, 0)
+    origins = np.take_along_axis(routes, positions, axis=1)
+    destinations = np.take_along_axis(routes, (positions + 1) % n_cities, axis=1)
+    return np.where(valid, tsp.distance.pair(origins, destinations), 0).sum(axis=1)
+
+
+def _segments(n_rows, n_cities, rng, max_length=None):
+    """ 各行について区間 [i, j]（i < j）をまとめてランダムに選ぶ """
+    i = rng.integers(0, n_cities - 1, size=n_rows)
+    if max_length is None:
+        j = rng.integers(i + 1, n_cities)
+    else:
+        j = np.minimum(i + rng.integers(1, max_length, size=n_rows), n_cities - 1)
+    return i, j
+
+
+def _cut_points(n_rows, n_cities, rng):
+    """ 各行について異なる 2 つの切断点 i < j（0 ~ 都市数）をまとめてランダムに選ぶ """
+    a = rng.integers(0, n_cities + 1, size=n_rows)
+    b = rng.integers(0, n_cities, size=n_rows)
+    b += b >= a  # a と重ならないようにずらす
+    return np.minimum(a, b), np.maximum(a, b)
+
+
+def swap_mutation(population, rows, tsp, rng=None):
+    """
+    指定した個体のルートで 2 都市をランダムに入れ替える。
+
+    :param population: (個体数, 都市数) のルート配列（その場で書き換える）
+    :param rows: 突然変異させる個体のインデックス配列
+    :param tsp: 対象の TSP インスタンス
+    :param rng: 乱数生成器（numpy.random.Generator。省略時は新しく作る）
+    :return: 各個体の総距離の変化量（変化した辺だけから計算する）
+    """
+    rng = np.random.default_rng(rng)
+    routes = population[rows]
+    i, j = _segments(len(rows), population.shape[1], rng)
+    changed = np.stack([i - 1, i, j - 1, j], axis=1) % population.shape[1]
+    before = _edge_lengths(routes, changed, tsp)
+    index = np.arange(len(rows))
+    routes[index, i], routes[index, j] = routes[index, j], routes[index, i]
+    population[rows] = routes
+    return _edge_lengths(routes, changed, tsp) - before
+
+
+def inversion_mutation(population, rows, tsp, rng=None):
+    """
+    指定した個体のルートでランダムな区間を反転する。区間内の辺の長さは変わらないので、
+    変化するのは区間の両端の 2 辺だけ。
+
+    :param population: (個体数, 都市数) のルート配列（その場で書き換える）
+    :param rows: 突然変異させる個体のインデックス配列
+    :param tsp: 対象の TSP インスタンス
+    :param rng: 乱数生成器（numpy.random.Generator。省略時は新しく作る）
+    :return: 各個体の総距離の変化量（変化した辺だけから計算する）
+    """
+    rng = np.random.default_rng(rng)
+    routes = population[rows]
+    i, j = _segments(len(rows), population.shape[1], rng)
+    changed = np.stack([i - 1, j], axis=1) % population.shape[1]
+    before = _edge_lengths(routes, changed, tsp)
+    positions = np.arange(population.shape[1])
+    inside = (positions >= i[:, None]) & (positions <= j[:, None])
+    source = np.where(inside, i[:, None] + j[:, None] - positions, positions)
+    routes = np.take_along_axis(routes, source, axis=1)
+    population[rows] = routes
+    return _edge_lengths(routes, changed, tsp) - before
+
+
+def insertion_mutation(population, rows, tsp, rng=None):
+    """
+    指定した個体のルートで位置 i の都市を取り出し、位置 j（i < j）に挿入する。
+    間の都市は 1 つずつ前にずれるが、それらの間の辺の長さは変わらない。
+
+    :param population: (個体数, 都市数) のルート配列（その場で書き換える）
+    :param rows: 突然変異させる個体のインデックス配列
+    :param tsp: 対象の TSP インスタンス
+    :param rng: 乱数生成器（numpy.random.Generator。省略時は新しく作る）
+    :return: 各個体の総距離の変化量（変化した辺だけから計算する）
+    """
+    rng = np.random.default_rng(rng)
+    routes = population[rows]
+    i, j = _segments(len(rows), population.shape[1], rng)
+    before = _edge_lengths(routes, np.stack([i - 1, i, j], axis=1) % population.shape[1], tsp)
+    positions = np.arange(population.shape[1])
+    source = np.where((positions >= i[:, None]) & (positions < j[:, None]), positions + 1, positions)
+    source = np.where(positions == j[:, None], i[:, None], source)
+    routes = np.take_along_axis(routes, source, axis=1)
+    population[rows] = routes
+    return _edge_lengths(routes, np.stack([i - 1, j - 1, j], axis=1) % population.shape[1], tsp) - before
+
+
+def scramble_mutation(population, rows, tsp, rng=None):
+    """
+    指定した個体のルートで、長さ SCRAMBLE_LENGTH 以下のランダムな区間の都市の順序をかき混ぜる。
+
+    :param population: (個体数, 都市数) のルート配列（その場で書き換える）
+    :param rows: 突然変異させる個体のインデックス配列
+    :param tsp: 対象の TSP インスタンス
+    :param rng: 乱数生成器（numpy.random.Generator。省略時は新しく作る）
+    :return: 各個体の総距離の変化量（変化した辺だけから計算する）
+    """
+    rng = np.random.default_rng(rng)
+    routes = population[rows]
+    n_cities = population.shape[1]
+    i, j = _segments(len(rows), n_cities, rng, SCRAMBLE_LENGTH)
+    offsets = np.arange(SCRAMBLE_LENGTH + 1)
+    # 区間の直前の辺から区間の直後の辺まで（-1 は空き）
+    changed = np.where(offsets <= (j - i + 1)[:, None], (i[:, None] - 1 + offsets) % n_cities, -1)
+    before = _edge_lengths(routes, changed, tsp)
+    positions = np.arange(n_cities)
+    inside = (positions >= i[:, None]) & (positions <= j[:, None])
+    key = np.where(inside, i[:, None] + rng.random(routes.shape) * (j - i + 1)[:, None], positions)
+    routes = np.take_along_axis(routes, np.argsort(key, axis=1), axis=1)
+    population[rows] = routes
+    return _edge_lengths(routes, changed, tsp) - before
+
+
+MUTATIONS = {
+    "swap": swap_mutation,
+    "inversion": inversion_mutation,
+    "insertion": insertion_mutation,
+    "scramble": scramble_mutation,
+}
+
+
+def one_point_crossover(fathers, mothers, rng=None):
+    """
+    父親のルートの先頭からランダムな長さを取り、残りの都市を母親のルートでの順に並べた子を作る。
+    子は「母親の残りの都市 + 父親の先頭部分」の順になる。全個体分をまとめて計算する。
+
+    :param fathers: (子の数, 都市数) の父親のルート配列
+    :param mothers: (子の数, 都市数) の母親のルート配列
+    :param rng: 乱数生成器（numpy.random.Generator。省略時は新しく作る）
+    :return: (子の数, 都市数) の子のルート配列
+    """
+    rng = np.random.default_rng(rng)
+    n_children, n_cities = fathers.shape
+    positions = np.broadcast_to(np.arange(n_cities), fathers.shape)
+    z = rng.integers(1, n_cities, size=n_children)  # 父親から受け継ぐ長さ
+
+    # 都市ごとに、父親の先頭部分に含まれるか・父親と母親での位置を求める
+    in_father_part = np.zeros(fathers.shape, dtype=bool)
+    np.put_along_axis(in_father_part, fathers, positions < z[:, None], axis=1)
+    father_pos = np.empty(fathers.shape, dtype=np.int64)
+    np.put_along_axis(father_pos, fathers, positions, axis=1)
+    mother_pos = np.empty(mothers.shape, dtype=np.int64)
+    np.put_along_axis(mother_pos, mothers, positions, axis=1)
+
+    # 母親の残りの都市を母親での順に、その後に父親の先頭部分を父親での順に並べる
+    key = np.where(in_father_part, n_cities + father_pos, mother_pos)
+    return np.argsort(key, axis=1).astype(fathers.dtype)
+
+
+def order_crossover(father, mother, tsp=None, rng=None, cut=None):
+    """
+    順序交叉 (OX)。父親の区間 [i, j) をそのまま受け継ぎ、残りの位置を j から順に
+    母親のルートでの順序（j から巡回的に）で埋める。
+
+    :param father: 父親のルート
+    :param mother: 母親のルート
+    :param tsp: 未使用（交叉関数の引数をそろえるため）
+    :param rng: 乱数生成器（cut を省略した場合に使う）
+    :param cut: 区間 (i, j)。省略時はランダムに選ぶ
+    :return: 子のルート
+    """
+    n_cities = len(father)
+    if cut is None:
+        cut = np.concatenate(_cut_points(1, n_cities, np.random.default_rng(rng)))
+    i, j = int(cut[0]), int(cut[1])
+    used = np.zeros(n_cities, dtype=bool)
+    used[father[i:j]] = True
+    order = np.roll(mother, -j)
+    child = np.empty_like(father)
+    child[i:j] = father[i:j]
+    child[(j + np.arange(n_cities - (j - i))) % n_cities] = order[~used[order]]
+    return child
+
+
+def partially_mapped_crossover(father, mother, tsp=None, rng=None, cut=None):
+    """
+    部分写像交叉 (PMX)。母親のルートを元に、父親の区間 [i, j) の都市を同じ位置に来るよう
+    入れ替えていく。都市の位置表を持つので O(N) で済む。
+
+    :param father: 父親のルート
+    :param mother: 母親のルート
+    :param tsp: 未使用（交叉関数の引数をそろえるため）
+    :param rng: 乱数生成器（cut を省略した場合に使う）
+    :param cut: 区間 (i, j)。省略時はランダムに選ぶ
+    :return: 子のルート
+    """
+    n_cities = len(father)
+    if cut is None:
+        cut = np.concatenate(_cut_points(1, n_cities, np.random.default_rng(rng)))
+    i, j = int(cut[0]), int(cut[1])
+    child = mother.copy()
+    pos = np.empty(n_cities, dtype=np.int64)
+    pos[child] = np.arange(n_cities)
+    for k in range(i, j):
+        city = father[k]
+        p = pos[city]
+        child[p], child[k] = child[k], city
+        pos[child[p]] = p
+        pos[city] = k
+    return child
+
+
+def edge_recombination_crossover(father, mother, tsp=None, rng=None):
+    """
+    辺組換え交叉 (ERX)。両親の辺の和集合から、残りの隣接都市が最も少ない都市を優先してたどる。
+    行き止まりになった場合はまだ訪れていない都市へランダムに移る。
+
+    :param father: 父親のルート
+    :param mother: 母親のルート
+    :param tsp: 未使用（交叉関数の引数をそろえるため）
+    :param rng: 乱数生成器（numpy.random.Generator。省略時は新しく作る）
+    :return: 子のルート
+    """
+    rng = np.random.default_rng(rng)
+    n_cities = len(father)
+    edges = [set() for _ in range(n_cities)]
+    for parent in (father.tolist(), mother.tolist()):
+        for a, b in zip(parent, parent[1:] + parent[:1]):
+            edges[a].add(b)
+            edges[b].add(a)
+
+    visited = [False] * n_cities
+    spare = rng.permutation(n_cities).tolist()  # 行き止まりのときに移る先の候補
+    child = np.empty_like(father)
+    current = int(father[0])
+    for k in range(n_cities):
+        child[k] = current
+        visited[current] = True
+        for neighbor in edges[current]:
+            edges[neighbor].discard(current)
+        if k == n_cities - 1:
+            break
+        if edges[current]:
+            fewest = min(len(edges[neighbor]) for neighbor in edges[current])
+            ties = [neighbor for neighbor in edges[current] if len(edges[neighbor]) == fewest]
+            current = ties[rng.integers(len(ties))]
+        else:
+            while visited[spare[-1]]:
+                spare.pop()
+            current = spare.pop()
+    return child
+
+
+def eax_crossover(father, mother, tsp, rng=None):
+    """
+    簡易版の枝組立て交叉 (EAX)。父親の辺と母親の辺を交互にたどる AB サイクルを 1 つ選び、
+    父親の辺をそのサイクルの母親の辺に置き換える。分かれた部分巡回路は、近傍候補を使って
+    増分が最小になる 2 辺の張り替えでつなぎ直す。
+
+    :param father: 父親のルート
+    :param mother: 母親のルート
+    :param tsp: 対象の TSP インスタンス（距離と近傍候補に使う）
+    :param rng: 乱数生成器（numpy.random.Generator。省略時は新しく作る）
+    :return: 子のルート
+    """
+    n_cities = len(father)
+    adjacency = _adjacency(father)
+    mother_adjacency = _adjacency(mother)
+
+    # 片方の親にしかない辺を頂点ごとにまとめる
+    only_father = [[b for b in adjacency[a] if b not in mother_adjacency[a]] for a in range(n_cities)]
+    only_mother = [[b for b in mother_adjacency[a] if b not in adjacency[a]] for a in range(n_cities)]
+    starts = [a for a in range(n_cities) if only_father[a]]
+    if not starts:
+        return father.copy()  # 両親が同じ巡回路
+
+    # AB サイクルをすべてたどり、1 つをランダムに選ぶ
+    cycles = []
+    for start in starts:
+        while only_father[start]:
+            cycle, current, use_father = [start], start, True
+            while True:
+                remaining = only_father if use_father else only_mother
+                following = remaining[current].pop()
+                remaining[following].remove(current)
+                cycle.append(following)
+                current, use_father = following, not use_father
+                if current == start and use_father:
+                    break
+            cycles.append(cycle)
+    cycle = cycles[np.random.default_rng(rng).integers(len(cycles))]
+
+    # 父親の辺 (cycle[0], cycle[1]), (cycle[2], cycle[3]), ... を母親の辺 (cycle[1], cycle[2]), ... に置き換える
+    for k in range(0, len(cycle) - 1, 2):
+        a, b = cycle[k], cycle[k + 1]
+        adjacency[a].remove(b)
+        adjacency[b].remove(a)
+    for k in range(1, len(cycle) - 1, 2):
+        a, b = cycle[k], cycle[k + 1]
+        adjacency[a].append(b)
+        adjacency[b].append(a)
+
+    _merge_subtours(adjacency, tsp)
+    return _tour_from_adjacency(adjacency, int(father[0]), father.dtype)
+
+
+def _adjacency(route):
+    """ ルートの各都市について前後の都市のリストを作る """
+    route = route.tolist()
+    adjacency = [None] * len(route)
+    for k, city in enumerate(route):
+        adjacency[city] = [route[k - 1], route[(k + 1) % len(route)]]
+    return adjacency
+
+
+def _tour_from_adjacency(adjacency, start, dtype):
+    """ 各都市の次数が 2 の隣接リストが表す巡回路を start からたどってルート配列にする """
+    tour = np.empty(len(adjacency), dtype=dtype)
+    previous, current = -1, start
+    for k in range(len(adjacency)):
+        tour[k] = current
+        a, b = adjacency[current]
+        previous, current = current, (b if a == previous else a)
+    return tour
+
+
+def _merge_subtours(adjacency, tsp):
+    """
+    隣接リストが複数の部分巡回路に分かれている場合、最も小さい部分巡回路から順に、
+    他の部分巡回路と 2 辺を張り替えてつなぐ。張り替え先は近傍候補から増分が最小のものを選ぶ。
+    """
+    n_cities = len(adjacency)
+    label = [-1] * n_cities
+    members = []
+    for start in range(n_cities):
+        if label[start] >= 0:
+            continue
+        previous, current, cities = -1, start, []
+        while label[current] < 0:
+            label[current] = len(members)
+            cities.append(current)
+            a, b = adjacency[current]
+            previous, current = current, (b if a == previous else a)
+        members.append(cities)
+    if len(members) == 1:
+        return
+
+    d = tsp.distance.edge
+    candidates = tsp.candidate_neighbors(10).tolist()
+    alive = set(range(len(members)))
+    while len(alive) > 1:
+        small = min(alive, key=lambda index: len(members[index]))
+        best = None
+        for u in members[small]:
+            outside = [w for w in candidates[u] if label[w] != small]
+            if not outside:
+                continue
+            for w in outside:
+                for u_next in adjacency[u]:
+                    for w_next in adjacency[w]:
+                        # (u, u_next), (w, w_next) を外し、(u, w), (u_next, w_next) をつなぐ
+                        delta = d(u, w) + d(u_next, w_next) - d(u, u_next) - d(w, w_next)
+                        if best is None or delta < best[0]:
+                            best = (delta, u, u_next, w, w_next)
+        if best is None:
+            # 近傍候補がすべて同じ部分巡回路の中にある場合は、他の部分巡回路の任意の都市につなぐ
+            u = members[small][0]
+            w = members[next(index for index in alive if index != small)][0]
+            best = (0.0, u, adjacency[u][0], w, adjacency[w][0])
+
+        _, u, u_next, w, w_next = best
+        adjacency[u].remove(u_next)
+        adjacency[u_next].remove(u)
+        adjacency[w].remove(w_next)
+        adjacency[w_next].remove(w)
+        adjacency[u].append(w)
+        adjacency[w].append(u)
+        adjacency[u_next].append(w_next)
+        adjacency[w_next].append(u_next)
+
+        target = label[w]
+        for city in members[small]:
+            label[city] = target
+        members[target].extend(members[small])
+        alive.remove(small)
+
+
+def _rowwise(crossover, cuts=False):
+    """
+    1 組の親から子を作る交叉関数を、全ての子をまとめて作る形にする。
+    cuts=True の場合は全ての子の切断点をまとめて引いてから渡す。
+    """
+    def batched(fathers, mothers, tsp, rng=None):
+        rng = np.random.default_rng(rng)
+        if cuts:
+            points = np.column_stack(_cut_points(len(fathers), fathers.shape[1], rng))
+            children = [crossover(father, mother, tsp, cut=cut)
+                        for father, mother, cut in zip(fathers, mothers, points)]
+        else:
+            children = [crossover(father, mother, tsp, rng) for father, mother in zip(fathers, mothers)]
+        return np.array(children, dtype=fathers.dtype).reshape(fathers.shape)
+    return batched
+
+
+CROSSOVERS = {
+    "one_point": lambda fathers, mothers, tsp, rng=None: one_point_crossover(fathers, mothers, rng),
+    "ox": _rowwise(order_crossover, cuts=True),
+    "pmx": _rowwise(partially_mapped_crossover, cuts=True),
+    "erx": _rowwise(edge_recombination_crossover),
+    "eax": _rowwise(eax_crossover),
+}
+
+
+def tournament_selection(fitness, n, tournament_size, rng=None):
+    """
+    トーナメント選択。n 回分のトーナメントを (n, トーナメントサイズ) の配列でまとめて引き、
+    それぞれで総距離が最小の個体を選ぶ。
+
+    :param fitness: 各個体の総距離
+    :param n: 選ぶ個体の数
+    :param tournament_size: トーナメントサイズ
+    :param rng: 乱数生成器（numpy.random.Generator。省略時は新しく作る）
+    :return: 選ばれた個体のインデックス配列
+    """
+    contestants = np.random.default_rng(rng).integers(0, len(fitness), size=(n, tournament_size))
+    winners = np.argmin(fitness[contestants], axis=1)
+    return contestants[np.arange(n), winners]
+
+
+def stochastic_universal_sampling(fitness, n, tournament_size=None, rng=None):
+    """
+    確率的普遍抽出 (SUS)。総距離の逆数に比例する幅のルーレットに、等間隔の n 本の針を
+    一度に落として選ぶ。選ばれた順は並べ替えておく。
+
+    :param fitness: 各個体の総距離
+    :param n: 選ぶ個体の数
+    :param tournament_size: 未使用（選択関数の引数をそろえるため）
+    :param rng: 乱数生成器（numpy.random.Generator。省略時は新しく作る）
+    :return: 選ばれた個体のインデックス配列
+    """
+    rng = np.random.default_rng(rng)
+    cumulative = np.cumsum(1.0 / fitness)
+    pointers = (rng.random() + np.arange(n)) * (cumulative[-1] / n)
+    selected = np.minimum(np.searchsorted(cumulative, pointers, side='right'), len(fitness) - 1)
+    return rng.permutation(selected)
+
+
+def rank_selection(fitness, n, tournament_size=None, pressure=1.5, rng=None):
+    """
+    線形ランキング選択。総距離の順位だけで選択確率を決めるので、距離の値の幅に左右されない。
+    最良個体の期待選択回数が pressure、最悪個体が 2 - pressure になる。
+
+    :param fitness: 各個体の総距離
+    :param n: 選ぶ個体の数
+    :param tournament_size: 未使用（選択関数の引数をそろえるため）
+    :param pressure: 選択圧（1 ~ 2）
+    :param rng: 乱数生成器（numpy.random.Generator。省略時は新しく作る）
+    :return: 選ばれた個体のインデックス配列
+    """
+    size = len(fitness)
+    if size == 1:
+        return np.zeros(n, dtype=np.int64)
+    rank = np.empty(size, dtype=np.int64)
+    rank[np.argsort(fitness)] = np.arange(size)  # 0 が最良
+    probability = ((2 - pressure) + 2 * (pressure - 1) * (size - 1 - rank) / (size - 1)) / size
+    return np.random.default_rng(rng).choice(size, size=n, p=probability)
+
+
+SELECTIONS = {
+    "tournament": tournament_selection,
+    "sus": stochastic_universal_sampling,
+    "rank": rank_selection,
+}
+
 
 class GeneticAlgorithm:
+    """
+    TSP を解く遺伝的アルゴリズム。
+    集団は (個体数, 都市数) の int32 配列で都市インデックスの順列として持ち、
+    各ルートの長さ（適応度）は並行する float 配列で持つ。
+    """
+
+    def __init__(self, tsp, size, muta, tour, local_search=None, crossover="one_point", selection="tournament",
+                 mutation="swap", crossover_rate=1.0, evaluator="serial", population=None, fitness=None, rng=None):
+        """
+        GeneticAlgorithm クラスの初期化。
 
-    def __init__(self, size, muta, tour, nr_of_cities, map_dimensions):
+        :param tsp: 対象の TSP インスタンス
+        :param size: 集団の個体数
+        :param muta: 突然変異率
+        :param tour: トーナメントサイズ
+        :param local_search: 指定した場合は生成した子に局所探索（LocalSearch）を適用する（メメティック GA）
+        :param crossover: 交叉の種類。CROSSOVERS のキー（"one_point", "ox", "pmx", "erx", "eax"）
+        :param selection: 選択の種類。SELECTIONS のキー（"tournament", "sus", "rank"）
+        :param mutation: 突然変異の種類。MUTATIONS のキー（"swap", "inversion", "insertion", "scramble"）
+        :param crossover_rate: 交叉率。交叉しなかった子は父親の複製になり、総距離を計算し直さない
+        :param evaluator: 総距離の計算方法。EVALUATORS のキー（"serial", "threads", "processes"）か評価器
+        :param population: 初期集団の (個体数, 都市数) のルート配列。省略時はランダムに生成する
+        :param fitness: population の各ルートの総距離。指定した場合は計算し直さない（チェックポイントからの再開用）
+        :param rng: 乱数生成器。numpy.random.Generator かそのシード（省略時はランダムなシード）
+        """
+        if crossover not in CROSSOVERS:
+            raise ValueError(f"Unknown crossover: {crossover}")
+        if selection not in SELECTIONS:
+            raise ValueError(f"Unknown selection: {selection}")
+        if mutation not in MUTATIONS:
+            raise ValueError(f"Unknown mutation: {mutation}")
+        if isinstance(evaluator, str):
+            if evaluator not in EVALUATORS:
+                raise ValueError(f"Unknown evaluator: {evaluator}")
+            evaluator = EVALUATORS[evaluator](tsp)
+        self.tsp = tsp
         self.population_size = size
         self.mutation_rate = muta
+        self.crossover_rate = crossover_rate
         self.tournament_size = tour
-        self.nr_of_cities = nr_of_cities
-        self.map_dimensions = map_dimensions
-        self.routes = []
-        self.cities = []
-        self.start_city = None
+        self.nr_of_cities = tsp.num_cities
+        self.local_search = local_search
+        self.crossover = CROSSOVERS[crossover]
+        self.selection = SELECTIONS[selection]
+        self.mutation = MUTATIONS[mutation]
+        self.evaluator = evaluator
+        self.rng = np.random.default_rng(rng)  # 選択・交叉・突然変異の乱数はすべてここから引く
+        self.population = None  # (個体数, 都市数) のルート配列
+        self.fitness = None  # 各ルートの総距離（NaN はまだ計算していないもの）
         self.generation = 0
+        self.evaluations = 0  # これまでに総距離を計算した個体数
 
-        self._initialize()
-    
-    def _initialize(self):
-        self._generate_random_cities()
-        self.start_city = self.cities.pop(random.randint(0, len(self.cities)-1))
-        self._generate_random_population()
+        self._initialize(population, fitness)
 
-    def _generate_random_cities(self):
-        for i in range(0, self.nr_of_cities-2):
-            self.cities.append((random.randrange(0, self.map_dimensions.width),
-                                random.randrange(0, self.map_dimensions.height - 80)))
+    def _initialize(self, population=None, fitness=None):
+        if population is None:
+            if fitness is not None:
+                raise ValueError("fitness needs population")
+            self._generate_random_population()
+            return
+        self.population = np.array(population, dtype=np.int32)
+        if fitness is None:
+            self.fitness = self.evaluate(self.population)
+        elif np.shape(fitness) != (len(self.population),):
+            raise ValueError(f"fitness has shape {np.shape(fitness)}, expected ({len(self.population)},)")
+        else:
+            self.fitness = np.array(fitness, dtype=np.float64)
 
     def _generate_random_population(self):
-        self.routes = [Route() for i in range(self.population_size)]
-
-        for route in self.routes:
-            route.generate(self.cities, self.start_city)
-            route.calculate_distance()
-
-    def select_route(self):
-        tournament = []
-        winner = Route()
-        for i in range(0, self.tournament_size):
-            R = random.randint(0, self.population_size - 1)
-            tournament.append(self.routes[R])
-        for route in tournament:
-            if route.distance < winner.distance: winner = route
-        return winner
+        population = np.argsort(self.rng.random((self.population_size, self.nr_of_cities)), axis=1)
+        self.population = population.astype(np.int32)
+        self._apply_local_search(self.population)
+        self.fitness = self.evaluate(self.population)
+
+    def evaluate(self, population):
+        """
+        ルートの総距離（巡回路として閉じたもの）をまとめて計算する。
+
+        :param population: (個体数, 都市数) のルート配列
+        :return: (個体数,) の総距離
+        """
+        self.evaluations += len(population)
+        return self.evaluator.evaluate(population)
+
+    def select_routes(self, n):
+        """
+        1 世代分の親をまとめて選ぶ。
+
+        :param n: 選ぶ個体の数
+        :return: 選ばれた個体のインデックス配列
+        """
+        return self.selection(self.fitness, n, self.tournament_size, rng=self.rng)
 
     def breed(self):
-        new_population = []
+        n_children = self.population_size - 1
+        parents = self.select_routes(2 * n_children)
+        fathers, mothers = parents[:n_children], parents[n_children:]
+        children = self.population[fathers]
+        fitness = self.fitness[fathers]
 
-        for i in range(0, self.population_size - 1):
-            father = self.select_route()
-            mother = self.select_route()
+        # 交叉と突然変異をするかどうかは 1 世代分まとめて引く
+        crossover_draw, mutation_draw = self.rng.random((2, n_children))
 
-            z = random.randint(1, self.nr_of_cities-2)
-            father_part = father.cities[0:z]
-            mother_part = [x for x in mother.cities if x not in father_part]
+        # 交叉した子だけ総距離を計算し直す（NaN にしておく）
+        crossed = np.flatnonzero(crossover_draw < self.crossover_rate)
+        children[crossed] = self.crossover(children[crossed], self.population[mothers[crossed]], self.tsp, self.rng)
+        fitness[crossed] = np.nan
 
-            child = Route(cities = [self.start_city] + mother_part + father_part + [self.start_city])
+        # 突然変異は変化した辺から求めた差分だけ総距離に足す
+        mutated = np.flatnonzero(mutation_draw < self.mutation_rate)
+        fitness[mutated] += self.mutation(children, mutated, self.tsp, self.rng)
 
-            rnd = random.randint(0, 100)
-            if rnd < (self.mutation_rate*100):
-                child.mutate()
+        if self.local_search is not None:
+            self._apply_local_search(children)
+            fitness[:] = np.nan
 
-            new_population.append(child)
+        best = np.argmin(self.fitness)
+        self.population = np.concatenate([children, self.population[best][None]])
+        self.fitness = np.append(fitness, self.fitness[best])
 
-        new_population.append(self.get_best_route())
+    def _apply_local_search(self, population):
+        if self.local_search is None:
+            return
+        for i in range(len(population)):
+            population[i] = self.local_search.optimize(population[i])
 
-        self.routes = new_population
-    
     def update(self):
         self.breed()
-        for route in self.routes:
-            route.calculate_distance()
+        stale = np.flatnonzero(np.isnan(self.fitness))
+        self.fitness[stale] = self.evaluate(self.population[stale])
         self.generation += 1
 
+    def close(self):
+        """ 評価器のスレッドやプロセスを止める """
+        self.evaluator.close()
+
     def get_best_route(self):
-        return min(self.routes, key=lambda r: r.distance)
\ No newline at end of file
+        return self.population[np.argmin(self.fitness)]
+
+    def get_best_distance(self):
+        return self.fitness.min()
@@ -0,0 +1,291 @@
+import os
+import re
+from collections import namedtuple
+
+import numpy as np
+
+from src.distance import DenseDistance
+from src.tsp import TSP
+
+# EDGE_WEIGHT_TYPE と距離の定義（distance.METRICS のキー）の対応
+EDGE_WEIGHT_METRICS = {
+    "EUC_2D": "euc_2d",
+    "CEIL_2D": "ceil_2d",
+    "ATT": "att",
+    "GEO": "geo",
+}
+
+# EDGE_WEIGHT_FORMAT ごとの (読み込む値の数を求める関数, 上三角か, 対角を含むか)。
+# 列方向の形式は転置した行列の行方向の形式と同じ並びになる
+EDGE_WEIGHT_FORMATS = {
+    "FULL_MATRIX": (lambda n: n * n, None, True),
+    "UPPER_ROW": (lambda n: n * (n - 1) // 2, True, False),
+    "LOWER_ROW": (lambda n: n * (n - 1) // 2, False, False),
+    "UPPER_DIAG_ROW": (lambda n: n * (n + 1) // 2, True, True),
+    "LOWER_DIAG_ROW": (lambda n: n * (n + 1) // 2, False, True),
+    "UPPER_COL": (lambda n: n * (n - 1) // 2, False, False),
+    "LOWER_COL": (lambda n: n * (n - 1) // 2, True, False),
+    "UPPER_DIAG_COL": (lambda n: n * (n + 1) // 2, False, True),
+    "LOWER_DIAG_COL": (lambda n: n * (n + 1) // 2, True, True),
+}
+
+# 読み込んだ TSPLIB ファイルの中身
+# header: 仕様部のキーと値の dict, coords: (N, 2) の座標（なければ None）,
+# matrix: (N, N) の距離行列（EXPLICIT でなければ None）, tour: 0 始まりの巡回路（なければ None）
+TsplibData = namedtuple('TsplibData', 'header coords matrix tour')
+
+_SECTION_END = re.compile(r'^[ \t]*(?:[A-Za-z]|-1[ \t]*\r?$)', re.MULTILINE)  # 数値の並びが終わる行（キーワード、EOF、-1）
+
+
+class _SectionReader:
+    """
+    テキストファイルを BLOCK_SIZE 文字ずつ読み、仕様部は 1 行ずつ、データ部は数値の並びとして
+    NumPy でまとめて変換し、あらかじめ確保した配列に書き込む。
+    """
+    BLOCK_SIZE = 1 << 22
+
+    def __init__(self, f):
+        self.f = f
+        self.buffer = ""
+        self.eof = False
+
+    def _fill(self):
+        """ 次のブロックを読み足す。行の途中で切れた部分は次回に回す """
+        block = self.f.read(self.BLOCK_SIZE)
+        if not block:
+            self.eof = True
+            return
+        self.buffer += block
+
+    def readline(self):
+        """ 1 行読む（ファイルの終わりでは None） """
+        while "\n" not in self.buffer and not self.eof:
+            self._fill()
+        if not self.buffer:
+            return None
+        line, _, self.buffer = self.buffer.partition("\n")
+        return line
+
+    def read_numbers(self, out):
+        """
+        次のキーワード行（または -1 だけの行）まで数値の並びを読み、out（1 次元配列）に書き込む。
+        数値が足りなければエラーにし、余った数値（TOUR_SECTION の行末の -1 など）は読み捨てる。
+
+        :param out: 書き込み先の 1 次元配列
+        """
+        filled = 0
+        while True:
+            while "\n" not in self.buffer and not self.eof:
+                self._fill()
+            if not self.buffer:
+                break
+            # 行の途中で切れていない部分だけを変換する
+            cut = len(self.buffer) if self.eof else self.buffer.rindex("\n") + 1
+            text, rest = self.buffer[:cut], self.buffer[cut:]
+            end = _SECTION_END.search(text)
+            if end is not None:
+                text, rest = text[:end.start()], text[end.start():] + rest
+                if rest.lstrip().startswith("-1"):
+                    rest = rest.partition("\n")[2]  # 巡回路の終わりの -1 の行
+            values = np.fromstring(text, dtype=np.float64, sep=" ") if text.strip() else np.empty(0)
+            take = min(len(values), len(out) - filled)
+            out[filled:filled + take] = values[:take]
+            filled += take
+            self.buffer = rest
+            if end is not None:
+                break
+        if filled < len(out):
+            raise ValueError(f"Expected {len(out)} numbers in section, found {filled}")
+
+
+def read_tsplib(path):
+    """
+    TSPLIB 形式のファイル（.tsp, .tour）を読み込む。
+    NODE_COORD_SECTION, DISPLAY_DATA_SECTION, EDGE_WEIGHT_SECTION, TOUR_SECTION の数値は
+    Python のリストを作らずに、あらかじめ確保した NumPy 配列にブロック単位で書き込む。
+
+    :param path: 読み込むファイル
+    :return: TsplibData
+    """
+    header = {}
+    coords = matrix = tour = None
+    with open(path) as f:
+        reader = _SectionReader(f)
+        while True:
+            line = reader.readline()
+            if line is None:
+                break
+            line = line.strip()
+            if not line:
+                continue
+            key, _, value = line.partition(":")
+            key, value = key.strip().upper(), value.strip()
+            if key == "EOF":
+                break
+            if value:
+                header[key] = value
+                continue
+
+            if "DIMENSION" not in header:
+                raise ValueError(f"{path} has no DIMENSION before {key}")
+            dimension = int(header["DIMENSION"])
+            if key in ("NODE_COORD_SECTION", "DISPLAY_DATA_SECTION"):
+                if header.get("NODE_COORD_TYPE", "TWOD_COORDS").upper() != "TWOD_COORDS":
+                    raise ValueError(f"Unsupported NODE_COORD_TYPE: {header['NODE_COORD_TYPE']}")
+                rows = np.empty(dimension * 3)
+                reader.read_numbers(rows)
+                rows = rows.reshape(dimension, 3)
+                if key == "NODE_COORD_SECTION" or coords is None:
+                    coords = np.empty((dimension, 2))
+                    coords[rows[:, 0].astype(np.intp) - 1] = rows[:, 1:]  # ノード番号は 1 始まり
+            elif key == "EDGE_WEIGHT_SECTION":
+                matrix = _read_edge_weights(reader, dimension, header.get("EDGE_WEIGHT_FORMAT", "FULL_MATRIX"))
+            elif key == "TOUR_SECTION":
+                values = np.empty(dimension)
+                reader.read_numbers(values)
+                tour = values.astype(np.int32) - 1
+            else:
+                raise ValueError(f"Unsupported TSPLIB section: {key}")
+    return TsplibData(header, coords, matrix, tour)
+
+
+def _read_edge_weights(reader, dimension, weight_format):
+    """ EDGE_WEIGHT_SECTION を読み、対称な (N, N) の距離行列にする """
+    weight_format = weight_format.upper()
+    if weight_format not in EDGE_WEIGHT_FORMATS:
+        raise ValueError(f"Unsupported EDGE_WEIGHT_FORMAT: {weight_format}")
+    count, upper, diagonal = EDGE_WEIGHT_FORMATS[weight_format]
+    values = np.empty(count(dimension))
+    reader.read_numbers(values)
+    if upper is None:
+        return values.reshape(dimension, dimension)
+
+    matrix = np.zeros((dimension, dimension))
+    rows, cols = np.triu_indices(dimension, 0 if diagonal else 1) if upper else \
+        np.tril_indices(dimension, 0 if diagonal else -1)
+    matrix[rows, cols] = values  # triu/tril_indices は行優先の順に並ぶ
+    matrix[cols, rows] = values
+    return matrix
+
+
+def _classical_mds(matrix):
+    """ 座標のない EXPLICIT の問題に、距離をなるべく保つ 2 次元座標を与える（表示と近傍候補用） """
+    squared = np.asarray(matrix, dtype=np.float64) ** 2
+    centered = -0.5 * (squared - squared.mean(axis=0) - squared.mean(axis=1)[:, None] + squared.mean())
+    eigenvalues, eigenvectors = np.linalg.eigh(centered)
+    return eigenvectors[:, -2:][:, ::-1] * np.sqrt(np.maximum(eigenvalues[-2:][::-1], 0))
+
+
+def load_tsp(path, distance_backend="auto", row_cache_size=0, distance_dtype="int32", distance_path=None):
+    """
+    TSPLIB の .tsp ファイルから TSP インスタンスを作る。
+    座標で与えられる問題（EUC_2D, CEIL_2D, ATT, GEO）は TSPLIB の定義どおりの距離を使い、
+    EXPLICIT の問題は読み込んだ距離行列をそのまま使う（座標は DISPLAY_DATA_SECTION、なければ距離から作る）。
+
+    :param path: 読み込む .tsp ファイル
+    :param distance_backend: 距離の計算方法（TSP と同じ。EXPLICIT の場合は常に距離行列）
+    :param row_cache_size: "lazy" の場合にキャッシュする距離行の最大数
+    :param distance_dtype: "dense" の場合の距離行列の格納形式（TSPLIB の距離は整数なので既定は "int32"）
+    :param distance_path: "dense" の場合の距離行列の .npy ファイル
+    :return: TSP（name 属性に問題名を持つ）
+    """
+    data = read_tsplib(path)
+    edge_weight_type = data.header.get("EDGE_WEIGHT_TYPE", "").upper()
+    if edge_weight_type == "EXPLICIT":
+        if data.matrix is None:
+            raise ValueError(f"{path} has no EDGE_WEIGHT_SECTION")
+        coords = data.coords if data.coords is not None else _classical_mds(data.matrix)
+        matrix = data.matrix
+        if np.array_equal(matrix, np.round(matrix)):
+            matrix = matrix.astype(distance_dtype)  # 整数の距離なら指定の形式で持つ
+        tsp = TSP.from_cities(coords, distance=DenseDistance.from_matrix(matrix))
+    elif edge_weight_type in EDGE_WEIGHT_METRICS:
+        if data.coords is None:
+            raise ValueError(f"{path} has no NODE_COORD_SECTION")
+        tsp = TSP.from_cities(data.coords, distance_backend=distance_backend, row_cache_size=row_cache_size,
+                              distance_dtype=distance_dtype, distance_path=distance_path,
+                              distance_metric=EDGE_WEIGHT_METRICS[edge_weight_type])
+    else:
+        raise ValueError(f"Unsupported EDGE_WEIGHT_TYPE: {edge_weight_type}")
+    tsp.name = data.header.get("NAME", os.path.splitext(os.path.basename(path))[0])
+    return tsp
+
+
+def load_tour(path):
+    """
+    TSPLIB の .tour ファイルから巡回路を読み込む。
+
+    :param path: 読み込む .tour ファイル
+    :return: 0 始まりの都市インデックスの int32 配列
+    """
+    tour = read_tsplib(path).tour
+    if tour is None:
+        raise ValueError(f"{path} has no TOUR_SECTION")
+    return tour
+
+
+def _write_header(f, fields):
+    for key, value in fields.items():
+        if value is not None:
+            f.write(f"{key} : {value}\n")
+
+
+def save_tsp(path, tsp, name=None, edge_weight_type="EUC_2D", comment=None):
+    """
+    TSP インスタンスを TSPLIB の .tsp ファイルに書き出す。
+
+    :param path: 書き出し先のファイル
+    :param tsp: 書き出す TSP インスタンス
+    :param name: 問題名（省略時は tsp.name かファイル名）
+    :param edge_weight_type: "EUC_2D", "CEIL_2D", "ATT", "GEO" なら座標を、"EXPLICIT" なら距離行列（FULL_MATRIX）を書く
+    :param comment: COMMENT 行
+    """
+    edge_weight_type = edge_weight_type.upper()
+    if edge_weight_type != "EXPLICIT" and edge_weight_type not in EDGE_WEIGHT_METRICS:
+        raise ValueError(f"Unsupported EDGE_WEIGHT_TYPE: {edge_weight_type}")
+    if name is None:
+        name = getattr(tsp, "name", os.path.splitext(os.path.basename(path))[0])
+    explicit = edge_weight_type == "EXPLICIT"
+    with open(path, "w") as f:
+        _write_header(f, {
+            "NAME": name,
+            "TYPE": "TSP",
+            "COMMENT": comment,
+            "DIMENSION": tsp.num_cities,
+            "EDGE_WEIGHT_TYPE": edge_weight_type,
+            "EDGE_WEIGHT_FORMAT": "FULL_MATRIX" if explicit else None,
+            "DISPLAY_DATA_TYPE": "TWOD_DISPLAY" if explicit else None,
+        })
+        cities = np.asarray(tsp.cities)
+        if explicit:
+            f.write("EDGE_WEIGHT_SECTION\n")
+            # 1 行でも整数でない距離があれば、全体を小数で書く
+            integral = all(np.all(np.mod(tsp.distance.row(i), 1) == 0) for i in range(tsp.num_cities))
+            for i in range(tsp.num_cities):
+                np.savetxt(f, tsp.distance.row(i)[None], fmt="%d" if integral else "%.10g")
+            f.write("DISPLAY_DATA_SECTION\n")
+        else:
+            f.write("NODE_COORD_SECTION\n")
+        ids = np.arange(1, tsp.num_cities + 1)
+        fmt = "%d %d %d" if np.issubdtype(cities.dtype, np.integer) else "%d %.10g %.10g"
+        np.savetxt(f, np.column_stack([ids, cities]), fmt=fmt)
+        f.write("EOF\n")
+
+
+def save_tour(path, tour, name=None, comment=None):
+    """
+    巡回路を TSPLIB の .tour ファイルに書き出す。
+
+    :param path: 書き出し先のファイル
+    :param tour: 0 始まりの都市インデックスの配列
+    :param name: 巡回路の名前（省略時はファイル名）
+    :param comment: COMMENT 行
+    """
+    tour = np.asarray(tour)
+    if name is None:
+        name = os.path.splitext(os.path.basename(path))[0]
+    with open(path, "w") as f:
+        _write_header(f, {"NAME": name, "TYPE": "TOUR", "COMMENT": comment, "DIMENSION": len(tour)})
+        f.write("TOUR_SECTION\n")
+        np.savetxt(f, tour + 1, fmt="%d")
+        f.write("-1\nEOF\n")
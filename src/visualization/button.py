@@ -1,16 +1,12 @@
 import pygame
 from src.config import Config
+from src.visualization.fonts import get_font, render_text
 
 class Button:
     def __init__(self, x, y, w, h, text=''):
-        font_name = pygame.font.match_font(Config.FONT_NAME)
-        if font_name:
-            font = pygame.font.Font(font_name, Config.BUTTON_FONT_SIZE) # フォント設定
-        else:
-            raise ValueError(f"Cannot find font named {Config.FONT_NAME}")
         self.rect = pygame.Rect(x, y, w, h)
         self.text = text
-        self.text_surface = font.render(text, True, Config.BUTTON_TEXT_COLOR)
+        self.text_surface = render_text(text, Config.BUTTON_FONT_SIZE, Config.BUTTON_TEXT_COLOR)
         self.active = False
 
     def draw(self, screen):
@@ -33,15 +29,11 @@ class Button:
     
 class InputBox:
     def __init__(self, x, y, w, h, text=''):
-        font_name = pygame.font.match_font(Config.FONT_NAME)
-        if font_name:
-            self.font = pygame.font.Font(font_name, Config.INPUT_FONT_SIZE) # フォント設定
-        else:
-            raise ValueError(f"Cannot find font named {Config.FONT_NAME}")
+        self.font = get_font(Config.INPUT_FONT_SIZE) # フォント設定
         self.rect = pygame.Rect(x, y, w, h)
         self.color = Config.INPUT_COLOR_INACTIVE
         self.text = text
-        self.txt_surface = self.font.render(text, True, self.color)
+        self.txt_surface = render_text(text, Config.INPUT_FONT_SIZE, self.color)
         self.active = False
     def handle_event(self, event):
         r = ""
@@ -62,7 +54,7 @@ class InputBox:
                     self.text = self.text[:-1]
                 else:
                     self.text += event.unicode
-                self.txt_surface = self.font.render(self.text, True, self.color)
+                self.txt_surface = render_text(self.text, Config.INPUT_FONT_SIZE, self.color)
         return r
     def update(self):
         width = max(200, self.txt_surface.get_width()+10)
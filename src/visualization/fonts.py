@@ -0,0 +1,48 @@
+from functools import lru_cache
+
+import pygame
+
+from src.config import Config
+
+
+@lru_cache(maxsize=None)
+def _font_path(name):
+    """ フォント名からフォントファイルを探す（フォント名ごとに 1 回だけ） """
+    path = pygame.font.match_font(name)
+    if not path:
+        raise ValueError(f"Cannot find font named {name}")
+    return path
+
+
+@lru_cache(maxsize=None)
+def get_font(size, name=Config.FONT_NAME):
+    """
+    フォントを取得する。同じフォント名とサイズには同じ Font を返す。
+
+    :param size: フォントサイズ
+    :param name: フォント名
+    :return: pygame.font.Font
+    """
+    return pygame.font.Font(_font_path(name), size)
+
+
+@lru_cache(maxsize=Config.TEXT_CACHE_SIZE)
+def render_text(text, size, color, name=Config.FONT_NAME):
+    """
+    テキストを描画したサーフェスを取得する。最近使った (テキスト, フォント, 色) の組はキャッシュから返す。
+    返したサーフェスは共有されるので、呼び出し側で書き換えないこと。
+
+    :param text: 描画するテキスト
+    :param size: フォントサイズ
+    :param color: 文字色
+    :param name: フォント名
+    :return: pygame.Surface
+    """
+    return get_font(size, name).render(text, True, color)
+
+
+def clear_cache():
+    """ キャッシュを空にする（pygame.font を初期化し直したときに呼ぶ） """
+    render_text.cache_clear()
+    get_font.cache_clear()
+    _font_path.cache_clear()
@@ -1,22 +1,22 @@
 import pygame
 import numpy as np
+from scipy.spatial import cKDTree
 
 from src.config import Config
+from src.optimizer_runner import OptimizerRunner
 from src.visualization.button import Button
+from src.visualization.fonts import get_font, render_text
+from src.visualization.viewport import Viewport
 
 class Main_Screen:
     # 使用ボタン
-    RESET_B, UNDO_B, SETTING_B, QUIT_B = "リセット(R)", "やり直し(Z)", "ゲーム設定(S)", "終了(Q)"
-    BUTTONS = [RESET_B, UNDO_B, SETTING_B, QUIT_B]
+    RESET_B, UNDO_B, OPTIMIZE_B, SETTING_B, QUIT_B = "リセット(R)", "やり直し(Z)", "最適化(O)", "ゲーム設定(S)", "終了(Q)"
+    BUTTONS = [RESET_B, UNDO_B, OPTIMIZE_B, SETTING_B, QUIT_B]
 
     def __init__(self, screen):
         """ メイン画面の初期設定 """
-        font_name = pygame.font.match_font(Config.FONT_NAME)
-        if font_name:
-            self.city_font = pygame.font.Font(font_name, Config.CITY_FONT_SIZE) # フォント設定
-            self.route_font = pygame.font.Font(font_name, Config.ROUTE_FONT_SIZE) # フォント設定
-        else:
-            raise ValueError(f"Cannot find font named {Config.FONT_NAME}")
+        self.city_font = get_font(Config.CITY_FONT_SIZE) # フォント設定
+        self.route_font = get_font(Config.ROUTE_FONT_SIZE) # フォント設定
 
         # ボタンリスト
         self.buttons = self._create_buttons(screen)
@@ -26,9 +26,35 @@ class Main_Screen:
         city_radius = min(width, height)*Config.CITY_RADIUS_RATIO
         self.city_radius = max(city_radius, Config.MINIMUM_CITY_RADIUS)
 
+        # 都市座標と画面座標の変換（パンとズーム）
+        self.viewport = Viewport(width, height - Config.UI_HEIGHT - Config.DSP_HEIGHT)
+
         # プレーヤーが入力したルート情報
         self.player_route = []
 
+        # 裏で動かす最適化（描画のたびに最新の途中経過だけを読む）
+        self.optimizer = None
+
+        # マウスが重なっている都市（なければ None）
+        self.hovered_city = None
+
+        # 都市の画面座標と当たり判定用の KD-tree（表示範囲か TSP インスタンスが変わったときだけ作り直す）
+        self._positions_key = None
+        self._city_points = None
+        self._city_tree = None
+
+        # 描画のキャッシュ（前回描いた状態と、都市円と番号を描いたオフスクリーンのサーフェス）
+        self._layer_key = None
+        self._city_layer = None
+        self._map_surface = None  # ホバー表示を除いた都市表示領域
+        self._hover_rect = None
+        self._drawn_route = []
+        self._drawn_generation = None
+        self._drawn_distance = None
+        self._drawn_hover = None
+        self._drawn_hover_city = None
+        self._needs_full_redraw = True
+
     def handle_events(self, events, screen, tsp):
         running = True
         current_screen = Config.MAIN_SCREEN
@@ -41,60 +67,187 @@ class Main_Screen:
                 width, height = screen.get_size()
                 city_radius = min(width, height)*Config.CITY_RADIUS_RATIO
                 self.city_radius = max(city_radius, Config.MINIMUM_CITY_RADIUS)
-            elif event.type == pygame.MOUSEBUTTONDOWN:
+                self.viewport.set_size(width, height - Config.UI_HEIGHT - Config.DSP_HEIGHT)
+                self.invalidate()  # set_mode は新しい空の画面を返すので、同じサイズでも全体を描き直す
+            elif event.type == pygame.MOUSEMOTION:
+                if event.buttons[1] or event.buttons[2]:  # 中・右ボタンのドラッグで表示を動かす
+                    self.viewport.pan(*event.rel, tsp)
+                self.hovered_city = self.city_at(event.pos, screen, tsp)
+            elif event.type == pygame.MOUSEWHEEL:  # ホイールでマウス位置を中心に拡大・縮小
+                self.viewport.zoom_at(pygame.mouse.get_pos(), Config.ZOOM_STEP ** event.y, tsp)
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 running, current_screen = self._handle_click(event.pos, screen, tsp)
             elif event.type == pygame.KEYDOWN:
-                running, current_screen = self._handle_key(event, screen)
+                running, current_screen = self._handle_key(event, screen, tsp)
 
         return running, current_screen, screen
 
     def draw(self, screen, tsp):
+        """
+        前回から変わった部分だけを描き直す。
+        都市円と番号は画面サイズか TSP インスタンスが変わったときだけオフスクリーンに描き直し、
+        プレーヤーのルートは都市が追加されただけなら新しい区間だけを描き足す。
+
+        :param screen: 描画先の画面
+        :param tsp: 表示する TSP インスタンス
+        :return: 描き直した矩形のリスト（pygame.display.update にそのまま渡す）
+        """
         width, height = screen.get_size()
-        """ 背景設定 """
-        screen.fill(Config.MAIN_BG_COLOR)  # 都市を表示する領域
-        pygame.draw.rect(screen, Config.UI_BG_COLOR, (0, height - Config.UI_HEIGHT, width, Config.UI_HEIGHT))  # UI部分の色を変える
-        pygame.draw.rect(screen, Config.DSP_BG_COLOR, (0, height - Config.UI_HEIGHT - Config.DSP_HEIGHT, width, Config.DSP_HEIGHT))  # DSP部分の色を変える
-
-        """ 都市ルートの描画 """
-        # 都市円の描画
-        for i, city in enumerate(tsp.cities):
-            screen_x, screen_y = self._coord_to_screen(city, screen)
-            if i in self.player_route:
-                pygame.draw.circle(screen, Config.CITY_COLOR_SELECTED, (screen_x, screen_y), self.city_radius)
-            else:
-                pygame.draw.circle(screen, Config.CITY_COLOR, (screen_x, screen_y), self.city_radius)
-            text_surface = self.city_font.render(str(i), True, Config.CITY_TEXT_COLOR)
-            screen.blit(text_surface, (screen_x - self.city_radius - Config.CITY_TEXT_OFFSET, 
-                                       screen_y  - self.city_radius - Config.CITY_TEXT_OFFSET))
+        map_rect = pygame.Rect(0, 0, width, height - Config.UI_HEIGHT - Config.DSP_HEIGHT)
+        dsp_rect = pygame.Rect(0, map_rect.bottom, width, Config.DSP_HEIGHT)
+        ui_rect = pygame.Rect(0, dsp_rect.bottom, width, Config.UI_HEIGHT)
+
+        full_redraw = self._needs_full_redraw or self._layer_key != (self.viewport.version, tsp)
+        if self._layer_key != (self.viewport.version, tsp):
+            self._build_city_layer(screen, tsp)
+        snapshot = self.optimizer.latest() if self.optimizer is not None and self.optimizer.tsp is tsp else None
+        generation, distance = (None, None) if snapshot is None else (snapshot.generation, snapshot.distance)
+        route = self.player_route
+        appended = self._drawn_route == route[:len(self._drawn_route)]
+
+        dirty = []
+        """ 都市ルートの描画（最適化のルートは最良値が変わったときだけ描き直す） """
+        if full_redraw or distance != self._drawn_distance or not appended:
+            self._draw_map(tsp, snapshot)
+            dirty.append(screen.blit(self._map_surface, (0, 0)))
+        elif len(route) > len(self._drawn_route):
+            dirty.extend(screen.blit(self._map_surface, rect, rect) for rect in self._draw_route_tail(tsp))
+        map_changed = bool(dirty)
+
+        """ ホバー中の都市の強調表示（前回の強調は都市表示領域のキャッシュから戻す） """
+        if map_changed or self.hovered_city != self._drawn_hover_city:
+            if self._hover_rect is not None:
+                dirty.append(screen.blit(self._map_surface, self._hover_rect, self._hover_rect))
+                self._hover_rect = None
+            if self.hovered_city is not None:
+                self._hover_rect = pygame.draw.circle(screen, Config.CITY_HOVER_COLOR, self._city_points[self.hovered_city],
+                                                      self.city_radius + 3, 3).clip(map_rect)
+                dirty.append(self._hover_rect)
+            self._drawn_hover_city = self.hovered_city
 
-        # ルートの描画
-        if len(self.player_route) > 1:
-            for i in range(len(self.player_route) - 1):
-                city1 = self._coord_to_screen(tsp.cities[self.player_route[i]], screen)
-                city2 = self._coord_to_screen(tsp.cities[self.player_route[i + 1]], screen)
-                pygame.draw.line(screen, Config.LINE_COLOR, city1, city2, 2)
-
-            # 最後の都市から最初の都市へ閉じる（巡回ルート）
-            if len(self.player_route) == tsp.num_cities:
-                pygame.draw.line(screen, Config.LINE_COLOR, 
-                                 self._coord_to_screen(tsp.cities[self.player_route[-1]], screen), 
-                                 self._coord_to_screen(tsp.cities[self.player_route[0]], screen), 2)
-        
         """ コンソールの描画 """
-        width, height = screen.get_size()
+        if map_changed or generation != self._drawn_generation:
+            self._draw_console(screen, dsp_rect, tsp, snapshot)
+            dirty.append(dsp_rect)
+        self._drawn_route = list(route)
+        self._drawn_generation, self._drawn_distance = generation, distance
+
+        """ ボタンの描画（ホバー中のボタンが変わったときだけ） """
+        mouse_pos = pygame.mouse.get_pos()
+        hovered = next((name for name, b in self.buttons.items() if b.rect.collidepoint(mouse_pos)), None)
+        if full_redraw or hovered != self._drawn_hover:
+            pygame.draw.rect(screen, Config.UI_BG_COLOR, ui_rect)
+            for _, b in self.buttons.items():
+                b.draw(screen)
+            dirty.append(ui_rect)
+            self._drawn_hover = hovered
+
+        self._needs_full_redraw = False
+        return dirty
+
+    def invalidate(self):
+        """ 次の draw で画面全体を描き直す（他の画面から戻ったときなど） """
+        self._needs_full_redraw = True
+
+    def city_at(self, pos, screen, tsp):
+        """
+        画面上の位置にある都市を探す。
+
+        :param pos: 画面上の位置 (x, y)
+        :param screen: 表示している画面
+        :param tsp: 表示している TSP インスタンス
+        :return: 都市番号（都市がなければ None）
+        """
+        self._update_positions(screen, tsp)
+        if pos[1] >= self.viewport.height or len(self._city_points) == 0:
+            return None
+        distance, i = self._city_tree.query(pos, distance_upper_bound=self.city_radius*1.2)
+        return int(i) if np.isfinite(distance) else None
+
+    def _update_positions(self, screen, tsp):
+        """ 表示範囲か TSP インスタンスが変わっていれば、都市の画面座標と KD-tree を作り直す """
+        if self._positions_key == (self.viewport.version, tsp):
+            return
+        points = self.viewport.positions(tsp)
+        self._city_points = points.tolist()
+        self._city_tree = cKDTree(points)
+        self._positions_key = (self.viewport.version, tsp)
+        self.hovered_city = None
+
+    def _build_city_layer(self, screen, tsp):
+        """ 都市円と番号をオフスクリーンのサーフェスに描く（背景色の部分は透過） """
+        self._update_positions(screen, tsp)
+        layer = pygame.Surface((self.viewport.width, max(self.viewport.height, 1)))
+        layer.fill(Config.MAIN_BG_COLOR)
+        layer.set_colorkey(Config.MAIN_BG_COLOR)
+        for i, point in enumerate(self._city_points):
+            self._draw_city(layer, i, point, Config.CITY_COLOR)
+        self._city_layer = layer
+        self._layer_key = (self.viewport.version, tsp)
+
+    def _draw_city(self, surface, i, point, color):
+        """ 都市円と都市番号を描き、描いた範囲を返す """
+        rect = pygame.draw.circle(surface, color, point, self.city_radius)
+        text_surface = render_text(str(i), Config.CITY_FONT_SIZE, Config.CITY_TEXT_COLOR)
+        return rect.union(surface.blit(text_surface, (point[0] - self.city_radius - Config.CITY_TEXT_OFFSET,
+                                                      point[1] - self.city_radius - Config.CITY_TEXT_OFFSET)))
+
+    def _draw_map(self, tsp, snapshot):
+        """ 都市を表示する領域をオフスクリーンに全部描き直す """
+        if self._map_surface is None or self._map_surface.get_size() != self._city_layer.get_size():
+            self._map_surface = pygame.Surface(self._city_layer.get_size())
+        surface = self._map_surface
+        surface.fill(Config.MAIN_BG_COLOR)
+        # 最適化の最良ルートの描画（都市円の下に描く）
+        points = self._city_points
+        if snapshot is not None:
+            pygame.draw.lines(surface, Config.OPT_LINE_COLOR, True, [points[i] for i in snapshot.route.tolist()], 2)
+        surface.blit(self._city_layer, (0, 0))
+
+        # 選択済み都市とルートの描画
+        for i in self.player_route:
+            self._draw_city(surface, i, points[i], Config.CITY_COLOR_SELECTED)
+        if len(self.player_route) > 1:
+            pygame.draw.lines(surface, Config.LINE_COLOR, len(self.player_route) == tsp.num_cities,
+                              [points[i] for i in self.player_route], 2)
+
+    def _draw_route_tail(self, tsp):
+        """ 前回の描画から追加された都市とその区間だけをオフスクリーンに描き足し、描いた範囲のリストを返す """
+        surface = self._map_surface
+        points = self._city_points
+        route = self.player_route
+        dirty = []
+        for k in range(len(self._drawn_route), len(route)):
+            dirty.append(self._draw_city(surface, route[k], points[route[k]], Config.CITY_COLOR_SELECTED))
+            if k > 0:
+                dirty.append(pygame.draw.line(surface, Config.LINE_COLOR, points[route[k - 1]], points[route[k]], 2))
+        # 最後の都市から最初の都市へ閉じる（巡回ルート）
+        if len(route) == tsp.num_cities and len(route) > 1:
+            dirty.append(pygame.draw.line(surface, Config.LINE_COLOR, points[route[-1]], points[route[0]], 2))
+        return dirty
+
+    def _draw_console(self, screen, dsp_rect, tsp, snapshot):
+        """ ルートと総ルート長の表示を描き直す """
+        screen.fill(Config.DSP_BG_COLOR, dsp_rect)
         info_text = "ルート: " + " -> ".join(map(str, self.player_route))
+        # クリックのたびに変わるテキストはキャッシュに入れない（都市ラベルの分を押し出さないように）
         text_surface = self.route_font.render(info_text, True, Config.ROUTE_TEXT_COLOR)
         # y_pos = height - (Config.UI_HEIGHT + Config.DSP_HEIGHT) + (Config.DSP_HEIGHT - Config.FONT_SIZE) // 2
-        y_pos = height - (Config.UI_HEIGHT + Config.DSP_HEIGHT)
+        y_pos = dsp_rect.top
         screen.blit(text_surface, (10, y_pos))
         if len(self.player_route) == tsp.num_cities:
-            result_text = f"  総ルート長： {tsp.compute_route_distance(self.player_route):.3f}"
+            if getattr(tsp, "num_objectives", 1) > 1:
+                objectives = tsp.compute_route_objective(self.player_route)
+                result_text = "  総ルート長： " + " / ".join(f"{value:.3f}" for value in objectives)
+            else:
+                result_text = f"  総ルート長： {tsp.compute_route_distance(self.player_route):.3f}"
             text_surface = self.route_font.render(result_text, True, Config.ROUTE_TEXT_COLOR)
             screen.blit(text_surface, (10, y_pos + Config.ROUTE_FONT_SIZE + 5))
-
-        """ ボタンの描画 """
-        for _, b in self.buttons.items():
-            b.draw(screen)
+        if snapshot is not None:
+            optimizer_text = f"最適化: {snapshot.generation} 世代  総ルート長： {snapshot.distance:.3f}"
+            # 世代ごとに変わるテキストはキャッシュに入れない
+            text_surface = self.route_font.render(optimizer_text, True, Config.OPT_LINE_COLOR)
+            screen.blit(text_surface, (dsp_rect.width // 2, y_pos + Config.ROUTE_FONT_SIZE + 5))
 
     def _create_buttons(self, screen):
         """ ボタンの配置を動的に決定 """
@@ -111,19 +264,6 @@ class Main_Screen:
 
         return buttons
     
-    def _coord_to_screen(self, coord, screen):
-        """ 座標を画面スケールに変換 """
-        x, y = coord
-        width, height = screen.get_size()
-        height += -1 * (Config.UI_HEIGHT + Config.DSP_HEIGHT)
-        margin_x = width * Config.MARGIN_RATIO
-        margin_y = height * Config.MARGIN_RATIO
-        
-        screen_x = int(margin_x + (x - Config.COORD_MIN) / (Config.COORD_MAX - Config.COORD_MIN) * (width - 2 * margin_x))
-        screen_y = int(margin_y + (y - Config.COORD_MIN) / (Config.COORD_MAX - Config.COORD_MIN) * (height - 2 * margin_y))
-        
-        return screen_x, screen_y
-    
     def _handle_click(self, pos, screen, tsp):
         running = True
         current_screen = Config.MAIN_SCREEN
@@ -134,21 +274,20 @@ class Main_Screen:
                     self._reset_route()
                 elif button_name == "やり直し(Z)":
                     self._undo_last_selection()
+                elif button_name == "最適化(O)":
+                    self._toggle_optimizer(tsp)
                 elif button_name == "ゲーム設定(S)":
                     current_screen = Config.SETTINGS_SCREEN  # 設定画面へ移行
                 elif button_name == "終了(Q)":
                     running = False
 
         # 都市の選択処理
-        for i, city in enumerate(tsp.cities):
-            screen_x, screen_y = self._coord_to_screen(city, screen)
-
-            if np.linalg.norm(np.array(pos) - np.array([screen_x, screen_y])) < self.city_radius*1.2:
-                if i not in self.player_route:
-                    self.player_route.append(i)
+        i = self.city_at(pos, screen, tsp)
+        if i is not None and i not in self.player_route:
+            self.player_route.append(i)
         return running, current_screen
 
-    def _handle_key(self, event, screen):
+    def _handle_key(self, event, screen, tsp):
         running = True
         current_screen = Config.MAIN_SCREEN
         if event.key == pygame.K_r:  
@@ -157,8 +296,12 @@ class Main_Screen:
             running = False  # 終了
         elif event.key == pygame.K_z:  
             self._undo_last_selection()  # 設定したルートをひとつ戻す
+        elif event.key == pygame.K_o:
+            self._toggle_optimizer(tsp)  # 最適化の開始・停止
         elif event.key == pygame.K_s:
             current_screen = Config.SETTINGS_SCREEN  # 設定画面に移行
+        elif event.key == pygame.K_HOME:
+            self.viewport.reset()  # パンとズームを元に戻す
         
         return running, current_screen
 
@@ -170,3 +313,19 @@ class Main_Screen:
         """ 最後の選択を元に戻す """
         if self.player_route:
             self.player_route.pop()
+
+    def _toggle_optimizer(self, tsp):
+        """ 最適化を開始する（実行中なら止める） """
+        if self.optimizer is not None and self.optimizer.running:
+            self.optimizer.stop()
+            return
+        if self.optimizer is None or self.optimizer.tsp is not tsp:
+            self.optimizer = OptimizerRunner(tsp, Config.POPULATION_SIZE, Config.MUTATION_RATE, Config.TOURNAMENT_SIZE,
+                                             mode=Config.OPTIMIZER_MODE, seed=Config.SEED, crossover=Config.CROSSOVER,
+                                             mutation=Config.MUTATION)
+        self.optimizer.start()
+
+    def close(self):
+        """ 最適化を止める """
+        if self.optimizer is not None:
+            self.optimizer.stop()
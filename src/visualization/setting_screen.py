@@ -3,6 +3,7 @@ import numpy as np
 
 from src.config import Config
 from src.visualization.button import Button, InputBox
+from src.visualization.fonts import get_font
 
 class Setting_Screen:
     # 使用ボタン
@@ -13,13 +14,9 @@ class Setting_Screen:
 
     def __init__(self, screen):
         """ 設定画面の初期設定 """
-        font_name = pygame.font.match_font(Config.FONT_NAME)
-        if font_name:
-            self.city_font = pygame.font.Font(font_name, Config.CITY_FONT_SIZE) # フォント設定
-            self.route_font = pygame.font.Font(font_name, Config.ROUTE_FONT_SIZE) # フォント設定
-        else:
-            raise ValueError(f"Cannot find font named {Config.FONT_NAME}")
-        
+        self.city_font = get_font(Config.CITY_FONT_SIZE) # フォント設定
+        self.route_font = get_font(Config.ROUTE_FONT_SIZE) # フォント設定
+
         # ボタンリスト
         self.buttons = self._create_buttons(screen)
         self.inputs = self._create_inputs(screen)
@@ -0,0 +1,115 @@
+import numpy as np
+
+from src.config import Config
+
+
+class Viewport:
+    """
+    都市座標と画面座標の変換。都市表示領域の大きさ、パン、ズームを保持し、
+    都市全体の画面座標を NumPy でまとめて計算して、状態が変わるまでキャッシュする。
+    """
+    MIN_ZOOM: float = 0.5  # ズーム倍率の下限
+    MAX_ZOOM: float = 64.0  # ズーム倍率の上限
+
+    def __init__(self, width, height):
+        """
+        Viewport クラスの初期化。
+
+        :param width: 都市表示領域の幅
+        :param height: 都市表示領域の高さ
+        """
+        self.width = width
+        self.height = height
+        self.zoom = 1.0
+        self.center = None  # 画面中央に表示する都市座標（None なら座標範囲の中央）
+        self.version = 0  # 変換が変わるたびに増える
+        self._cache_key = None
+        self._positions = None
+
+    def set_size(self, width, height):
+        """ 都市表示領域の大きさを変更する """
+        if (width, height) != (self.width, self.height):
+            self.width, self.height = width, height
+            self.version += 1
+
+    def reset(self):
+        """ パンとズームを初期状態に戻す """
+        self.zoom = 1.0
+        self.center = None
+        self.version += 1
+
+    def _transform(self, tsp):
+        """ 座標範囲からスケール (2,) と画面中央に対応する都市座標 (2,) を求める """
+        size = np.array([self.width, self.height], dtype=np.float64)
+        span = max(tsp.coord_max - tsp.coord_min, 1)
+        scale = size * (1 - 2 * Config.MARGIN_RATIO) / span * self.zoom
+        center = np.full(2, (tsp.coord_min + tsp.coord_max) / 2) if self.center is None else self.center
+        return scale, center
+
+    def to_screen(self, coords, tsp):
+        """
+        都市座標を画面座標に変換する。
+
+        :param coords: (..., 2) の都市座標
+        :param tsp: 座標範囲を持つ TSP インスタンス
+        :return: (..., 2) の画面座標（整数）
+        """
+        scale, center = self._transform(tsp)
+        screen_center = np.array([self.width, self.height]) / 2
+        return ((np.asarray(coords) - center) * scale + screen_center).astype(np.int64)
+
+    def to_world(self, pos, tsp):
+        """
+        画面座標を都市座標に変換する。
+
+        :param pos: (..., 2) の画面座標
+        :param tsp: 座標範囲を持つ TSP インスタンス
+        :return: (..., 2) の都市座標
+        """
+        scale, center = self._transform(tsp)
+        screen_center = np.array([self.width, self.height]) / 2
+        return (np.asarray(pos, dtype=np.float64) - screen_center) / scale + center
+
+    def positions(self, tsp):
+        """
+        全都市の画面座標。画面の大きさ、パン、ズーム、TSP インスタンスが変わるまで同じ配列を返す。
+
+        :param tsp: 対象の TSP インスタンス
+        :return: (都市数, 2) の画面座標（読み取り専用）
+        """
+        key = (self.version, tsp)
+        if self._cache_key != key:
+            self._positions = self.to_screen(tsp.cities, tsp)
+            self._positions.flags.writeable = False
+            self._cache_key = key
+        return self._positions
+
+    def pan(self, dx, dy, tsp):
+        """
+        表示を画面上で (dx, dy) ピクセル動かす。
+
+        :param dx: 横方向の移動量
+        :param dy: 縦方向の移動量
+        :param tsp: 座標範囲を持つ TSP インスタンス
+        """
+        scale, center = self._transform(tsp)
+        self.center = center - np.array([dx, dy]) / scale
+        self.version += 1
+
+    def zoom_at(self, pos, factor, tsp):
+        """
+        画面上の位置 pos を固定したまま factor 倍に拡大する。
+
+        :param pos: 拡大の中心にする画面座標
+        :param factor: 拡大率（1 未満なら縮小）
+        :param tsp: 座標範囲を持つ TSP インスタンス
+        """
+        zoom = min(max(self.zoom * factor, self.MIN_ZOOM), self.MAX_ZOOM)
+        if zoom == self.zoom:
+            return
+        anchor = self.to_world(pos, tsp)
+        self.zoom = zoom
+        scale, _ = self._transform(tsp)
+        screen_center = np.array([self.width, self.height]) / 2
+        self.center = anchor - (np.asarray(pos, dtype=np.float64) - screen_center) / scale
+        self.version += 1
@@ -0,0 +1,60 @@
+import unittest
+import numpy as np
+from src.archive import ParetoArchive, canonical_tours
+
+
+def _hypervolume(points, reference):
+    """ 非劣解の集合の超体積を一から計算する（比較用） """
+    points = points[np.argsort(points[:, 0])]
+    right = np.r_[points[1:, 0], reference[0]]
+    return float(np.sum((right - points[:, 0]) * (reference[1] - points[:, 1])))
+
+
+class TestParetoArchive(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+        self.num_cities = 8
+
+    def _tours(self, n):
+        return np.argsort(np.random.random((n, self.num_cities)), axis=1)
+
+    def test_front_and_hypervolume(self):
+        """ 少しずつ追加しても前線が非劣解だけになり、超体積が一から計算したものと一致するか """
+        archive = ParetoArchive(self.num_cities, capacity=1000, reference=(1.0, 1.0))
+        points = []
+        for _ in range(20):
+            objectives = np.random.random((30, 2))
+            archive.add(self._tours(30), objectives)
+            points.append(objectives)
+        points = np.concatenate(points)
+        _, front = archive.get_front()
+        expected = points[[not np.any(np.all(points <= p, axis=1) & np.any(points < p, axis=1)) for p in points]]
+        np.testing.assert_allclose(front, expected[np.argsort(expected[:, 0])])
+        self.assertAlmostEqual(archive.hypervolume, _hypervolume(front, archive.reference))
+        self.assertTrue(archive.dominated(front).all())
+
+    def test_capacity(self):
+        """ 容量を超えたら寄与の小さい解から捨て、超体積を正しく保つか """
+        archive = ParetoArchive(self.num_cities, capacity=5, reference=(1.0, 1.0))
+        x = np.random.random(40)
+        archive.add(self._tours(40), np.column_stack([x, 1 - x]))
+        tours, front = archive.get_front()
+        self.assertEqual(len(archive), 5)
+        self.assertEqual(tours.shape, (5, self.num_cities))
+        self.assertEqual(tours.dtype, np.int32)
+        self.assertAlmostEqual(archive.hypervolume, _hypervolume(front, archive.reference))
+
+    def test_duplicate_tours(self):
+        """ 回転・逆回りした同じ巡回路を 1 つにまとめるか """
+        tour = np.array([3, 1, 4, 0, 5, 2, 7, 6])
+        variants = np.array([np.roll(tour, 3), tour[::-1], np.roll(tour[::-1], 5)])
+        self.assertEqual(len(np.unique(canonical_tours(variants), axis=0)), 1)
+        archive = ParetoArchive(self.num_cities)
+        self.assertEqual(archive.add(variants, np.tile([2.0, 3.0], (3, 1))), 1)
+        self.assertEqual(archive.add(tour[None], [[2.0, 3.0]]), 0)
+        self.assertEqual(archive.get_front()[0][0][0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from src.distance import DenseDistance
+from src.checkpoint import Checkpointer, load_checkpoint, save_checkpoint
+from src.tsp import TSP
+from src.tsp_ga import GeneticAlgorithm
+
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        """ テストごとにチェックポイントを書き出す一時ディレクトリを作成 """
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "run.npz")
+        self.tsp = TSP(30, 0, 100, rng=0)
+        self.ga = GeneticAlgorithm(self.tsp, 20, 0.2, 3, crossover="ox", mutation="inversion", rng=1)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_resume(self):
+        """ チェックポイントから再開すると、止めずに続けた場合と同じ集団になるか """
+        for _ in range(3):
+            self.ga.update()
+        save_checkpoint(self.path, self.ga)
+        for _ in range(3):
+            self.ga.update()
+
+        with mock.patch.object(GeneticAlgorithm, "evaluate") as evaluate:
+            resumed = load_checkpoint(self.path)
+        evaluate.assert_not_called()  # 保存した総距離をそのまま使う
+        self.assertEqual(resumed.generation, 3)
+        for _ in range(3):
+            resumed.update()
+        np.testing.assert_array_equal(resumed.population, self.ga.population)
+        np.testing.assert_allclose(resumed.fitness, self.ga.fitness)
+        self.assertEqual(resumed.evaluations, self.ga.evaluations)
+
+    def test_distance_definition(self):
+        """ 距離の定義と格納形式を保存して同じ距離で再開し、座標から作れない距離は tsp の指定を求めるか """
+        tsp = TSP.from_cities(self.tsp.cities, distance_metric="euc_2d", distance_dtype="int32")
+        save_checkpoint(self.path, GeneticAlgorithm(tsp, 10, 0.2, 3, rng=1))
+        resumed = load_checkpoint(self.path)
+        self.assertEqual(resumed.tsp.distance.metric, "euc_2d")
+        np.testing.assert_array_equal(resumed.tsp.distance_matrix, tsp.distance_matrix)
+        with self.assertRaises(ValueError):
+            load_checkpoint(self.path, tsp=self.tsp)
+
+        matrix = np.asarray(self.tsp.distance_matrix) * 2  # 座標からは求められない距離
+        explicit = TSP.from_cities(self.tsp.cities, distance=DenseDistance.from_matrix(matrix))
+        save_checkpoint(self.path, GeneticAlgorithm(explicit, 10, 0.2, 3, rng=1))
+        with self.assertRaises(ValueError):
+            load_checkpoint(self.path)
+        self.assertIs(load_checkpoint(self.path, tsp=explicit).tsp, explicit)
+
+    def test_background_writer(self):
+        """ バックグラウンドで書き出したファイルだけが残り、別の都市の TSP には読み込めないか """
+        checkpointer = Checkpointer(self.path, interval=0)
+        self.assertTrue(checkpointer.maybe_save(self.ga))
+        checkpointer.close()
+        self.assertEqual(os.listdir(self.tmpdir.name), ["run.npz"])
+        with np.load(self.path) as data:
+            self.assertEqual(data["population"].dtype, np.uint8)
+        with self.assertRaises(ValueError):
+            load_checkpoint(self.path, tsp=TSP(30, 0, 100, rng=2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+import numpy as np
+from src.cli import main
+from src.tsp import TSP
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        """ テストごとに結果を書き出す一時ディレクトリを作成 """
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.tmpdir.name, "result")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_jsonl_random_instances(self):
+        """ ランダムな問題ごとに 1 行ずつ、正しい巡回路とその総距離が書き出されるか """
+        main(["--cities", "30", "--instances", "2", "--generations", "3", "--output", self.output])
+        with open(self.output) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([r["instance"] for r in records], [0, 1])
+        for record in records:
+            self.assertEqual(record["generations"], 3)
+            self.assertEqual(sorted(record["tour"]), list(range(30)))
+            tsp = TSP(30, 0, 100, rng=record["seed"])
+            self.assertAlmostEqual(record["best_length"], tsp.compute_route_distance(record["tour"], closed=True))
+
+    def test_csv_from_file(self):
+        """ 座標ファイルを読み込み、局所探索の結果を CSV で書き出せるか """
+        path = os.path.join(self.tmpdir.name, "cities.npy")
+        np.save(path, np.random.randint(0, 1000, size=(25, 2)))
+        main([path, "--solver", "local_search", "--generations", "2", "--format", "csv", "--output", self.output])
+        with open(self.output, newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["instance"], path)
+        self.assertEqual(sorted(map(int, rows[0]["tour"].split())), list(range(25)))
+
+    def test_resume(self):
+        """ 再開した実行は保存した世代の続きから進み、評価数にチェックポイントまでの分が含まれるか """
+        checkpoint = os.path.join(self.tmpdir.name, "run.npz")
+        records = []
+        # 再開する 2 回目は GA の設定をチェックポイントから戻すので、個体数は最初の実行でだけ指定する
+        for options in (["--population", "20", "--generations", "5"], ["--generations", "8"]):
+            main(["--cities", "30", *options, "--checkpoint", checkpoint, "--resume", "--output", self.output])
+            with open(self.output) as f:
+                records.append(json.loads(f.readline()))
+        self.assertEqual([r["generations"] for r in records], [5, 8])
+        self.assertEqual(records[1]["evaluations"], records[0]["evaluations"] + 3 * 19)  # 1 世代 19 個の子
+
+        # チェックポイントから戻す GA の設定を変えようとするとエラーになる
+        with self.assertRaises(SystemExit), redirect_stderr(io.StringIO()):
+            main(["--cities", "30", "--population", "40", "--generations", "10", "--checkpoint", checkpoint,
+                  "--resume", "--output", self.output])
+
+    def test_does_not_import_pygame(self):
+        """ 画面のない環境で使えるよう、pygame を読み込まないか """
+        code = ("import sys; from src.cli import main; "
+                "main(['--generations', '1', '--output', sys.argv[1]]); print('pygame' in sys.modules)")
+        result = subprocess.run([sys.executable, "-c", code, self.output], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(result.stdout.strip(), "False")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+import numpy as np
+from src.tsp import TSP
+from src.tsp_ga import GeneticAlgorithm
+from src.evaluation import EVALUATORS, ProcessEvaluator
+
+class TestEvaluation(unittest.TestCase):
+
+    def setUp(self):
+        """ テストごとに新しいTSPインスタンスとランダムな集団を作成 """
+        self.num_cities = 30
+        self.tsp = TSP(self.num_cities, 0, 1000)
+        self.population = np.argsort(np.random.random((50, self.num_cities)), axis=1).astype(np.int32)
+        self.expected = self.tsp.compute_route_distances(self.population, closed=True)
+
+    def test_evaluators_match_serial(self):
+        """ どの評価器でも同じ総距離になるか（個体数が変わっても正しいか） """
+        for name, evaluator_class in EVALUATORS.items():
+            evaluator = evaluator_class(self.tsp, workers=2, chunk_size=7) if name != "serial" else evaluator_class(self.tsp)
+            try:
+                np.testing.assert_allclose(evaluator.evaluate(self.population), self.expected, err_msg=name)
+                np.testing.assert_allclose(evaluator.evaluate(self.population[:5]), self.expected[:5], err_msg=name)
+                self.assertEqual(len(evaluator.evaluate(self.population[:0])), 0)
+                bigger = np.concatenate([self.population, self.population])
+                np.testing.assert_allclose(evaluator.evaluate(bigger), np.tile(self.expected, 2), err_msg=name)
+            finally:
+                evaluator.close()
+
+    def test_ga_with_process_evaluator(self):
+        """ GA でプロセス並列の評価器を使えるか """
+        ga = GeneticAlgorithm(self.tsp, 20, 0.5, 3, evaluator=ProcessEvaluator(self.tsp, workers=2))
+        try:
+            for _ in range(3):
+                ga.update()
+            np.testing.assert_allclose(ga.fitness, self.tsp.compute_route_distances(ga.population, closed=True))
+        finally:
+            ga.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+from src.evaluation import ProcessEvaluator
+from src.tsp import TSP
+from src.island import TOPOLOGIES, IslandModel
+
+class TestIslandModel(unittest.TestCase):
+
+    def setUp(self):
+        """ テストごとに新しいTSPインスタンスを作成 """
+        self.num_cities = 30
+        self.tsp = TSP(self.num_cities, 0, 1000)
+
+    def test_run(self):
+        """ 各トポロジーで実行でき、最良ルートとその総距離が正しいか """
+        for topology in TOPOLOGIES:
+            with IslandModel(self.tsp, 3, 20, 0.3, 3, migration_interval=3, migrants=2, topology=topology, seed=0) as model:
+                first_route, first_distance = model.run(5)
+                route, distance = model.run(6)
+            self.assertEqual(model.generation, 11)
+            self.assertEqual(sorted(route.tolist()), list(range(self.num_cities)))
+            self.assertAlmostEqual(distance, self.tsp.compute_route_distance(route, closed=True))
+            self.assertLessEqual(distance, first_distance)
+
+    def test_process_evaluator_rejected(self):
+        """ 島のプロセスの中から起動できないプロセス評価を指定するとエラーになるか """
+        with self.assertRaises(ValueError):
+            IslandModel(self.tsp, 2, 10, 0.3, 3, evaluator="processes")
+        evaluator = ProcessEvaluator(self.tsp, workers=1)
+        try:
+            with self.assertRaises(ValueError):
+                IslandModel(self.tsp, 2, 10, 0.3, 3, evaluator=evaluator)
+        finally:
+            evaluator.close()
+
+    def test_topologies(self):
+        """ どのトポロジーでも島が自分自身から移民を受け取らないか """
+        for name, topology in TOPOLOGIES.items():
+            for i, sources in enumerate(topology(4, 0)):
+                self.assertTrue(sources, name)
+                self.assertNotIn(i, sources, name)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+import numpy as np
+from src.tsp import TSP
+from src.local_search import LocalSearch
+
+class TestLocalSearch(unittest.TestCase):
+
+    def setUp(self):
+        """ テストごとに新しいTSPインスタンスとランダムなルートを作成 """
+        self.num_cities = 60
+        self.tsp = TSP(self.num_cities, 0, 1000)
+        self.route = np.random.permutation(self.num_cities)
+
+    def _length(self, route):
+        return self.tsp.compute_route_distance(route, closed=True)
+
+    def test_result_is_permutation(self):
+        """ 改善後のルートがすべての都市を 1 回ずつ訪れるか """
+        local_search = LocalSearch(self.tsp)
+        for method in (local_search.two_opt, local_search.or_opt, local_search.optimize):
+            route = method(self.route)
+            self.assertEqual(route.dtype, np.int32)
+            self.assertEqual(sorted(route.tolist()), list(range(self.num_cities)))
+
+    def test_improves_route(self):
+        """ 改善後のルートが元のルートより短くなるか """
+        local_search = LocalSearch(self.tsp)
+        self.assertLess(self._length(local_search.optimize(self.route)), self._length(self.route))
+
+    def test_two_opt_local_optimum(self):
+        """ 全都市を近傍候補にした 2-opt が収束した後に、改善できる 2-opt 操作が残っていないか """
+        local_search = LocalSearch(self.tsp, k=self.num_cities - 1)
+        route = local_search.two_opt(self.route)
+        # don't-look bit で見落とした改善がなくなるまで繰り返す（改善がない回は全都市を調べている）
+        while self._length(local_search.two_opt(route)) < self._length(route):
+            route = local_search.two_opt(route)
+        length = self._length(route)
+        for i in range(self.num_cities - 1):
+            for j in range(i + 2, self.num_cities):
+                candidate = np.concatenate([route[:i + 1], route[i + 1:j + 1][::-1], route[j + 1:]])
+                self.assertGreaterEqual(self._length(candidate), length - 1e-6)
+
+    def test_or_opt_after_two_opt(self):
+        """ 2-opt の局所最適解に Or-opt を続けても長くならないか """
+        local_search = LocalSearch(self.tsp)
+        route = local_search.two_opt(self.route)
+        self.assertLessEqual(self._length(local_search.or_opt(route)), self._length(route) + 1e-6)
+
+if __name__ == '__main__':
+    unittest.main()
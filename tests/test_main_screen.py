@@ -0,0 +1,38 @@
+import os
+import unittest
+from unittest import mock
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # ウィンドウを開かずに描画する
+import pygame
+from src.tsp import TSP
+from src.visualization.main_screen import Main_Screen
+
+DEFAULT_FONT = os.path.join(os.path.dirname(pygame.__file__), pygame.font.get_default_font())
+
+
+class TestMainScreen(unittest.TestCase):
+
+    def setUp(self):
+        """ ダミーの画面とメイン画面を作成（フォントは pygame 付属のものを使う） """
+        pygame.init()
+        patcher = mock.patch("pygame.font.match_font", return_value=DEFAULT_FONT)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.screen = pygame.display.set_mode((800, 730), pygame.RESIZABLE)
+        self.main_screen = Main_Screen(self.screen)
+        self.tsp = TSP(10, 0, 100, rng=0)
+
+    def tearDown(self):
+        pygame.quit()
+
+    def test_same_size_resize_redraws(self):
+        """ 同じサイズへのリサイズでも、次の draw で画面全体を描き直すか """
+        self.main_screen.draw(self.screen, self.tsp)
+        self.assertEqual(self.main_screen.draw(self.screen, self.tsp), [])
+        event = pygame.event.Event(pygame.VIDEORESIZE, w=800, h=730, size=(800, 730))
+        _, _, screen = self.main_screen.handle_events([event], self.screen, self.tsp)
+        dirty = self.main_screen.draw(screen, self.tsp)
+        self.assertEqual(dirty[0].unionall(dirty[1:]), screen.get_rect())
+
+
+if __name__ == "__main__":
+    unittest.main()
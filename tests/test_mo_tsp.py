@@ -0,0 +1,42 @@
+import unittest
+import numpy as np
+from src.mo_tsp import MultiObjectiveTSP
+from src.tsp import TSP
+
+
+class TestMultiObjectiveTSP(unittest.TestCase):
+
+    def setUp(self):
+        """ テストごとに新しいMultiObjectiveTSPインスタンスを作成 """
+        rng = np.random.default_rng(0)
+        self.tsp = MultiObjectiveTSP(20, 3, 0, 100, rng=rng)
+        self.routes = np.argsort(rng.random((8, 20)), axis=1)
+
+    def test_objective_stack(self):
+        """ 全目的の距離行列が 1 つの連続した配列で、目的 0 が都市座標の距離行列と共有されているか """
+        self.assertEqual(self.tsp.objective_matrices.shape, (3, 20, 20))
+        self.assertTrue(self.tsp.objective_matrices.flags.c_contiguous)
+        self.assertTrue(np.shares_memory(self.tsp.distance_matrix, self.tsp.objective_matrices))
+        np.testing.assert_array_equal(self.tsp.layers[0], self.tsp.cities)
+
+    def test_objectives_match_single_objective(self):
+        """ まとめて計算した各目的の距離が、目的ごとの TSP で計算した距離と一致するか """
+        for closed in (False, True):
+            objectives = self.tsp.compute_route_objectives(self.routes, closed=closed)
+            self.assertEqual(objectives.shape, (8, 3))
+            for m, layer in enumerate(self.tsp.layers):
+                expected = TSP.from_cities(layer).compute_route_distances(self.routes, closed=closed)
+                np.testing.assert_allclose(objectives[:, m], expected)
+            np.testing.assert_allclose(self.tsp.compute_route_objective(self.routes[0], closed=closed), objectives[0])
+
+    def test_lazy_backend(self):
+        """ 距離行列を持たない lazy バックエンドでも同じ値になるか """
+        lazy = MultiObjectiveTSP.from_layers(self.tsp.layers, distance_backend="lazy")
+        self.assertIsNone(lazy.objective_matrices)
+        lazy.LAZY_CHUNK_ELEMENTS = 100  # 分割して計算する経路も通す
+        np.testing.assert_allclose(lazy.compute_route_objectives(self.routes, closed=True),
+                                   self.tsp.compute_route_objectives(self.routes, closed=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
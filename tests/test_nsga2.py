@@ -0,0 +1,63 @@
+import unittest
+import numpy as np
+from src.archive import ParetoArchive
+from src.mo_tsp import MultiObjectiveTSP
+from src.nsga2 import NSGA2, crowding_distance, non_dominated_sort
+
+
+def _naive_rank(objectives):
+    """ 総当たりで求めた前線番号（比較用） """
+    remaining = set(range(len(objectives)))
+    rank = np.empty(len(objectives), dtype=np.int64)
+    r = 0
+    while remaining:
+        front = [i for i in remaining
+                 if not any(np.all(objectives[j] <= objectives[i]) and np.any(objectives[j] < objectives[i])
+                            for j in remaining)]
+        rank[front] = r
+        remaining -= set(front)
+        r += 1
+    return rank
+
+
+class TestNSGA2(unittest.TestCase):
+
+    def setUp(self):
+        np.random.seed(0)
+
+    def test_non_dominated_sort(self):
+        """ 前線番号が総当たりで求めたものと一致するか（同じ値の個体を含む） """
+        objectives = np.random.randint(0, 6, size=(60, 3)).astype(np.float64)
+        np.testing.assert_array_equal(non_dominated_sort(objectives), _naive_rank(objectives))
+
+    def test_crowding_distance(self):
+        """ 前線の両端が無限大、内側が前後の差を値の幅で割ったものの和になるか """
+        objectives = np.array([[0.0, 4.0], [1.0, 2.0], [4.0, 0.0], [5.0, 5.0]])
+        crowding = crowding_distance(objectives, non_dominated_sort(objectives))
+        self.assertTrue(np.isinf(crowding[[0, 2, 3]]).all())
+        self.assertAlmostEqual(crowding[1], 4 / 4 + 4 / 4)
+
+    def test_update(self):
+        """ 世代を進めても各個体が順列のままで、第 1 前線の目的値が計算し直したものと一致するか """
+        tsp = MultiObjectiveTSP(15, 2, 0, 100, rng=0)
+        nsga2 = NSGA2(tsp, 20, 0.2, rng=1)
+        for _ in range(5):
+            nsga2.update()
+        self.assertEqual(nsga2.population.shape, (20, 15))
+        np.testing.assert_array_equal(np.sort(nsga2.population, axis=1), np.tile(np.arange(15), (20, 1)))
+        routes, objectives = nsga2.get_pareto_front()
+        np.testing.assert_allclose(objectives, tsp.compute_route_objectives(routes, closed=True))
+
+    def test_archive(self):
+        """ 毎世代の第 1 前線がアーカイブに入り、集団の第 1 前線はアーカイブに弱支配されるか """
+        tsp = MultiObjectiveTSP(15, 2, 0, 100, rng=0)
+        archive = ParetoArchive(15, capacity=1000)
+        nsga2 = NSGA2(tsp, 20, 0.2, archive=archive, rng=1)
+        for _ in range(5):
+            nsga2.update()
+        self.assertGreater(archive.hypervolume, 0)
+        self.assertTrue(archive.dominated(nsga2.get_pareto_front()[1]).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import time
+import unittest
+import numpy as np
+from src.tsp import TSP
+from src.optimizer_runner import OptimizerRunner, SnapshotBuffer
+
+class TestOptimizerRunner(unittest.TestCase):
+
+    def setUp(self):
+        """ テストごとに新しいTSPインスタンスを作成 """
+        self.num_cities = 30
+        self.tsp = TSP(self.num_cities, 0, 1000)
+
+    def _wait_for_snapshot(self, runner, generation=2, timeout=30):
+        deadline = time.monotonic() + timeout
+        snapshot = runner.latest()
+        while (snapshot is None or snapshot.generation < generation) and time.monotonic() < deadline:
+            time.sleep(0.01)
+            snapshot = runner.latest()
+        return snapshot
+
+    def test_snapshot_buffer(self):
+        """ ダブルバッファに書き込んだ最新の途中経過だけが読めるか """
+        buffer = SnapshotBuffer(self.num_cities)
+        try:
+            self.assertIsNone(buffer.read())
+            for generation in range(1, 4):
+                route = np.random.permutation(self.num_cities)
+                buffer.publish(generation, route, 10.0 * generation)
+                snapshot = buffer.read()
+                self.assertEqual(snapshot.generation, generation)
+                np.testing.assert_array_equal(snapshot.route, route)
+                self.assertEqual(snapshot.distance, 10.0 * generation)
+        finally:
+            buffer.close()
+
+    def test_runner_publishes_best_route(self):
+        """ スレッドでもプロセスでも最良ルートとその総距離が届き、停止後も読めるか """
+        for mode in ("thread", "process"):
+            runner = OptimizerRunner(self.tsp, 20, 0.5, 3, mode=mode)
+            runner.start()
+            try:
+                snapshot = self._wait_for_snapshot(runner)
+            finally:
+                runner.stop()
+            self.assertFalse(runner.running)
+            self.assertIsNotNone(snapshot, mode)
+            self.assertEqual(sorted(snapshot.route.tolist()), list(range(self.num_cities)))
+            self.assertAlmostEqual(snapshot.distance, self.tsp.compute_route_distance(snapshot.route, closed=True))
+            self.assertGreaterEqual(runner.latest().generation, snapshot.generation)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,10 @@
+import os
+import tempfile
 import unittest
+from unittest import mock
 import numpy as np
 from src.tsp import TSP  # tsp.py をインポート
+from src.distance import DenseDistance, LazyDistance
 
 class TestTSP(unittest.TestCase):
 
@@ -27,9 +31,124 @@ class TestTSP(unittest.TestCase):
             distance = self.tsp.compute_route_distance(route)
             self.assertIsInstance(distance, float)  # 返り値が float であることを確認
 
+    def test_route_distances_batch(self):
+        """ まとめて計算した距離が 1 ルートずつ計算した距離と一致するか """
+        routes = np.array([np.random.permutation(self.num_cities) for _ in range(8)])
+        for closed in (False, True):
+            expected = [self.tsp.compute_route_distance(route, closed=closed) for route in routes]
+            np.testing.assert_allclose(self.tsp.compute_route_distances(routes, closed=closed), expected)
+
+    def test_closed_route_distance(self):
+        """ closed=True が始点に戻るルートと同じ距離になるか """
+        route = [0, 1, 2, 3, 4]
+        self.assertAlmostEqual(self.tsp.compute_route_distance(route, closed=True),
+                               self.tsp.compute_route_distance(route + [0]))
+
+    def test_lazy_distance(self):
+        """ 距離行列を持たない lazy バックエンドでも同じ距離になるか """
+        lazy = LazyDistance(self.tsp.cities, row_cache_size=2)
+        i, j = np.meshgrid(np.arange(self.num_cities), np.arange(self.num_cities))
+        np.testing.assert_allclose(lazy.pair(i, j), self.tsp.distance_matrix[i, j])
+        for city in [0, 1, 0, 2, 3]:
+            np.testing.assert_allclose(lazy.row(city), self.tsp.distance_matrix[city])
+        self.assertLessEqual(len(lazy._row_cache), 2)
+
+    def test_lazy_distance_chunks(self):
+        """ 大きなバッチを分割して計算しても、分割しない場合と同じ距離になるか """
+        lazy = LazyDistance(self.tsp.cities)
+        lazy.CHUNK_ELEMENTS = 7  # 分割して計算する経路も通す
+        routes = np.array([np.random.permutation(self.num_cities) for _ in range(8)])
+        np.testing.assert_allclose(lazy.pair(routes[:, :-1], routes[:, 1:]),
+                                   self.tsp.distance_matrix[routes[:, :-1], routes[:, 1:]])
+        np.testing.assert_allclose(lazy.pair(routes[:, -1], 0), self.tsp.distance_matrix[routes[:, -1], 0])
+
+    def test_lazy_backend_selection(self):
+        """ distance_backend="lazy" では距離行列を作らずにルート長を計算できるか """
+        tsp = TSP(self.num_cities, self.coord_min, self.coord_max, distance_backend="lazy")
+        self.assertIsNone(tsp.distance_matrix)
+        self.assertIsInstance(tsp.compute_route_distance([0, 1, 2], closed=True), float)
+
+    def test_compact_distance_dtype(self):
+        """ float32 / int32 で格納した距離行列が float64 版とほぼ一致するか """
+        for dtype, tolerance in (("float32", 1e-4), ("int32", 0.5)):
+            distance = DenseDistance(self.tsp.cities, dtype=dtype)
+            self.assertEqual(distance.matrix.dtype, np.dtype(dtype))
+            np.testing.assert_allclose(distance.matrix, self.tsp.distance_matrix, atol=tolerance)
+
+    def test_memmap_distance_file(self):
+        """ 書き出した距離行列を memmap で読み込み、同じ距離になるか """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "distance.npy")
+            distance = DenseDistance(self.tsp.cities, dtype="float32", path=path)
+            loaded = DenseDistance.load(path)
+            self.assertIsInstance(loaded.matrix, np.memmap)
+            self.assertFalse(loaded.matrix.flags.writeable)
+            np.testing.assert_array_equal(loaded.matrix, distance.matrix)
+
+    def test_distance_file_fingerprint(self):
+        """ 既存の距離行列ファイルは同じ都市・距離の定義・格納形式の場合だけ使い、違えばエラーになるか """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "distance.npy")
+            TSP.from_cities(self.tsp.cities, distance_path=path)
+            reused = TSP.from_cities(self.tsp.cities, distance_path=path)
+            self.assertIsInstance(reused.distance_matrix, np.memmap)
+            self.assertEqual(reused.distance.metric, "euclidean")
+            other = TSP(self.num_cities, self.coord_min, self.coord_max, rng=1)
+            for kwargs in ({"cities": other.cities}, {"cities": self.tsp.cities, "distance_metric": "euc_2d"},
+                           {"cities": self.tsp.cities, "distance_dtype": "float32"}):
+                with self.assertRaises(ValueError):
+                    TSP.from_cities(distance_path=path, **kwargs)
+
+            # 別の問題の行列で上書きするとき、新しい行列の横に古いハッシュが残る瞬間がないか
+            fingerprint = DenseDistance.fingerprint_path(path)
+            replace = os.replace
+            def checked_replace(src, dst):
+                if dst == path:
+                    self.assertFalse(os.path.exists(fingerprint))
+                replace(src, dst)
+            with mock.patch("os.replace", side_effect=checked_replace):
+                DenseDistance(other.cities, path=path)
+            DenseDistance.load(path, cities=other.cities)
+
+    def test_candidate_neighbors(self):
+        """ 近傍候補リストが自分自身を含まない重複なしの都市インデックスになっているか """
+        tsp = TSP(200, 0, 1000)
+        for method in ("knn", "quadrant", "delaunay"):
+            candidates = tsp.candidate_neighbors(k=8, method=method)
+            self.assertEqual(candidates.shape, (200, 8))
+            self.assertEqual(candidates.dtype, np.int32)
+            self.assertFalse(np.any(candidates == np.arange(200)[:, None]))
+            self.assertTrue(all(len(set(row)) == 8 for row in candidates))
+            self.assertTrue(np.all((candidates >= 0) & (candidates < 200)))
+            self.assertIs(tsp.candidate_neighbors(k=8, method=method), candidates)
+
+    def test_knn_candidates_are_nearest(self):
+        """ knn の候補が実際に近い順の都市になっているか """
+        candidates = self.tsp.candidate_neighbors(k=2)
+        for city, row in enumerate(candidates):
+            order = np.argsort(self.tsp.distance_matrix[city])[1:3]
+            np.testing.assert_allclose(self.tsp.distance_matrix[city, row], self.tsp.distance_matrix[city, order])
+
     def test_non_negative_distances(self):
         """ 距離行列の全要素が非負であることを確認 """
         self.assertTrue(np.all(self.tsp.distance_matrix >= 0))
 
+    def test_min_distance(self):
+        """ 全都市間の距離が min_distance 以上であることを確認 """
+        points = np.vstack([self.tsp.cities, self.tsp.start_city])
+        distances = np.linalg.norm(points[:, None] - points[None], axis=-1)
+        np.fill_diagonal(distances, np.inf)
+        self.assertTrue(np.all(distances >= self.tsp.min_distance))
+
+    def test_large_instance(self):
+        """ 格子点に収まる大規模インスタンスでも重複なく生成できるか """
+        tsp = TSP(5000, 0, 1000)
+        self.assertEqual(len(np.unique(tsp.cities, axis=0)), 5000)
+
+    def test_infeasible_density(self):
+        """ 配置できない密度を指定するとエラーになるか """
+        with self.assertRaises(ValueError):
+            TSP(20000, 0, 100)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+import numpy as np
+from src.tsp import TSP
+from src.tsp_ga import CROSSOVERS, MUTATIONS, SELECTIONS, GeneticAlgorithm, eax_crossover, one_point_crossover, tournament_selection
+
+class TestGeneticAlgorithm(unittest.TestCase):
+
+    def setUp(self):
+        """ テストごとに新しいTSPインスタンスとGAを作成 """
+        self.num_cities = 30
+        self.population_size = 20
+        self.tsp = TSP(self.num_cities, 0, 1000)
+        self.ga = GeneticAlgorithm(self.tsp, self.population_size, 0.5, 3)
+
+    def _assert_valid_population(self, population):
+        self.assertEqual(population.shape, (self.population_size, self.num_cities))
+        self.assertEqual(population.dtype, np.int32)
+        np.testing.assert_array_equal(np.sort(population, axis=1), np.tile(np.arange(self.num_cities), (len(population), 1)))
+
+    def test_initial_population(self):
+        """ 初期集団が都市インデックスの順列になっているか """
+        self._assert_valid_population(self.ga.population)
+
+    def test_update_keeps_permutations(self):
+        """ 世代を進めても各ルートが順列のままで、適応度が正しいか """
+        for _ in range(5):
+            self.ga.update()
+        self._assert_valid_population(self.ga.population)
+        np.testing.assert_allclose(self.ga.fitness, self.tsp.compute_route_distances(self.ga.population, closed=True))
+        self.assertEqual(self.ga.generation, 5)
+
+    def test_elitism(self):
+        """ 最良ルートの長さが世代を進めても悪化しないか """
+        best = self.ga.get_best_distance()
+        for _ in range(10):
+            self.ga.update()
+            self.assertLessEqual(self.ga.get_best_distance(), best + 1e-9)
+            best = self.ga.get_best_distance()
+
+    def test_one_point_crossover(self):
+        """ 子が「母親の残りの都市 + 父親の先頭部分」になっているか """
+        father = np.random.permutation(self.num_cities).astype(np.int32)
+        mother = np.random.permutation(self.num_cities).astype(np.int32)
+        child = one_point_crossover(father[None], mother[None])[0]
+        z = self.num_cities - np.flatnonzero(child == father[0])[0]
+        np.testing.assert_array_equal(child[-z:], father[:z])
+        np.testing.assert_array_equal(child[:-z], [city for city in mother if city not in father[:z]])
+
+    def test_crossovers_produce_permutations(self):
+        """ どの交叉でも子が都市インデックスの順列になり、GA で使えるか """
+        fathers = self.ga.population[:10]
+        mothers = self.ga.population[10:]
+        for name, crossover in CROSSOVERS.items():
+            children = crossover(fathers, mothers, self.tsp)
+            self.assertEqual(children.dtype, np.int32, name)
+            np.testing.assert_array_equal(np.sort(children, axis=1), np.tile(np.arange(self.num_cities), (10, 1)), name)
+            ga = GeneticAlgorithm(self.tsp, self.population_size, 0.5, 3, crossover=name)
+            ga.update()
+            self._assert_valid_population(ga.population)
+
+    def test_eax_identical_parents(self):
+        """ 同じ巡回路どうしの EAX は親と同じ巡回路を返すか """
+        route = self.ga.population[0]
+        np.testing.assert_array_equal(eax_crossover(route, route, self.tsp), route)
+
+    def test_selections(self):
+        """ どの選択でも指定した数の有効なインデックスを返し、良い個体ほど多く選ばれるか """
+        fitness = np.arange(1, 101, dtype=np.float64)
+        for name, selection in SELECTIONS.items():
+            selected = selection(fitness, 10000, 3)
+            self.assertEqual(selected.shape, (10000,), name)
+            self.assertTrue(np.all((selected >= 0) & (selected < 100)), name)
+            self.assertGreater(np.sum(selected < 50), np.sum(selected >= 50), name)
+
+    def test_tournament_winner(self):
+        """ トーナメントサイズが個体数より十分大きければほぼ最良個体が選ばれるか """
+        fitness = np.random.random(5)
+        selected = tournament_selection(fitness, 100, 200)
+        self.assertTrue(np.all(selected == np.argmin(fitness)))
+
+    def test_mutation_deltas(self):
+        """ 突然変異が返す差分が実際の総距離の変化と一致し、ルートが順列のままか """
+        for name, mutation in MUTATIONS.items():
+            population = self.ga.population.copy()
+            before = self.tsp.compute_route_distances(population, closed=True)
+            rows = np.arange(0, self.population_size, 2)
+            delta = mutation(population, rows, self.tsp)
+            self._assert_valid_population(population)
+            after = self.tsp.compute_route_distances(population, closed=True)
+            np.testing.assert_allclose(after[rows] - before[rows], delta, atol=1e-6, err_msg=name)
+            np.testing.assert_array_equal(population[1::2], self.ga.population[1::2])
+
+    def test_incremental_fitness(self):
+        """ 交叉しなかった子や突然変異の差分更新を使っても適応度が正しいか """
+        for name in MUTATIONS:
+            ga = GeneticAlgorithm(self.tsp, self.population_size, 0.7, 3, mutation=name, crossover_rate=0.5)
+            for _ in range(10):
+                ga.update()
+            np.testing.assert_allclose(ga.fitness, self.tsp.compute_route_distances(ga.population, closed=True), err_msg=name)
+
+    def test_seeded_runs_are_reproducible(self):
+        """ 同じシードの GA は同じ集団になり、spawn した別の乱数列では別の集団になるか """
+        first, second = np.random.SeedSequence(7).spawn(2)
+        runs = [GeneticAlgorithm(self.tsp, self.population_size, 0.5, 3, crossover=crossover, rng=np.random.default_rng(seed))
+                for crossover, seed in [("ox", first), ("ox", first), ("ox", second)]]
+        for ga in runs:
+            for _ in range(5):
+                ga.update()
+        np.testing.assert_array_equal(runs[0].population, runs[1].population)
+        self.assertFalse(np.array_equal(runs[0].population, runs[2].population))
+
+    def test_unknown_crossover(self):
+        """ 存在しない交叉名を指定するとエラーになるか """
+        with self.assertRaises(ValueError):
+            GeneticAlgorithm(self.tsp, self.population_size, 0.5, 3, crossover="unknown")
+
+if __name__ == '__main__':
+    unittest.main()
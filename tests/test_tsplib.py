@@ -0,0 +1,143 @@
+import math
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from src.distance import DenseDistance
+from src.tsp import TSP
+from src.tsplib import EDGE_WEIGHT_FORMATS, _SectionReader, load_tour, load_tsp, read_tsplib, save_tour, save_tsp
+
+COORDS = np.array([[-1.5, 3.25], [10.0, -4.0], [7.75, 12.5], [0.0, 0.0], [25.5, 8.0], [16.05, 107.5]])
+
+
+def _reference_distance(edge_weight_type, a, b):
+    """ TSPLIB の定義をそのまま書いた 1 辺ごとの距離 """
+    dx, dy = a[0] - b[0], a[1] - b[1]
+    if edge_weight_type == "EUC_2D":
+        return int(math.sqrt(dx * dx + dy * dy) + 0.5)
+    if edge_weight_type == "CEIL_2D":
+        return math.ceil(math.sqrt(dx * dx + dy * dy))
+    if edge_weight_type == "ATT":
+        r = math.sqrt((dx * dx + dy * dy) / 10.0)
+        t = int(r + 0.5)
+        return t + 1 if t < r else t
+
+    def radians(x):
+        deg = int(x)
+        return 3.141592 * (deg + 5.0 * (x - deg) / 3.0) / 180.0
+    q1 = math.cos(radians(a[1]) - radians(b[1]))
+    q2 = math.cos(radians(a[0]) - radians(b[0]))
+    q3 = math.cos(radians(a[0]) + radians(b[0]))
+    return int(6378.388 * math.acos(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3)) + 1.0)
+
+
+class TestTsplib(unittest.TestCase):
+
+    def setUp(self):
+        """ テストごとにファイルを書き出す一時ディレクトリを作成 """
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _write(self, name, text):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def _coord_file(self, edge_weight_type):
+        lines = [f"{i + 1} {x} {y}" for i, (x, y) in enumerate(COORDS)]
+        return self._write(f"{edge_weight_type}.tsp", f"NAME: sample\nTYPE: TSP\nDIMENSION: {len(COORDS)}\n"
+                           f"EDGE_WEIGHT_TYPE : {edge_weight_type}\nNODE_COORD_SECTION\n" + "\n".join(lines) + "\nEOF\n")
+
+    def test_coordinate_distances(self):
+        """ 座標で与えられる問題が TSPLIB の定義どおりの距離になるか（距離行列でも都度計算でも） """
+        for edge_weight_type in ("EUC_2D", "CEIL_2D", "ATT", "GEO"):
+            path = self._coord_file(edge_weight_type)
+            expected = [[_reference_distance(edge_weight_type, a, b) if i != j else 0
+                         for j, b in enumerate(COORDS)] for i, a in enumerate(COORDS)]
+            for backend in ("dense", "lazy"):
+                tsp = load_tsp(path, distance_backend=backend)
+                self.assertEqual(tsp.name, "sample")
+                np.testing.assert_array_equal(tsp.cities, COORDS)
+                matrix = np.array([tsp.distance.row(i) for i in range(len(COORDS))])
+                np.testing.assert_array_equal(matrix, expected, err_msg=f"{edge_weight_type} {backend}")
+                self.assertEqual(tsp.distance.edge(1, 4), expected[1][4])
+
+    def test_explicit_formats(self):
+        """ EDGE_WEIGHT_FORMAT のどの並びでも同じ対称な距離行列になるか """
+        n = 7
+        upper = np.triu(np.random.randint(1, 100, size=(n, n)), 1)
+        matrix = upper + upper.T
+        orders = {
+            "FULL_MATRIX": matrix.ravel(),
+            "UPPER_ROW": matrix[np.triu_indices(n, 1)],
+            "LOWER_ROW": matrix[np.tril_indices(n, -1)],
+            "UPPER_DIAG_ROW": matrix[np.triu_indices(n)],
+            "LOWER_DIAG_ROW": matrix[np.tril_indices(n)],
+            "UPPER_COL": matrix.T[np.tril_indices(n, -1)],
+            "LOWER_COL": matrix.T[np.triu_indices(n, 1)],
+            "UPPER_DIAG_COL": matrix.T[np.tril_indices(n)],
+            "LOWER_DIAG_COL": matrix.T[np.triu_indices(n)],
+        }
+        self.assertEqual(set(orders), set(EDGE_WEIGHT_FORMATS))
+        for weight_format, values in orders.items():
+            # 1 行に並べる数は形式によらず自由なので、わざと 5 個ずつに折り返す
+            body = "\n".join(" ".join(map(str, values[i:i + 5])) for i in range(0, len(values), 5))
+            path = self._write(f"{weight_format}.tsp", f"NAME: explicit\nDIMENSION: {n}\nEDGE_WEIGHT_TYPE: EXPLICIT\n"
+                               f"EDGE_WEIGHT_FORMAT: {weight_format}\nEDGE_WEIGHT_SECTION\n{body}\nEOF\n")
+            tsp = load_tsp(path)
+            np.testing.assert_array_equal(tsp.distance_matrix, matrix, err_msg=weight_format)
+            self.assertEqual(tsp.distance_matrix.dtype, np.int32)
+            self.assertEqual(tsp.cities.shape, (n, 2))
+
+    def test_streaming_across_blocks(self):
+        """ 行やセクションの途中でブロックが切れても同じ内容を読めるか """
+        path = self._coord_file("EUC_2D")
+        tour_path = self._write("sample.tour", "NAME: sample.tour\nTYPE: TOUR\nDIMENSION: 6\nTOUR_SECTION\n"
+                                "3 1\n2 6\n4 5 -1\nEOF\n")
+        expected = read_tsplib(path)
+        for block_size in (1, 3, 7, 64):
+            with mock.patch.object(_SectionReader, "BLOCK_SIZE", block_size):
+                data = read_tsplib(path)
+                np.testing.assert_array_equal(data.coords, expected.coords)
+                self.assertEqual(data.header, expected.header)
+                np.testing.assert_array_equal(load_tour(tour_path), [2, 0, 1, 5, 3, 4])
+
+    def test_missing_dimension(self):
+        """ DIMENSION のない .tour は ValueError になるか """
+        path = self._write("nodim.tour", "NAME: nodim\nTYPE: TOUR\nTOUR_SECTION\n1 2 3 -1\nEOF\n")
+        with self.assertRaises(ValueError):
+            load_tour(path)
+
+    def test_round_trip(self):
+        """ 書き出した .tsp と .tour を読み込むと元に戻るか """
+        tsp = TSP(40, 0, 1000)
+        path = os.path.join(self.tmpdir.name, "random.tsp")
+        save_tsp(path, tsp, name="random40")
+        loaded = load_tsp(path)
+        self.assertEqual(loaded.name, "random40")
+        np.testing.assert_array_equal(loaded.cities, tsp.cities)
+        np.testing.assert_array_equal(loaded.distance_matrix, np.floor(tsp.distance_matrix + 0.5))
+
+        save_tsp(path, tsp, edge_weight_type="EXPLICIT")
+        explicit = load_tsp(path)
+        np.testing.assert_allclose(explicit.distance_matrix, tsp.distance_matrix, rtol=1e-9)
+        np.testing.assert_array_equal(explicit.cities, tsp.cities)
+
+        # 行 0 だけ整数の距離行列でも、小数の行を丸めずに書き出すか
+        matrix = np.arange(9, dtype=np.float64).reshape(3, 3)
+        matrix[2, 1] = 2.5
+        mixed = TSP.from_cities(COORDS[:3], distance=DenseDistance.from_matrix(matrix))
+        save_tsp(path, mixed, edge_weight_type="EXPLICIT")
+        np.testing.assert_array_equal(load_tsp(path).distance_matrix, matrix)
+
+        tour = np.random.permutation(40)
+        tour_path = os.path.join(self.tmpdir.name, "random.tour")
+        save_tour(tour_path, tour)
+        np.testing.assert_array_equal(load_tour(tour_path), tour)
+
+if __name__ == '__main__':
+    unittest.main()
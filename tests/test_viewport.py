@@ -0,0 +1,45 @@
+import unittest
+import numpy as np
+from src.config import Config
+from src.tsp import TSP
+from src.visualization.viewport import Viewport
+
+class TestViewport(unittest.TestCase):
+
+    def setUp(self):
+        """ テストごとに新しいTSPインスタンスと表示領域を作成 """
+        self.tsp = TSP(50, Config.COORD_MIN, Config.COORD_MAX)
+        self.viewport = Viewport(800, 600)
+
+    def test_default_transform(self):
+        """ 初期状態では座標範囲が余白を除いた表示領域いっぱいに収まるか """
+        corners = self.viewport.to_screen([[Config.COORD_MIN, Config.COORD_MIN], [Config.COORD_MAX, Config.COORD_MAX]], self.tsp)
+        np.testing.assert_array_equal(corners, [[40, 30], [760, 570]])
+
+    def test_to_world_inverts_to_screen(self):
+        """ パン・ズーム後も to_world が to_screen の逆変換になっているか """
+        self.viewport.zoom_at((200, 100), 3.0, self.tsp)
+        self.viewport.pan(25, -40, self.tsp)
+        world = self.viewport.to_world(self.viewport.to_screen(self.tsp.cities, self.tsp), self.tsp)
+        np.testing.assert_allclose(world, self.tsp.cities, atol=1.0)
+
+    def test_zoom_keeps_anchor(self):
+        """ ズームの中心にした画面上の位置が同じ都市座標を指し続けるか """
+        before = self.viewport.to_world((200, 100), self.tsp)
+        self.viewport.zoom_at((200, 100), 2.5, self.tsp)
+        np.testing.assert_allclose(self.viewport.to_world((200, 100), self.tsp), before)
+        self.assertEqual(self.viewport.zoom, 2.5)
+
+    def test_positions_cached_until_change(self):
+        """ 表示範囲が変わるまで同じ画面座標の配列を返し、変わったら作り直すか """
+        positions = self.viewport.positions(self.tsp)
+        self.assertIs(self.viewport.positions(self.tsp), positions)
+        self.assertFalse(positions.flags.writeable)
+        self.viewport.set_size(1000, 700)
+        resized = self.viewport.positions(self.tsp)
+        self.assertIsNot(resized, positions)
+        self.viewport.reset()
+        np.testing.assert_array_equal(self.viewport.positions(self.tsp), resized)
+
+if __name__ == '__main__':
+    unittest.main()